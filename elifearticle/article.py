@@ -3,8 +3,28 @@ Article object definitions
 """
 
 from collections import OrderedDict
+from collections.abc import Sequence
+import copy
+import sys
 from elifearticle import utils
 
+# strings of up to this length are interned when an object is pickled
+INTERN_MAX_LENGTH = 64
+
+# tuples of attribute names shared by every object with the same attributes,
+# a pickle stores each of them once and refers to it from each object
+ATTRIBUTE_NAME_TUPLES = {}
+
+
+def is_list_value(value):
+    """
+    a list, or a sequence used in place of one such as a lazily built list of
+    references, strings and tuples are values of their own
+    """
+    return isinstance(value, list) or (
+        isinstance(value, Sequence) and not isinstance(value, (str, bytes, tuple))
+    )
+
 
 class BaseObject:
     "base object for shared functions"
@@ -16,15 +36,98 @@ class BaseObject:
         for easier viewing and test case scenario writing
         """
         _dict = {}
-        for key in self.__dict__:
-            if isinstance(self.__dict__.get(key), list):
+        for key, value in self.attribute_items():
+            if is_list_value(value):
                 _dict[key] = []
-            elif isinstance(self.__dict__.get(key), dict):
+            elif isinstance(value, dict):
                 _dict[key] = {}
             else:
-                _dict[key] = str(self.__dict__.get(key))
+                _dict[key] = str(value)
         return str(_dict)
 
+    def attribute_items(self):
+        "name and value of each attribute set on the object"
+        return self.__dict__.items()
+
+    def __getstate__(self):
+        """
+        pickle the attribute values as a tuple, along with a tuple of their
+        names which is shared with other objects that have the same names
+        """
+        names = tuple(self.__dict__)
+        names = ATTRIBUTE_NAME_TUPLES.setdefault(names, names)
+        # interned strings are stored once in a pickle however many objects
+        # have the same value, such as a contrib_type or a country
+        values = tuple(
+            [
+                (
+                    sys.intern(value)
+                    if type(value) is str and len(value) <= INTERN_MAX_LENGTH
+                    else value
+                )
+                for value in self.__dict__.values()
+            ]
+        )
+        return names, values
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # pickled before the state was a tuple of names and values
+            self.__dict__.update(state)
+            return
+        names, values = state[:2]
+        self.__dict__.update(zip(names, values))
+
+    # copies do not use the pickle state, so they do not intern strings
+    def __copy__(self):
+        obj = self.__class__.__new__(self.__class__)
+        obj.__dict__.update(self.__dict__)
+        return obj
+
+    def __deepcopy__(self, memo):
+        obj = self.__class__.__new__(self.__class__)
+        memo[id(self)] = obj
+        for name, value in self.__dict__.items():
+            obj.__dict__[name] = copy.deepcopy(value, memo)
+        return obj
+
+
+def same_values(obj, other, object_names=()):
+    """
+    True if two objects have the same plain values and only empty lists and
+    dicts, attributes in object_names hold objects which are compared the same way
+    """
+    if type(obj) is not type(other) or obj.__dict__.keys() != other.__dict__.keys():
+        return False
+    for name, value in obj.__dict__.items():
+        other_value = other.__dict__[name]
+        if type(value) is not type(other_value):
+            return False
+        if name in object_names and isinstance(value, BaseObject):
+            if not same_values(value, other_value):
+                return False
+        elif isinstance(value, (list, dict)):
+            if value or other_value:
+                return False
+        elif isinstance(value, BaseObject):
+            if value is not other_value:
+                return False
+        elif value != other_value:
+            return False
+    return True
+
+
+def copy_parent_article(parent_article, license_object):
+    "a distinct copy of a parent article with its own empty lists and dicts"
+    copied_article = parent_article.__class__.__new__(parent_article.__class__)
+    for name, value in parent_article.__dict__.items():
+        if isinstance(value, (list, dict)):
+            value = type(value)()
+        copied_article.__dict__[name] = value
+    if "license" in copied_article.__dict__:
+        copied_article.license = license_object
+    return copied_article
+
 
 class Article(BaseObject):
     """
@@ -149,12 +252,12 @@ class Article(BaseObject):
     def pretty(self):
         "sort values and format output for viewing and comparing in test scenarios"
         pretty_obj = OrderedDict()
-        for key, value in sorted(self.__dict__.items()):
+        for key, value in sorted(self.attribute_items()):
             if value is None:
                 pretty_obj[key] = None
             elif isinstance(value, str):
-                pretty_obj[key] = self.__dict__.get(key)
-            elif isinstance(value, list):
+                pretty_obj[key] = value
+            elif is_list_value(value):
                 pretty_obj[key] = []
             elif isinstance(value, dict):
                 pretty_obj[key] = {}
@@ -162,6 +265,75 @@ class Article(BaseObject):
                 pretty_obj[key] = str(value)
         return pretty_obj
 
+    def __getstate__(self):
+        """
+        each review article has its own copy of the parent article, a pickle
+        stores the first of the copies with the same values and the position
+        of each duplicate, which is copied again when unpickled
+        """
+        names, values = super().__getstate__()
+        review_articles = self.__dict__.get("review_articles")
+        if not review_articles or not isinstance(review_articles, list):
+            return names, values
+        parent_articles = []
+        shared = []
+        pickled_review_articles = []
+        for review_index, review_article in enumerate(review_articles):
+            related_articles = review_article.__dict__.get("related_articles")
+            if not isinstance(related_articles, list):
+                pickled_review_articles.append(review_article)
+                continue
+            pickled_related_articles = list(related_articles)
+            for related_index, related_article in enumerate(related_articles):
+                if not isinstance(related_article, Article):
+                    continue
+                parent_article = next(
+                    (
+                        parent_article
+                        for parent_article in parent_articles
+                        if same_values(
+                            related_article, parent_article, object_names=("license",)
+                        )
+                    ),
+                    None,
+                )
+                if parent_article is None:
+                    parent_articles.append(related_article)
+                    continue
+                # the review article license may be the parent license object
+                license_object = related_article.__dict__.get("license")
+                own_license = license_object is not None and (
+                    license_object is review_article.__dict__.get("license")
+                )
+                shared.append((review_index, related_index, own_license))
+                pickled_related_articles[related_index] = parent_article
+            if shared and shared[-1][0] == review_index:
+                review_article = copy.copy(review_article)
+                review_article.related_articles = pickled_related_articles
+            pickled_review_articles.append(review_article)
+        if not shared:
+            return names, values
+        values = tuple(
+            pickled_review_articles if name == "review_articles" else value
+            for name, value in zip(names, values)
+        )
+        return names, values, tuple(shared)
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if isinstance(state, dict) or len(state) < 3:
+            return
+        for review_index, related_index, own_license in state[2]:
+            review_article = self.review_articles[review_index]
+            parent_article = review_article.related_articles[related_index]
+            if own_license:
+                license_object = review_article.license
+            else:
+                license_object = copy.copy(parent_article.__dict__.get("license"))
+            review_article.related_articles[related_index] = copy_parent_article(
+                parent_article, license_object
+            )
+
 
 class ArticleDate(BaseObject):
     """
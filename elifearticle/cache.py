@@ -0,0 +1,138 @@
+"""
+Cache built article objects on local disk keyed by the XML content hash
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+from importlib import metadata
+import elifearticle
+
+CACHE_FILE_SUFFIX = ".pickle.zlib"
+
+
+def elifetools_version():
+    "installed elifetools version, part of the cache key"
+    try:
+        return metadata.version("elifetools")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+class ArticleCache:
+    """
+    Built articles stored in a directory, compressed pickle files named by the
+    cache key, when the total size is more than max_size bytes the least
+    recently used files are removed
+    """
+
+    def __init__(self, cache_dir, max_size=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.size = None
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, xml, detail=None, build_parts=None, remove_tags=None, version=None):
+        """
+        cache key from the XML content and the arguments which change the built
+        article, along with the library versions which built it, str XML, such
+        as read from a text mode file, is hashed as UTF-8
+        """
+        if isinstance(xml, str):
+            xml = xml.encode("utf8")
+        key_hash = hashlib.sha256(xml)
+        key_hash.update(
+            repr(
+                (
+                    detail,
+                    sorted(build_parts) if build_parts else build_parts,
+                    list(remove_tags) if remove_tags is not None else None,
+                    version,
+                    elifearticle.__version__,
+                    elifetools_version(),
+                )
+            ).encode("utf8")
+        )
+        return key_hash.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + CACHE_FILE_SUFFIX)
+
+    def get(self, key):
+        "the cached article, or None if it is not in the cache"
+        path = self.path(key)
+        try:
+            with open(path, "rb") as open_file:
+                data = open_file.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        try:
+            article = pickle.loads(zlib.decompress(data))
+        except (
+            zlib.error,
+            pickle.UnpicklingError,
+            EOFError,
+            AttributeError,
+            TypeError,
+            ValueError,
+        ):
+            # discard a damaged or outdated cache file
+            self.remove(path)
+            self.misses += 1
+            return None
+        # update the modified time, used as the last used time when evicting
+        os.utime(path)
+        self.hits += 1
+        return article
+
+    def set(self, key, article):
+        "add the article to the cache, then remove files if it is too large"
+        data = zlib.compress(pickle.dumps(article, pickle.HIGHEST_PROTOCOL))
+        # write to a temporary file first so other processes never read part of it
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(file_descriptor, "wb") as open_file:
+            open_file.write(data)
+        os.replace(temp_path, self.path(key))
+        if self.size is None:
+            self.size = self.total_size()
+        else:
+            self.size += len(data)
+        if self.size > self.max_size:
+            self.evict()
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def cache_files(self):
+        "list of cache file entries, least recently used first"
+        with os.scandir(self.cache_dir) as entries:
+            cache_files = [
+                entry for entry in entries if entry.name.endswith(CACHE_FILE_SUFFIX)
+            ]
+        return sorted(cache_files, key=lambda entry: entry.stat().st_mtime)
+
+    def total_size(self):
+        return sum(entry.stat().st_size for entry in self.cache_files())
+
+    def evict(self):
+        "remove the least recently used files until the cache fits in max_size"
+        cache_files = self.cache_files()
+        self.size = sum(entry.stat().st_size for entry in cache_files)
+        for entry in cache_files:
+            if self.size <= self.max_size:
+                break
+            self.remove(entry.path)
+            self.size -= entry.stat().st_size
+
+    def clear(self):
+        for entry in self.cache_files():
+            self.remove(entry.path)
+        self.size = 0
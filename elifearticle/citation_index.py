@@ -0,0 +1,427 @@
+"""
+Index of the DOIs cited by built articles, the article DOI and ref id of each
+citation of a DOI, written to a file which is memory mapped and searched
+without loading it, and updated one article at a time by appending to a delta
+file next to it, which is merged into the index file when it grows
+
+The index file has a single writer at a time: update_index_file and
+compact_index_file hold an exclusive lock on a lock file next to it while
+they change the files. The lock is an advisory flock, it orders writers on
+one host which use these functions, not writers on other hosts sharing the
+file over a network file system, and it is not taken where fcntl is not
+available. Readers do not take the lock
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+import heapq
+import itertools
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAGIC = b"EACITE1\n"
+
+# suffix of the delta file, a JSON line of the citations of each article
+# updated since the index file was written, a later line for an article
+# replaces its earlier citations, an article with no citations is removed
+DELTA_FILE_SUFFIX = ".delta"
+
+# suffix of the lock file writers of the index file hold an exclusive lock on
+LOCK_FILE_SUFFIX = ".lock"
+
+# number of articles in the delta file after which update_index_file writes
+# the index file again
+MAX_DELTA_ARTICLES = 1000
+
+# columns of the index entries, each an array of codes into the sorted list of
+# strings, entries are sorted so the entries of a cited DOI are together
+ENTRY_COLUMNS = ("cited_doi", "article_doi", "ref_id")
+
+# array type code of the string offsets and of the entry columns
+OFFSET_TYPECODE = "q"
+CODE_TYPECODE = "i"
+
+
+def normalise_doi(doi):
+    "DOIs are not case sensitive, they are compared in lower case"
+    if not doi:
+        return None
+    return doi.strip().lower() or None
+
+
+def article_citations(article):
+    """
+    cited DOI, article DOI and ref id of each reference of the article which
+    has a DOI, from its ref_list and data_ref_list
+    """
+    citations = []
+    for ref in itertools.chain(article.ref_list or [], article.data_ref_list or []):
+        cited_doi = normalise_doi(ref.doi)
+        if cited_doi:
+            citations.append((cited_doi, article.doi, ref.id))
+    return citations
+
+
+def entry_sort_key(entry):
+    "entries sort by their strings, a missing ref id first"
+    return tuple(value or "" for value in entry)
+
+
+def little_endian_bytes(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class CitationIndex:
+    """
+    Citations of each article keyed by the article DOI, built from articles
+    or loaded from an index file, and written back to a file
+    """
+
+    def __init__(self):
+        self.articles = OrderedDict()
+
+    def add_article(self, article):
+        "add the citations of the article, replacing any it already had"
+        self.articles[article.doi] = article_citations(article)
+
+    def remove_article(self, article_doi):
+        "remove the citations of the article, if it is in the index"
+        self.articles.pop(article_doi, None)
+
+    def add_entry(self, cited_doi, article_doi, ref_id):
+        self.articles.setdefault(article_doi, []).append(
+            (cited_doi, article_doi, ref_id)
+        )
+
+    def entries(self):
+        "all the citations sorted by cited DOI, article DOI and ref id"
+        return sorted(
+            (entry for citations in self.articles.values() for entry in citations),
+            key=entry_sort_key,
+        )
+
+    def citing(self, doi):
+        "list of the article DOI and ref id of each citation of the DOI"
+        cited_doi = normalise_doi(doi)
+        return sorted(
+            (
+                (article_doi, ref_id)
+                for citations in self.articles.values()
+                for entry_doi, article_doi, ref_id in citations
+                if entry_doi == cited_doi
+            ),
+            key=lambda citation: tuple(value or "" for value in citation),
+        )
+
+    @classmethod
+    def load(cls, file_path):
+        "index of the citations in an index file, and in its delta file"
+        index = cls()
+        with CitationIndexFile(file_path) as index_file:
+            for entry in index_file.entries():
+                index.add_entry(*entry)
+            for article_doi, citations in index_file.delta.items():
+                index.articles.pop(article_doi, None)
+                for cited_doi, ref_id in citations:
+                    index.add_entry(cited_doi, article_doi, ref_id)
+        return index
+
+    def write(self, file_path):
+        """
+        write the index file, a header then the sorted strings, their offsets
+        and a column of string codes for each part of the entries, the codes
+        of an entry sort in the same order as its strings
+        """
+        entries = self.entries()
+        strings = sorted(
+            set(value for entry in entries for value in entry if value is not None)
+        )
+        codes = {string: code for code, string in enumerate(strings)}
+        string_data = [string.encode("utf8") for string in strings]
+        offsets = array(OFFSET_TYPECODE, [0])
+        for data in string_data:
+            offsets.append(offsets[-1] + len(data))
+        blocks = OrderedDict()
+        blocks["strings"] = b"".join(string_data)
+        blocks["offsets"] = little_endian_bytes(offsets)
+        for position, column_name in enumerate(ENTRY_COLUMNS):
+            blocks[column_name] = little_endian_bytes(
+                array(
+                    CODE_TYPECODE,
+                    [codes.get(entry[position], -1) for entry in entries],
+                )
+            )
+        header = OrderedDict(
+            [("string_count", len(strings)), ("entry_count", len(entries))]
+        )
+        offset = 0
+        for name, data in blocks.items():
+            header[name] = [offset, len(data)]
+            offset += len(data)
+        header_bytes = json.dumps(header).encode("utf8")
+        directory = os.path.dirname(os.path.abspath(file_path))
+        # write to a temporary file first so readers never map part of it
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(file_descriptor, "wb") as open_file:
+            open_file.write(MAGIC)
+            open_file.write(struct.pack("<Q", len(header_bytes)))
+            open_file.write(header_bytes)
+            for data in blocks.values():
+                open_file.write(data)
+        os.replace(temp_path, file_path)
+
+
+def delta_file_path(file_path):
+    return file_path + DELTA_FILE_SUFFIX
+
+
+@contextmanager
+def index_file_lock(file_path):
+    """
+    hold an exclusive lock on the lock file of an index file, waiting for
+    another writer to release it first
+    """
+    with open(file_path + LOCK_FILE_SUFFIX, "ab") as lock_file:
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def read_delta_file(file_path):
+    """
+    citations of each article in the delta file of an index file, keyed by
+    the article DOI, a line which is not complete yet is left out
+    """
+    delta = OrderedDict()
+    try:
+        with open(delta_file_path(file_path), "rb") as open_file:
+            lines = open_file.read().split(b"\n")
+    except FileNotFoundError:
+        return delta
+    # the last line is empty, or one which is still being written
+    for line in lines[:-1]:
+        article_doi, citations = json.loads(line)
+        delta.pop(article_doi, None)
+        delta[article_doi] = [tuple(citation) for citation in citations]
+    return delta
+
+
+def update_index_file(
+    file_path, articles=None, remove_article_dois=None, max_delta_articles=None
+):
+    """
+    Add the citations of articles to an index file and remove those of the
+    removed article DOIs, creating the file if it does not exist. The changes
+    are appended to the delta file, so an update costs the size of the changed
+    articles and the delta, the index file is only read and written again when
+    the delta file has more than max_delta_articles articles, by default
+    MAX_DELTA_ARTICLES
+    """
+    if max_delta_articles is None:
+        max_delta_articles = MAX_DELTA_ARTICLES
+    lines = [
+        json.dumps([article_doi, []]).encode("utf8") + b"\n"
+        for article_doi in remove_article_dois or []
+    ]
+    for article in articles or []:
+        citations = [
+            [cited_doi, ref_id]
+            for cited_doi, article_doi, ref_id in article_citations(article)
+        ]
+        lines.append(json.dumps([article.doi, citations]).encode("utf8") + b"\n")
+    # the lock keeps a compaction by another writer from removing the delta
+    # file after these lines are appended and before they are merged
+    with index_file_lock(file_path):
+        if not os.path.exists(file_path):
+            CitationIndex().write(file_path)
+        if not lines:
+            return
+        # one write of whole lines, so a reader sees each line complete or not at all
+        with open(delta_file_path(file_path), "ab") as open_file:
+            open_file.write(b"".join(lines))
+        if len(read_delta_file(file_path)) > max_delta_articles:
+            merge_delta_file(file_path)
+
+
+def compact_index_file(file_path):
+    """
+    Write the index file again with the changes in its delta file, then
+    remove the delta file, holding the lock of the index file so no lines
+    are appended to the delta file in between
+    """
+    with index_file_lock(file_path):
+        merge_delta_file(file_path)
+
+
+def merge_delta_file(file_path):
+    """
+    merge the delta file into the index file and remove it, the caller holds
+    the lock, a reader opening the file in between applies the same changes
+    twice, which does not change the result
+    """
+    CitationIndex.load(file_path).write(file_path)
+    try:
+        os.remove(delta_file_path(file_path))
+    except FileNotFoundError:
+        pass
+
+
+class CitationIndexFile:
+    """
+    Read an index file, the file is memory mapped and a lookup is a binary
+    search of the strings then of the entries, it does not read the file.
+    The delta file is read when the index file is opened, the entries of the
+    articles in it replace those in the index file
+    """
+
+    def __init__(self, file_path):
+        with open(file_path, "rb") as open_file:
+            self.mmap = mmap.mmap(open_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mmap[: len(MAGIC)] != MAGIC:
+            self.mmap.close()
+            raise ValueError("%s is not a citation index file" % file_path)
+        (header_length,) = struct.unpack_from("<Q", self.mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(
+            bytes(self.mmap[header_start : header_start + header_length])
+        )
+        self.data_start = header_start + header_length
+        self.views = []
+        self.offsets = self.block("offsets", OFFSET_TYPECODE)
+        self.columns = OrderedDict(
+            (column_name, self.block(column_name, CODE_TYPECODE))
+            for column_name in ENTRY_COLUMNS
+        )
+        self.delta = read_delta_file(file_path)
+        # codes of the articles in the delta which have entries in the file
+        self.delta_article_codes = set()
+        for article_doi in self.delta:
+            code = self.string_code(article_doi) if article_doi else None
+            if code is not None:
+                self.delta_article_codes.add(code)
+
+    def block(self, name, typecode):
+        start, length = self.header[name]
+        start += self.data_start
+        if sys.byteorder == "big":
+            values = array(typecode, bytes(self.mmap[start : start + length]))
+            values.byteswap()
+            return values
+        view = memoryview(self.mmap)[start : start + length]
+        values = view.cast(typecode)
+        self.views += [values, view]
+        return values
+
+    def close(self):
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        count = self.header["entry_count"]
+        if self.delta_article_codes:
+            article_codes = array(CODE_TYPECODE, self.columns["article_doi"])
+            for code in self.delta_article_codes:
+                count -= article_codes.count(code)
+        return count + sum(len(citations) for citations in self.delta.values())
+
+    def string(self, code):
+        if code < 0:
+            return None
+        start = self.data_start + self.header["strings"][0]
+        return self.mmap[
+            start + self.offsets[code] : start + self.offsets[code + 1]
+        ].decode("utf8")
+
+    def string_code(self, string):
+        "code of the string, by binary search of the sorted strings, or None"
+        low, high = 0, len(self.offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(middle) < string:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self.offsets) - 1 and self.string(low) == string:
+            return low
+        return None
+
+    def citing(self, doi):
+        "list of the article DOI and ref id of each citation of the DOI"
+        cited_doi = normalise_doi(doi) or ""
+        citations = []
+        code = self.string_code(cited_doi)
+        if code is not None:
+            cited_codes = self.columns["cited_doi"]
+            article_codes = self.columns["article_doi"]
+            start = bisect_left(cited_codes, code)
+            end = bisect_right(cited_codes, code, start)
+            citations = [
+                (
+                    self.string(article_codes[position]),
+                    self.string(self.columns["ref_id"][position]),
+                )
+                for position in range(start, end)
+                if article_codes[position] not in self.delta_article_codes
+            ]
+        if not self.delta:
+            return citations
+        citations += [
+            (article_doi, ref_id)
+            for article_doi, article_citations in self.delta.items()
+            for entry_doi, ref_id in article_citations
+            if entry_doi == cited_doi
+        ]
+        return sorted(
+            citations, key=lambda citation: tuple(value or "" for value in citation)
+        )
+
+    def entries(self):
+        "cited DOI, article DOI and ref id of each entry in the file"
+        article_codes = self.columns["article_doi"]
+        file_entries = (
+            tuple(
+                self.string(self.columns[column_name][position])
+                for column_name in ENTRY_COLUMNS
+            )
+            for position in range(self.header["entry_count"])
+            if article_codes[position] not in self.delta_article_codes
+        )
+        if not self.delta:
+            yield from file_entries
+            return
+        delta_entries = sorted(
+            (
+                (cited_doi, article_doi, ref_id)
+                for article_doi, citations in self.delta.items()
+                for cited_doi, ref_id in citations
+            ),
+            key=entry_sort_key,
+        )
+        yield from heapq.merge(file_entries, delta_entries, key=entry_sort_key)
@@ -0,0 +1,400 @@
+"""
+Export built articles to a column-oriented binary file, one table per kind
+of object with integer keys joining them, so values across a corpus can be
+scanned as arrays instead of walking the article objects
+"""
+
+from array import array
+from collections import OrderedDict
+import json
+import mmap
+import struct
+import sys
+import time
+import zlib
+
+MAGIC = b"EACOLS1\n"
+
+# integer value stored for None in a nullable int column
+NULL_INT = -(2**63)
+
+# array type code of each column type, str columns are stored as int32 codes
+# into a list of the distinct values, with -1 for None
+ARRAY_TYPECODES = {"id": "q", "int": "q", "bool": "b", "str": "i"}
+
+
+def date_string(date):
+    "ISO 8601 date of a struct_time"
+    if date is None:
+        return None
+    return time.strftime("%Y-%m-%d", date)
+
+
+def article_pub_date(article):
+    article_date = article.get_date("pub")
+    return date_string(article_date.date) if article_date else None
+
+
+def attribute_value(name):
+    "value of the attribute of an object"
+
+    def get_value(obj):
+        return getattr(obj, name, None)
+
+    return get_value
+
+
+def column(name, column_type, value=None):
+    """
+    column definition of the name, type and the function to get the value
+    from an object, by default the attribute of the same name
+    """
+    return (name, column_type, value or attribute_value(name))
+
+
+# the columns of each table, besides the id and foreign key columns
+TABLE_COLUMNS = OrderedDict(
+    [
+        (
+            "articles",
+            [
+                column("doi", "str"),
+                column("version", "int"),
+                column("article_type", "str"),
+                column("title", "str"),
+                column("journal_title", "str"),
+                column("volume", "str"),
+                column("elocation_id", "str"),
+                column("display_channel", "str"),
+                column("is_poa", "bool"),
+                column("pub_date", "str", article_pub_date),
+            ],
+        ),
+        (
+            "contributors",
+            [
+                column("contrib_type", "str"),
+                column("surname", "str"),
+                column("given_name", "str"),
+                column("suffix", "str"),
+                column("collab", "str"),
+                column("orcid", "str"),
+                column("corresp", "bool"),
+                column("equal_contrib", "bool"),
+            ],
+        ),
+        (
+            "affiliations",
+            [
+                column("department", "str"),
+                column("institution", "str"),
+                column("city", "str"),
+                column("country", "str"),
+                column("ror", "str"),
+                column("text", "str"),
+            ],
+        ),
+        (
+            "citations",
+            [
+                column("id", "str"),
+                column("publication_type", "str"),
+                column("article_title", "str"),
+                column("source", "str"),
+                column("volume", "str"),
+                column("fpage", "str"),
+                column("lpage", "str"),
+                column("elocation_id", "str"),
+                column("year", "str"),
+                column("doi", "str"),
+                column("pmid", "str"),
+                column("uri", "str"),
+            ],
+        ),
+        (
+            "funding_awards",
+            [
+                column("award_group_id", "str"),
+                column("institution_name", "str"),
+                column("institution_id", "str"),
+                column("institution_id_type", "str"),
+            ],
+        ),
+        (
+            "awards",
+            [
+                column("award_id", "str"),
+                column("award_id_type", "str"),
+            ],
+        ),
+        (
+            "datasets",
+            [
+                column("dataset_type", "str"),
+                column("title", "str"),
+                column("year", "str"),
+                column("doi", "str"),
+                column("uri", "str"),
+                column("accession_id", "str"),
+                column("assigning_authority", "str"),
+            ],
+        ),
+    ]
+)
+
+# key columns of each table, the row id, the row id of the parent row and
+# the position of the row in the list of the parent object
+TABLE_KEYS = OrderedDict(
+    [
+        ("articles", ["article_id"]),
+        ("contributors", ["contributor_id", "article_id", "position"]),
+        ("affiliations", ["affiliation_id", "contributor_id", "position"]),
+        ("citations", ["citation_id", "article_id", "position", "data_ref"]),
+        ("funding_awards", ["funding_award_id", "article_id", "position"]),
+        # award_id is the id of the award, the row id is award_row_id
+        ("awards", ["award_row_id", "funding_award_id", "position"]),
+        ("datasets", ["dataset_id", "article_id", "position"]),
+    ]
+)
+
+
+class ColumnTable:
+    "columns of one table as arrays, str values are kept as codes"
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.column_types = OrderedDict(
+            [(key, "id") for key in TABLE_KEYS.get(name)]
+            + [
+                (column_name, column_type)
+                for column_name, column_type, value in TABLE_COLUMNS.get(name)
+            ]
+        )
+        self.columns = OrderedDict(
+            (column_name, array(ARRAY_TYPECODES.get(column_type)))
+            for column_name, column_type in self.column_types.items()
+        )
+        # distinct values of each str column and their codes
+        self.string_codes = OrderedDict(
+            (column_name, OrderedDict())
+            for column_name, column_type in self.column_types.items()
+            if column_type == "str"
+        )
+
+    def add_row(self, keys, obj):
+        "add a row of the key values and the column values of the object"
+        for key, key_value in zip(TABLE_KEYS.get(self.name), keys):
+            self.columns[key].append(key_value)
+        for column_name, column_type, value in TABLE_COLUMNS.get(self.name):
+            self.add_value(column_name, column_type, value(obj))
+        self.rows += 1
+
+    def add_value(self, column_name, column_type, value):
+        if column_type == "str":
+            if value is None:
+                code = -1
+            else:
+                codes = self.string_codes[column_name]
+                code = codes.setdefault(str(value), len(codes))
+            self.columns[column_name].append(code)
+        elif column_type == "bool":
+            self.columns[column_name].append(-1 if value is None else int(bool(value)))
+        else:
+            self.columns[column_name].append(NULL_INT if value is None else int(value))
+
+
+class ColumnarWriter:
+    """
+    Add articles one at a time to the tables, then write the file, articles
+    do not need to be kept once they are added
+    """
+
+    def __init__(self):
+        self.tables = OrderedDict((name, ColumnTable(name)) for name in TABLE_KEYS)
+
+    def next_id(self, table_name):
+        return self.tables[table_name].rows
+
+    def add_article(self, article):
+        "add the article and its contributors, references, funding and datasets"
+        article_id = self.next_id("articles")
+        self.tables["articles"].add_row([article_id], article)
+        for position, contributor in enumerate(article.contributors or []):
+            contributor_id = self.next_id("contributors")
+            self.tables["contributors"].add_row(
+                [contributor_id, article_id, position], contributor
+            )
+            for affiliation_position, affiliation in enumerate(
+                contributor.affiliations or []
+            ):
+                self.tables["affiliations"].add_row(
+                    [
+                        self.next_id("affiliations"),
+                        contributor_id,
+                        affiliation_position,
+                    ],
+                    affiliation,
+                )
+        for data_ref, ref_list in enumerate([article.ref_list, article.data_ref_list]):
+            for position, citation in enumerate(ref_list or []):
+                self.tables["citations"].add_row(
+                    [self.next_id("citations"), article_id, position, data_ref],
+                    citation,
+                )
+        for position, funding_award in enumerate(article.funding_awards or []):
+            funding_award_id = self.next_id("funding_awards")
+            self.tables["funding_awards"].add_row(
+                [funding_award_id, article_id, position], funding_award
+            )
+            for award_position, award in enumerate(funding_award.awards or []):
+                self.tables["awards"].add_row(
+                    [self.next_id("awards"), funding_award_id, award_position], award
+                )
+        for position, dataset in enumerate(article.datasets or []):
+            self.tables["datasets"].add_row(
+                [self.next_id("datasets"), article_id, position], dataset
+            )
+        return article_id
+
+    def write(self, file_path):
+        """
+        write the file, a header then a block for each column, int columns
+        are little-endian arrays which can be memory mapped, the distinct
+        values of str columns are a zlib compressed JSON list
+        """
+        header = OrderedDict()
+        blocks = []
+        offset = 0
+        for table_name, table in self.tables.items():
+            columns = OrderedDict()
+            for column_name, column_type in table.column_types.items():
+                values = table.columns[column_name]
+                if sys.byteorder == "big":
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                data = values.tobytes()
+                column_header = OrderedDict(
+                    [
+                        ("type", column_type),
+                        ("typecode", values.typecode),
+                        ("offset", offset),
+                        ("length", len(data)),
+                    ]
+                )
+                blocks.append(data)
+                offset += len(data)
+                if column_type == "str":
+                    strings = zlib.compress(
+                        json.dumps(list(table.string_codes[column_name])).encode("utf8")
+                    )
+                    column_header["strings_offset"] = offset
+                    column_header["strings_length"] = len(strings)
+                    blocks.append(strings)
+                    offset += len(strings)
+                columns[column_name] = column_header
+            header[table_name] = OrderedDict(
+                [("rows", table.rows), ("columns", columns)]
+            )
+        header_bytes = json.dumps(header).encode("utf8")
+        with open(file_path, "wb") as open_file:
+            open_file.write(MAGIC)
+            open_file.write(struct.pack("<Q", len(header_bytes)))
+            open_file.write(header_bytes)
+            for block in blocks:
+                open_file.write(block)
+
+
+def export_articles(articles, file_path):
+    "write an iterable of articles to a columnar file, returning the row count"
+    writer = ColumnarWriter()
+    count = 0
+    for article in articles:
+        writer.add_article(article)
+        count += 1
+    writer.write(file_path)
+    return count
+
+
+class ColumnarFile:
+    """
+    Read a columnar file, the file is memory mapped and each int column is
+    a memoryview of it, which can be scanned without copying
+    """
+
+    def __init__(self, file_path):
+        with open(file_path, "rb") as open_file:
+            self.mmap = mmap.mmap(open_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mmap[: len(MAGIC)] != MAGIC:
+            self.mmap.close()
+            raise ValueError("%s is not a columnar article file" % file_path)
+        (header_length,) = struct.unpack_from("<Q", self.mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(
+            bytes(self.mmap[header_start : header_start + header_length])
+        )
+        self.data_start = header_start + header_length
+        self.strings = {}
+
+    def close(self):
+        try:
+            self.mmap.close()
+        except BufferError:
+            # column memoryviews are still in use, the file is unmapped
+            # when they are released
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def tables(self):
+        return list(self.header)
+
+    def rows(self, table_name):
+        return self.header[table_name]["rows"]
+
+    def columns(self, table_name):
+        return list(self.header[table_name]["columns"])
+
+    def column_header(self, table_name, column_name):
+        return self.header[table_name]["columns"][column_name]
+
+    def column(self, table_name, column_name):
+        """
+        the stored values of the column, the codes of a str column, as a
+        memoryview of the file
+        """
+        column_header = self.column_header(table_name, column_name)
+        start = self.data_start + column_header["offset"]
+        values = memoryview(self.mmap)[start : start + column_header["length"]]
+        if sys.byteorder == "big":
+            swapped = array(column_header["typecode"], bytes(values))
+            swapped.byteswap()
+            return memoryview(swapped)
+        return values.cast(column_header["typecode"])
+
+    def string_values(self, table_name, column_name):
+        "the distinct values of a str column, a code is an index into the list"
+        key = (table_name, column_name)
+        if key not in self.strings:
+            column_header = self.column_header(table_name, column_name)
+            start = self.data_start + column_header["strings_offset"]
+            data = self.mmap[start : start + column_header["strings_length"]]
+            self.strings[key] = json.loads(zlib.decompress(data))
+        return self.strings[key]
+
+    def values(self, table_name, column_name):
+        "list of the values of a column with None for null values"
+        column_type = self.column_header(table_name, column_name)["type"]
+        values = self.column(table_name, column_name)
+        if column_type == "str":
+            strings = self.string_values(table_name, column_name)
+            return [strings[code] if code >= 0 else None for code in values]
+        if column_type == "bool":
+            return [bool(value) if value >= 0 else None for value in values]
+        if column_type == "int":
+            return [value if value != NULL_INT else None for value in values]
+        return values.tolist()
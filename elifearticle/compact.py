@@ -0,0 +1,197 @@
+"""
+Compact variants of the article object classes, which keep their attributes
+in __slots__ instead of a __dict__ on each instance, for holding a large
+number of built articles in memory
+"""
+
+from collections import OrderedDict
+import inspect
+from elifearticle import article as ea
+
+
+class SlotsObject:
+    """
+    Base of the compact classes, an attribute which is not set returns the
+    default value the original class has for it, if it has one. The names of
+    the attributes set on an object are kept in the order they were set, as
+    a tuple shared with other objects which set the same names in the same
+    order, so str() and pretty() are the same as for the original class
+    """
+
+    __slots__ = ("_attribute_names",)
+    slot_defaults = {}
+
+    def __getattr__(self, name):
+        try:
+            return type(self).slot_defaults[name]
+        except KeyError:
+            raise AttributeError(
+                "'%s' object has no attribute '%s'" % (type(self).__name__, name)
+            ) from None
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        names = self.attribute_names()
+        if name not in names:
+            names += (name,)
+            object.__setattr__(
+                self,
+                "_attribute_names",
+                ea.ATTRIBUTE_NAME_TUPLES.setdefault(names, names),
+            )
+
+    def __delattr__(self, name):
+        object.__delattr__(self, name)
+        names = tuple(
+            [
+                attribute_name
+                for attribute_name in self.attribute_names()
+                if attribute_name != name
+            ]
+        )
+        object.__setattr__(
+            self, "_attribute_names", ea.ATTRIBUTE_NAME_TUPLES.setdefault(names, names)
+        )
+
+    def attribute_names(self):
+        "names of the attributes set on the object, in the order they were set"
+        try:
+            return object.__getattribute__(self, "_attribute_names")
+        except AttributeError:
+            return ()
+
+    def attribute_items(self):
+        "name and value of each attribute set on the object, in the order they were set"
+        return [
+            (name, object.__getattribute__(self, name))
+            for name in self.attribute_names()
+        ]
+
+    def __getstate__(self):
+        # only the attributes which are set, not the defaults
+        return dict(self.attribute_items())
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+def instance_attribute_names(cls):
+    "names of the attributes an instance of the class sets when it is created"
+    parameters = [
+        parameter
+        for parameter in inspect.signature(cls).parameters.values()
+        if parameter.default is parameter.empty
+    ]
+    return list(vars(cls(*[None] * len(parameters))))
+
+
+def compact_class(cls, extra_attribute_names=None):
+    """
+    Create a slotted class with the same methods and attributes as cls, class
+    attribute values become the defaults of the slots of the same name
+    """
+    namespace = OrderedDict()
+    slot_defaults = OrderedDict()
+    for base in reversed(cls.__mro__[:-1]):
+        for name, value in vars(base).items():
+            if name in [
+                "__dict__",
+                "__weakref__",
+                "__module__",
+                "__qualname__",
+                # copy the __dict__, compact objects are copied by their state
+                "__copy__",
+                "__deepcopy__",
+            ]:
+                continue
+            if name in vars(SlotsObject) and name != "__doc__":
+                # methods which read __dict__ are replaced by the SlotsObject ones
+                continue
+            if name.startswith("__") or callable(value):
+                namespace[name] = value
+            else:
+                slot_defaults[name] = value
+    slot_names = instance_attribute_names(cls)
+    for name in list(slot_defaults) + list(extra_attribute_names or []):
+        if name not in slot_names:
+            slot_names.append(name)
+    name = "Compact" + cls.__name__
+    namespace["__slots__"] = tuple(slot_names)
+    namespace["__module__"] = __name__
+    namespace["__qualname__"] = name
+    namespace["slot_defaults"] = slot_defaults
+    return type(name, (SlotsObject,), namespace)
+
+
+CompactArticle = compact_class(ea.Article, ["section_hashes"])
+CompactArticleDate = compact_class(ea.ArticleDate)
+CompactContributor = compact_class(ea.Contributor)
+CompactAffiliation = compact_class(ea.Affiliation)
+CompactRole = compact_class(ea.Role)
+CompactDataset = compact_class(ea.Dataset)
+CompactAward = compact_class(ea.Award)
+CompactFundingAward = compact_class(ea.FundingAward)
+CompactLicense = compact_class(ea.License)
+CompactCitation = compact_class(ea.Citation)
+CompactComponent = compact_class(ea.Component)
+CompactRelatedArticle = compact_class(ea.RelatedArticle)
+CompactUri = compact_class(ea.Uri)
+CompactRelatedObject = compact_class(ea.RelatedObject)
+CompactClinicalTrial = compact_class(ea.ClinicalTrial)
+CompactPreprint = compact_class(ea.Preprint)
+CompactEvent = compact_class(ea.Event)
+CompactContentBlock = compact_class(ea.ContentBlock)
+
+# compact class of each of the article object classes
+COMPACT_CLASSES = OrderedDict(
+    [
+        (ea.Article, CompactArticle),
+        (ea.ArticleDate, CompactArticleDate),
+        (ea.Contributor, CompactContributor),
+        (ea.Affiliation, CompactAffiliation),
+        (ea.Role, CompactRole),
+        (ea.Dataset, CompactDataset),
+        (ea.Award, CompactAward),
+        (ea.FundingAward, CompactFundingAward),
+        (ea.License, CompactLicense),
+        (ea.Citation, CompactCitation),
+        (ea.Component, CompactComponent),
+        (ea.RelatedArticle, CompactRelatedArticle),
+        (ea.Uri, CompactUri),
+        (ea.RelatedObject, CompactRelatedObject),
+        (ea.ClinicalTrial, CompactClinicalTrial),
+        (ea.Preprint, CompactPreprint),
+        (ea.Event, CompactEvent),
+        (ea.ContentBlock, CompactContentBlock),
+    ]
+)
+
+
+def compact(value, memo=None):
+    """
+    Copy an article, or any value containing article objects, replacing each
+    article object with its compact class, objects shared by more than one
+    attribute stay shared in the copy, other values are not copied
+    """
+    if memo is None:
+        memo = {}
+    if id(value) in memo:
+        return memo[id(value)]
+    compact_cls = COMPACT_CLASSES.get(type(value))
+    if compact_cls:
+        compact_value = compact_cls.__new__(compact_cls)
+        memo[id(value)] = compact_value
+        for name, attribute_value in vars(value).items():
+            setattr(compact_value, name, compact(attribute_value, memo))
+        return compact_value
+    if isinstance(value, list):
+        compact_value = [compact(item, memo) for item in value]
+    elif isinstance(value, dict):
+        compact_value = type(value)(
+            (key, compact(item, memo)) for key, item in value.items()
+        )
+    else:
+        return value
+    memo[id(value)] = compact_value
+    return compact_value
@@ -0,0 +1,177 @@
+"""
+Structural fingerprints of article objects, a hash of the values of an object
+and all of its child objects, and the paths of the fields which differ
+between two articles, for telling whether a rebuilt article has changed
+"""
+
+import hashlib
+import time
+import weakref
+from elifearticle import article as ea
+from elifearticle import compact
+
+# attributes which are not part of the content of an article
+IGNORED_ATTRIBUTES = ("section_hashes",)
+
+# last fingerprint of each object, with the state it was made from, weakly
+# keyed so an object being fingerprinted does not keep it in memory
+FINGERPRINTS = weakref.WeakKeyDictionary()
+
+# compact classes have the same fingerprint as the class they are a variant of
+CLASS_NAMES = {
+    compact_cls: cls.__name__ for cls, compact_cls in compact.COMPACT_CLASSES.items()
+}
+
+
+def is_article_object(value):
+    return isinstance(value, (ea.BaseObject, compact.SlotsObject))
+
+
+def class_name(obj):
+    cls = type(obj)
+    return CLASS_NAMES.get(cls, cls.__name__)
+
+
+def object_state(obj, memo):
+    """
+    class name and each attribute of the object sorted by name, with the
+    state of its value, child objects are represented by their fingerprint
+    """
+    return (
+        class_name(obj),
+        tuple(
+            [
+                (name, value_state(value, memo))
+                for name, value in sorted(obj.attribute_items())
+                if name not in IGNORED_ATTRIBUTES
+            ]
+        ),
+    )
+
+
+def value_state(value, memo):
+    "a hashable value with the same contents as the value, for comparing"
+    cls = type(value)
+    if cls is str or value is None:
+        return value
+    if cls is bool or cls is int or cls is float:
+        # typed so True, 1 and 1.0 are not equal
+        return (cls.__name__, value)
+    if cls is list or cls is tuple:
+        return ("list", tuple([value_state(item, memo) for item in value]))
+    if is_article_object(value):
+        return fingerprint(value, memo)
+    if ea.is_list_value(value):
+        # a sequence used as a list, such as lazily built references
+        return ("list", tuple([value_state(item, memo) for item in value]))
+    if isinstance(value, dict):
+        items = [(key, value_state(item, memo)) for key, item in value.items()]
+        try:
+            items.sort()
+        except TypeError:
+            items.sort(key=lambda item: repr(item[0]))
+        return ("dict", tuple(items))
+    if cls is time.struct_time:
+        return ("struct_time", tuple(value))
+    return (cls.__name__, repr(value))
+
+
+def fingerprint(value, memo=None):
+    """
+    Hex digest of the structure and values of an article object, or a value
+    containing them, objects with the same values have the same fingerprint
+    regardless of the order their attributes were set. The fingerprint of
+    each object is cached with the state it was made from, an unchanged
+    object is walked but not hashed again, so only the changed parts of an
+    article are hashed. memo holds the fingerprints already checked during
+    one comparison, by object id
+    """
+    if memo is None:
+        memo = {}
+    if not is_article_object(value):
+        return state_digest(value_state(value, memo))
+    try:
+        return memo[id(value)]
+    except KeyError:
+        pass
+    state = object_state(value, memo)
+    try:
+        cached_state, digest = FINGERPRINTS[value]
+    except (KeyError, TypeError):
+        cached_state, digest = None, None
+    if cached_state != state:
+        digest = state_digest(state)
+        try:
+            FINGERPRINTS[value] = (state, digest)
+        except TypeError:
+            # an object which cannot be weakly referenced is not cached
+            pass
+    memo[id(value)] = digest
+    return digest
+
+
+def state_digest(state):
+    return hashlib.sha256(repr(state).encode("utf8")).hexdigest()
+
+
+def is_sequence(value):
+    return isinstance(value, tuple) or ea.is_list_value(value)
+
+
+def child_path(path, name):
+    return "%s.%s" % (path, name) if path else name
+
+
+def diff(old_value, new_value, path="", memo=None):
+    """
+    List of the paths of the fields which differ between two articles, or
+    two values containing article objects, such as "contributors[2].surname",
+    a list item or dict key only in one of them is a path of its own, values
+    are compared by fingerprint first so unchanged parts are not walked
+    """
+    if memo is None:
+        memo = {}
+    if old_value is new_value or value_state(old_value, memo) == value_state(
+        new_value, memo
+    ):
+        return []
+    if (
+        is_article_object(old_value)
+        and is_article_object(new_value)
+        and class_name(old_value) == class_name(new_value)
+    ):
+        old_attributes = dict(old_value.attribute_items())
+        new_attributes = dict(new_value.attribute_items())
+        paths = []
+        for name in sorted(set(old_attributes) | set(new_attributes)):
+            if name in IGNORED_ATTRIBUTES:
+                continue
+            if name not in old_attributes or name not in new_attributes:
+                paths.append(child_path(path, name))
+                continue
+            paths += diff(
+                old_attributes.get(name),
+                new_attributes.get(name),
+                child_path(path, name),
+                memo,
+            )
+        return paths
+    if is_sequence(old_value) and is_sequence(new_value):
+        paths = []
+        for index in range(max(len(old_value), len(new_value))):
+            item_path = "%s[%s]" % (path, index)
+            if index >= len(old_value) or index >= len(new_value):
+                paths.append(item_path)
+                continue
+            paths += diff(old_value[index], new_value[index], item_path, memo)
+        return paths
+    if isinstance(old_value, dict) and isinstance(new_value, dict):
+        paths = []
+        for key in sorted(set(old_value) | set(new_value), key=repr):
+            key_path = "%s[%s]" % (path, key)
+            if key not in old_value or key not in new_value:
+                paths.append(key_path)
+                continue
+            paths += diff(old_value.get(key), new_value.get(key), key_path, memo)
+        return paths
+    return [path]
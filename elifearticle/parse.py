@@ -3,19 +3,120 @@ Build article objects by parsing article XML
 """
 
 from __future__ import print_function
-from collections import OrderedDict
+from collections import Counter, OrderedDict, deque
+from collections.abc import Sequence
+import concurrent.futures
+import copy
+import io
+import itertools
+import mmap
+import os
 
 from elifetools import parseJATS as parser
+from elifetools import rawJATS as raw_parser
 from elifetools import utils as eautils
 from elifearticle import article as ea
-from elifearticle import utils
+from elifearticle import parse_lxml, profiling, utils
 
+# number of ref tags iter_refs parses at a time, populate_refs finds the
+# article DOI again for each call
+REF_CHUNK_SIZE = 16
 
-def build_contributors(authors, contrib_type, competing_interests=None):
+# affiliation values from the parser which an Affiliation object is built from
+AFFILIATION_KEYS = ("dept", "institution", "city", "country", "ror", "text")
+
+
+class AffiliationPool:
+    """
+    Affiliation objects keyed by their values from the parser, contributors
+    built with a pool share one object for the same affiliation instead of
+    each building their own, share() does the same for an article built
+    without it. Sharing is opt-in, a change to a shared object is seen by
+    every contributor which has it
+    """
+
+    def __init__(self):
+        self.affiliations = {}
+        # the same affiliations keyed by their class and attribute values
+        self.built_affiliations = {}
+
+    def affiliation(self, aff):
+        "the Affiliation for the parser affiliation values, built the first time"
+        key = tuple(aff.get(name) for name in AFFILIATION_KEYS)
+        affiliation = self.affiliations.get(key)
+        if affiliation is None:
+            affiliation = self.built_affiliation(build_affiliation(aff))
+            self.affiliations[key] = affiliation
+        return affiliation
+
+    def built_affiliation(self, affiliation):
+        "the pool affiliation with the same values as a built affiliation"
+        key = (type(affiliation),) + tuple(affiliation.attribute_items())
+        return self.built_affiliations.setdefault(key, affiliation)
+
+    def share(self, article):
+        """
+        replace the affiliations of the contributors of an article which was
+        not built with the pool, such as one from a cache or a worker process,
+        by the pool affiliations with the same values
+        """
+        for review_article in article.review_articles:
+            self.share(review_article)
+        for contributor in itertools.chain(article.contributors, article.editors):
+            contributor.affiliations = [
+                self.built_affiliation(affiliation)
+                for affiliation in contributor.affiliations
+            ]
+        return article
+
+
+def build_affiliation(aff):
+    "build an Affiliation from the parser affiliation values"
+    affiliation = ea.Affiliation()
+    # set individual attributes
+    utils.set_attr_if_value(affiliation, "city", aff.get("city"))
+    utils.set_attr_if_value(affiliation, "country", aff.get("country"))
+    utils.set_attr_if_value(affiliation, "department", aff.get("dept"))
+    utils.set_attr_if_value(affiliation, "institution", aff.get("institution"))
+    utils.set_attr_if_value(affiliation, "ror", aff.get("ror"))
+    # generate text value
+    affiliation.text = utils.text_from_affiliation_elements(
+        aff.get("dept"),
+        aff.get("institution"),
+        aff.get("city"),
+        aff.get("country"),
+    )
+    # fall back if no other fields are set take the text content
+    if affiliation.text == "":
+        affiliation.text = aff.get("text")
+    return affiliation
+
+
+def competing_interest_texts(competing_interests):
+    """
+    Cleaned text of each competing interest which has text, keyed by its id,
+    in the order of the competing interests
+    """
+    texts = {}
+    for competing_interest in competing_interests or []:
+        if competing_interest.get("text"):
+            texts.setdefault(competing_interest.get("id"), []).append(
+                utils.remove_tag("p", competing_interest.get("text"))
+            )
+    return texts
+
+
+def build_contributors(
+    authors, contrib_type, competing_interests=None, affiliation_pool=None
+):
     """
     Given a list of authors from the parser, instantiate contributors
     objects and build them
+    contributors share the affiliations from affiliation_pool, if it is
+    given, otherwise each contributor has its own affiliation objects
     """
+    # the text of each competing interest is cleaned once, when it is first needed
+    conflict_texts = None
 
     contributors = []
 
@@ -52,24 +153,10 @@ def build_contributors(authors, contrib_type, competing_interests=None):
 
         # Add contributor affiliations
         for aff in author.get("affiliations", []):
-            affiliation = ea.Affiliation()
-            # set individual attributes
-            utils.set_attr_if_value(affiliation, "city", aff.get("city"))
-            utils.set_attr_if_value(affiliation, "country", aff.get("country"))
-            utils.set_attr_if_value(affiliation, "department", aff.get("dept"))
-            utils.set_attr_if_value(affiliation, "institution", aff.get("institution"))
-            utils.set_attr_if_value(affiliation, "ror", aff.get("ror"))
-            # generate text value
-            affiliation.text = utils.text_from_affiliation_elements(
-                aff.get("dept"),
-                aff.get("institution"),
-                aff.get("city"),
-                aff.get("country"),
-            )
-            # fall back if no other fields are set take the text content
-            if affiliation.text == "":
-                affiliation.text = aff.get("text")
-            contributor.set_affiliation(affiliation)
+            if affiliation_pool is not None:
+                contributor.set_affiliation(affiliation_pool.affiliation(aff))
+            else:
+                contributor.set_affiliation(build_affiliation(aff))
 
         # competing interests / conflicts
         if (
@@ -77,16 +164,11 @@ def build_contributors(authors, contrib_type, competing_interests=None):
             and author.get("references")
             and "competing-interest" in author.get("references")
         ):
+            if conflict_texts is None:
+                conflict_texts = competing_interest_texts(competing_interests)
             for ref_id in author["references"]["competing-interest"]:
-                for competing_interest in competing_interests:
-                    if (
-                        competing_interest.get("text")
-                        and competing_interest.get("id") == ref_id
-                    ):
-                        clean_text = utils.remove_tag(
-                            "p", competing_interest.get("text")
-                        )
-                        contributor.set_conflict(clean_text)
+                for clean_text in conflict_texts.get(ref_id, []):
+                    contributor.set_conflict(clean_text)
 
         # Finally add the contributor to the list
         if contributor:
@@ -95,6 +177,25 @@ def build_contributors(authors, contrib_type, competing_interests=None):
     return contributors
 
 
+def group_contributors(contributors, contrib_type_groups):
+    """
+    Group parsed contributors by type in one pass, contrib_type_groups maps
+    each group name to the contributor types in the group, contributors of
+    other types are left out, each group keeps the document order
+    """
+    group_names = {
+        contrib_type: group_name
+        for group_name, contrib_types in contrib_type_groups.items()
+        for contrib_type in contrib_types
+    }
+    groups = OrderedDict((group_name, []) for group_name in contrib_type_groups)
+    for contributor in contributors:
+        group_name = group_names.get(contributor.get("type"))
+        if group_name is not None:
+            groups[group_name].append(contributor)
+    return groups
+
+
 def build_funding(award_groups):
     """
     Given a funding data, format it
@@ -167,8 +268,7 @@ def build_datasets(datasets_json):
                         dataset.add_author(utils.author_name_from_json(author_json))
             # Try to populate the doi attribute if the uri is a doi
             if not dataset.doi and dataset.uri:
-                if dataset.uri != eautils.doi_uri_to_doi(dataset.uri):
-                    dataset.doi = eautils.doi_uri_to_doi(dataset.uri)
+                utils.set_attr_if_value(dataset, "doi", utils.doi_from_uri(dataset.uri))
             datasets.append(dataset)
     return datasets
 
@@ -184,43 +284,85 @@ def build_data_availability(datasets_json):
     return data_availability
 
 
-def build_ref_list(refs):
+# Citation attribute set from the value of each key of a parsed reference, a
+# value which is None is not set, a list of keys is in order of preference and
+# a later key is used if the attribute is still empty
+REF_FIELD_MAP = OrderedDict(
+    [
+        ("publication_type", "publication-type"),
+        ("id", "id"),
+        ("article_title", "full_article_title"),
+        ("source", "source"),
+        ("volume", "volume"),
+        ("issue", "issue"),
+        ("fpage", "fpage"),
+        ("lpage", "lpage"),
+        ("doi", "doi"),
+        ("year", "year"),
+        ("year_iso_8601_date", "year-iso-8601-date"),
+        ("date_in_citation", "date-in-citation"),
+        ("elocation_id", "elocation-id"),
+        ("uri", ["uri", "uri_text"]),
+        ("pmid", "pmid"),
+        ("isbn", "isbn"),
+        ("accession", "accession"),
+        ("patent", "patent"),
+        ("country", "country"),
+        ("publisher_loc", "publisher_loc"),
+        ("publisher_name", "publisher_name"),
+        ("edition", "edition"),
+        ("version", "version"),
+        ("chapter_title", "chapter-title"),
+        ("comment", "comment"),
+        ("data_title", "data-title"),
+        ("conf_name", "conf-name"),
+    ]
+)
+
+# keys of each author of a parsed reference kept in the citation author dict
+REF_AUTHOR_KEYS = ("group-type", "surname", "given-names", "collab")
+
+
+def compile_field_map(field_map):
     """
-    Given parsed references build a list of ref objects
+    Compile a field map to a tuple of the attribute name and key of each
+    field, and a tuple of the attribute name and the fallback keys of the
+    fields which have more than one key
+    """
+    fields = []
+    fallback_fields = []
+    for attr_name, keys in field_map.items():
+        if isinstance(keys, str):
+            fields.append((attr_name, keys))
+        else:
+            fields.append((attr_name, keys[0]))
+            fallback_fields.append((attr_name, tuple(keys[1:])))
+    return tuple(fields), tuple(fallback_fields)
+
+
+def iter_ref_list(refs, field_map=None):
+    """
+    Given parsed references, a list or an iterator, yield a ref object for
+    each one, field_map is the citation attributes to set, REF_FIELD_MAP by
+    default
     """
-    ref_list = []
     if not refs:
-        return ref_list
+        return
+    fields, fallback_fields = compile_field_map(field_map or REF_FIELD_MAP)
     for reference in refs:
         ref = ea.Citation()
-        # Publcation Type
-        utils.set_attr_if_value(
-            ref, "publication_type", reference.get("publication-type")
-        )
-        # id
-        utils.set_attr_if_value(ref, "id", reference.get("id"))
-        # Article title
-        utils.set_attr_if_value(
-            ref, "article_title", reference.get("full_article_title")
-        )
-        # Source
-        utils.set_attr_if_value(ref, "source", reference.get("source"))
-        # Volume
-        utils.set_attr_if_value(ref, "volume", reference.get("volume"))
-        # Issue
-        utils.set_attr_if_value(ref, "issue", reference.get("issue"))
-        # First page
-        utils.set_attr_if_value(ref, "fpage", reference.get("fpage"))
-        # Last page
-        utils.set_attr_if_value(ref, "lpage", reference.get("lpage"))
-        # DOI
-        utils.set_attr_if_value(ref, "doi", reference.get("doi"))
-        # Year
-        utils.set_attr_if_value(ref, "year", reference.get("year"))
-        # Year date in iso 8601 format
-        utils.set_attr_if_value(
-            ref, "year_iso_8601_date", reference.get("year-iso-8601-date")
-        )
+        attributes = ref.__dict__
+        for attr_name, key in fields:
+            value = reference.get(key)
+            if value is not None:
+                attributes[attr_name] = value
+        for attr_name, keys in fallback_fields:
+            for key in keys:
+                if attributes.get(attr_name):
+                    break
+                value = reference.get(key)
+                if value is not None:
+                    attributes[attr_name] = value
         # Can set the year_numeric now
         if ref.year_iso_8601_date is not None:
             # First preference take it from the iso 8601 date, if available
@@ -232,62 +374,106 @@ def build_ref_list(refs):
             # Second preference, use the year value if it is entirely numeric
             if utils.is_year_numeric(ref.year):
                 ref.year_numeric = ref.year
-        # date-in-citation
-        utils.set_attr_if_value(
-            ref, "date_in_citation", reference.get("date-in-citation")
-        )
-        # elocation-id
-        utils.set_attr_if_value(ref, "elocation_id", reference.get("elocation-id"))
-        # uri
-        utils.set_attr_if_value(ref, "uri", reference.get("uri"))
-        if not ref.uri:
-            # take uri value from uri_text
-            utils.set_attr_if_value(ref, "uri", reference.get("uri_text"))
-        # pmid
-        utils.set_attr_if_value(ref, "pmid", reference.get("pmid"))
-        # isbn
-        utils.set_attr_if_value(ref, "isbn", reference.get("isbn"))
-        # accession
-        utils.set_attr_if_value(ref, "accession", reference.get("accession"))
-        # patent
-        utils.set_attr_if_value(ref, "patent", reference.get("patent"))
-        # patent country
-        utils.set_attr_if_value(ref, "country", reference.get("country"))
-        # publisher-loc
-        utils.set_attr_if_value(ref, "publisher_loc", reference.get("publisher_loc"))
-        # publisher-name
-        utils.set_attr_if_value(ref, "publisher_name", reference.get("publisher_name"))
-        # edition
-        utils.set_attr_if_value(ref, "edition", reference.get("edition"))
-        # version
-        utils.set_attr_if_value(ref, "version", reference.get("version"))
-        # chapter-title
-        utils.set_attr_if_value(ref, "chapter_title", reference.get("chapter-title"))
-        # comment
-        utils.set_attr_if_value(ref, "comment", reference.get("comment"))
-        # data-title
-        utils.set_attr_if_value(ref, "data_title", reference.get("data-title"))
-        # conf-name
-        utils.set_attr_if_value(ref, "conf_name", reference.get("conf-name"))
         # Authors
-        if reference.get("authors"):
-            for author in reference.get("authors"):
-                ref_author = {}
-                eautils.set_if_value(ref_author, "group-type", author.get("group-type"))
-                eautils.set_if_value(ref_author, "surname", author.get("surname"))
-                eautils.set_if_value(
-                    ref_author, "given-names", author.get("given-names")
-                )
-                eautils.set_if_value(ref_author, "collab", author.get("collab"))
-                if ref_author:
-                    ref.add_author(ref_author)
+        for author in reference.get("authors") or []:
+            ref_author = {}
+            for key in REF_AUTHOR_KEYS:
+                value = author.get(key)
+                if value is not None:
+                    ref_author[key] = value
+            if ref_author:
+                ref.add_author(ref_author)
         # Try to populate the doi attribute if the uri is a doi
         if not ref.doi and ref.uri:
-            if ref.uri != eautils.doi_uri_to_doi(ref.uri):
-                ref.doi = eautils.doi_uri_to_doi(ref.uri)
-        # Append the reference to the list
-        ref_list.append(ref)
-    return ref_list
+            utils.set_attr_if_value(ref, "doi", utils.doi_from_uri(ref.uri))
+        yield ref
+
+
+def iter_data_ref_list(data_refs, field_map=None):
+    "Given parsed data references yield a ref object for each one"
+    return iter_ref_list(data_refs, field_map)
+
+
+def build_ref_list(refs, field_map=None):
+    """
+    Given parsed references build a list of ref objects, field_map is the
+    citation attributes to set, REF_FIELD_MAP by default
+    """
+    return list(iter_ref_list(refs, field_map))
+
+
+def iter_refs(soup):
+    """
+    parsed references, the same as parser.refs returns, parsed REF_CHUNK_SIZE
+    ref tags at a time when the previous references have been used
+    """
+    tags = raw_parser.ref_list(soup)
+    position = 0
+    for start in range(0, len(tags), REF_CHUNK_SIZE):
+        refs = parser.populate_refs(soup, tags[start : start + REF_CHUNK_SIZE])
+        for ref in refs:
+            # positions of the chunk start from 1, continue those of the last one
+            ref["position"] = position + ref["position"]
+        if refs:
+            position = refs[-1]["position"]
+        yield from refs
+
+
+def iter_data_refs(soup):
+    "parsed data references, parsed when the first one is used"
+    yield from parser.data_refs(soup) or []
+
+
+class LazySequence(Sequence):
+    """
+    Sequence of the items of an iterator which is only consumed as far as
+    the items which have been read, the items read are kept, it is pickled
+    as a list of all the items
+    """
+
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.items = []
+
+    def consume(self, count=None):
+        "read items from the iterator until there are count items or it is used up"
+        while self.iterator is not None and (count is None or len(self.items) < count):
+            try:
+                self.items.append(next(self.iterator))
+            except StopIteration:
+                self.iterator = None
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and index >= 0:
+            self.consume(index + 1)
+        else:
+            self.consume()
+        return self.items[index]
+
+    def __len__(self):
+        self.consume()
+        return len(self.items)
+
+    def __iter__(self):
+        position = 0
+        while True:
+            self.consume(position + 1)
+            if position >= len(self.items):
+                return
+            yield self.items[position]
+            position += 1
+
+    def __eq__(self, other):
+        if isinstance(other, (LazySequence, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        self.consume()
+        return repr(self.items)
+
+    def __reduce__(self):
+        return (list, (list(self),))
 
 
 def component_title(component):
@@ -318,9 +504,11 @@ def component_title(component):
     return title
 
 
-def build_components(components):
+def build_components(components, remove_tags=None):
     """
     Given parsed components build a list of component objects
+    remove_tags is a list of tag names or a utils.TagCleaner to remove from
+    the subtitles, the clean_abstract default tags if it is None
     """
     component_list = []
 
@@ -347,7 +535,7 @@ def build_components(components):
 
             if comp.get("full_caption"):
                 subtitle = comp.get("full_caption")
-                subtitle = clean_abstract(subtitle)
+                subtitle = clean_abstract(subtitle, remove_tags)
                 component.subtitle = subtitle
 
         # Mime type
@@ -376,7 +564,7 @@ def build_components(components):
     return component_list
 
 
-def build_review_articles(sub_articles):
+def build_review_articles(sub_articles, affiliation_pool=None):
     """populate an article review_articles property with data from sub_articles"""
     article_list = []
     for sub_article in sub_articles:
@@ -385,11 +573,14 @@ def build_review_articles(sub_articles):
             article, "article_type", sub_article.get("article_type")
         )
         utils.set_attr_if_value(article, "id", sub_article.get("id"))
-        # contributors
+        # contributors, built in a batch for each run of the same type
         if sub_article.get("contributors"):
-            for contributor in sub_article.get("contributors"):
+            for contrib_type, contributors in itertools.groupby(
+                sub_article.get("contributors"),
+                key=lambda contributor: contributor.get("type"),
+            ):
                 article.contributors += build_contributors(
-                    [contributor], contributor.get("type")
+                    list(contributors), contrib_type, None, affiliation_pool
                 )
         # related objects
         if sub_article.get("related_objects"):
@@ -490,8 +681,7 @@ def build_preprint(pub_history_events):
         if event.get("event_type") == "preprint":
             preprint.uri = event.get("uri")
             # Try to populate the doi attribute if the uri is a doi
-            if preprint.uri and preprint.uri != eautils.doi_uri_to_doi(preprint.uri):
-                preprint.doi = eautils.doi_uri_to_doi(preprint.uri)
+            utils.set_attr_if_value(preprint, "doi", utils.doi_from_uri(preprint.uri))
             break
     if preprint.uri or preprint.doi:
         return preprint
@@ -504,10 +694,9 @@ def build_publication_history(pub_history_events):
         event_object = ea.Event()
         event_object.uri = event.get("uri")
         # Try to populate the doi attribute if the uri is a doi
-        if event_object.uri and event_object.uri != eautils.doi_uri_to_doi(
-            event_object.uri
-        ):
-            event_object.doi = eautils.doi_uri_to_doi(event_object.uri)
+        utils.set_attr_if_value(
+            event_object, "doi", utils.doi_from_uri(event_object.uri)
+        )
         # more Event properties
         event_object.event_type = event.get("event_type")
         event_object.event_desc = event.get("event_desc")
@@ -540,17 +729,22 @@ def build_clinical_trials(clinical_trials):
     return clinical_trial_list
 
 
+# tags removed from an abstract when no remove_tags are given
+DEFAULT_REMOVE_TAGS = ("xref", "ext-link", "inline-formula", "mml:*")
+
+DEFAULT_TAG_CLEANER = utils.TagCleaner(DEFAULT_REMOVE_TAGS)
+
+
 def clean_abstract(abstract, remove_tags=None):
     """
     Remove unwanted tags from abstract string,
     parsing it as HTML, then only keep the body paragraph contents
+    remove_tags is a list of tag names or a utils.TagCleaner, the tags are
+    removed in one pass
     """
     if remove_tags is None:
-        remove_tags = ["xref", "ext-link", "inline-formula", "mml:*"]
-    if remove_tags:
-        for tag_name in remove_tags:
-            abstract = utils.remove_tag(tag_name, abstract)
-    return abstract
+        return DEFAULT_TAG_CLEANER.clean(abstract)
+    return utils.tag_cleaner(remove_tags).clean(abstract)
 
 
 def build_part_check(part, build_parts):
@@ -563,235 +757,972 @@ def build_part_check(part, build_parts):
     return bool(part in build_parts)
 
 
-def build_article_from_xml(
-    article_xml_filename, detail="brief", build_parts=None, remove_tags=None
-):
-    """
-    Parse JATS XML with elifetools parser, and populate an
-    eLifePOA article object
-    Basic data crossref needs: article_id, doi, title, contributors with names set
-    detail="brief" is normally enough,
-    detail="full" will populate all the contributor affiliations that are linked by xref tags
-    """
-
-    def build_part(part):
-        return build_part_check(part, build_parts)
-
-    error_count = 0
-
-    soup = parser.parse_document(article_xml_filename)
+# parser functions which only match tags inside article-meta, they will find
+# the same values searching the front tag instead of the whole document
+FRONT_PARSER_FUNCTIONS = (
+    "clinical_trials",
+    "copyright_statement",
+    "doi",
+    "elocation_id",
+    "issue",
+    "license_url",
+    "publisher_id",
+    "related_article",
+    "version_doi",
+)
 
-    # Get DOI
-    doi = parser.doi(soup)
 
-    # Create the article object
-    article = ea.Article(doi, title=None)
+class ParsedDocument:
+    """
+    Parsed article XML and its top level partitions, the front, body, back
+    and sub-article tags, found in one pass over the article tag children
+    Parser results are cached so each parser call runs once per document,
+    parser_calls counts how many times each call actually ran
+    Contributors built from the document share affiliations from
+    affiliation_pool, if one is set
+    """
 
-    # article version from the filename if possible
-    utils.set_attr_if_value(
-        article, "version", utils.version_from_xml_filename(article_xml_filename)
-    )
+    def __init__(self, soup):
+        self.soup = soup
+        self.parser_results = {}
+        self.parser_calls = Counter()
+        self.affiliation_pool = None
+        self.lazy_references = False
+        self.front = None
+        self.body = None
+        self.back = None
+        self.sub_articles = []
+        article_tag = soup.find("article", recursive=False)
+        if article_tag:
+            for tag in article_tag.children:
+                if tag.name in ["front", "body", "back"]:
+                    setattr(self, tag.name, tag)
+                elif tag.name == "sub-article":
+                    self.sub_articles.append(tag)
+
+    def parse(self, function, *args):
+        """
+        call the parser function on the soup, or on only the front tag for
+        those parser functions which never look outside of it, the result
+        is returned from the cache if the same call was already made
+        """
+        name = utils.parser_function_name(function)
+        key = (name,) + args
+        if key not in self.parser_results:
+            scope = self.soup
+            if self.front is not None and name in FRONT_PARSER_FUNCTIONS:
+                scope = self.front
+            self.parser_results[key] = function(scope, *args)
+            self.parser_calls[key] += 1
+        return self.parser_results[key]
+
+    def iterate(self, function, *args):
+        """
+        call a parser function which returns an iterator on the soup, the
+        result is not cached since it can only be read once
+        """
+        self.parser_calls[(utils.parser_function_name(function),) + args] += 1
+        return function(self.soup, *args)
+
+
+class LxmlDocument:
+    """
+    Article XML parsed with lxml, parser functions which have an equivalent in
+    parse_lxml are answered from the lxml tree, other parser functions are
+    passed to a ParsedDocument which parses the XML with BeautifulSoup only
+    when it is first needed
+    """
 
+    def __init__(self, xml):
+        self.xml = xml
+        self.root = parse_lxml.parse_xml(xml)
+        self.serialisable = self.root is not None and (
+            parse_lxml.serialisable_document(xml, self.root)
+        )
+        self.parser_results = {}
+        self.parser_calls = Counter()
+        self.affiliation_pool = None
+        self.lazy_references = False
+        self.soup_document = None
+        # the lxml function of each parser function name, None if it is not used
+        self.lxml_functions = {}
+
+    def get_soup_document(self):
+        "the BeautifulSoup parsed document, parsing the XML the first time"
+        if self.soup_document is None:
+            self.soup_document = ParsedDocument(parse_soup(self.xml))
+        return self.soup_document
+
+    def lxml_function(self, function):
+        """
+        the lxml equivalent of the parser function if it can be used, checked
+        once for each parser function
+        """
+        name = utils.parser_function_name(function)
+        if name not in self.lxml_functions:
+            lxml_function = None
+            if self.root is not None and parse_lxml.supported(
+                self.root, name, self.serialisable
+            ):
+                lxml_function = parse_lxml.PARSER_FUNCTIONS.get(name)
+            self.lxml_functions[name] = lxml_function
+        return self.lxml_functions[name]
+
+    def parse(self, function, *args):
+        """
+        call the lxml equivalent of the parser function, otherwise call the
+        parser function on the BeautifulSoup document, results are cached
+        """
+        key = (utils.parser_function_name(function),) + args
+        if key in self.parser_results:
+            return self.parser_results[key]
+        lxml_function = self.lxml_function(function)
+        if not lxml_function:
+            return self.get_soup_document().parse(function, *args)
+        self.parser_results[key] = lxml_function(self.root, *args)
+        self.parser_calls[key] += 1
+        return self.parser_results[key]
+
+    def iterate(self, function, *args):
+        """
+        call the lxml equivalent of a parser function which returns an
+        iterator, otherwise call it on the BeautifulSoup document
+        """
+        lxml_function = self.lxml_function(function)
+        if not lxml_function:
+            return self.get_soup_document().iterate(function, *args)
+        self.parser_calls[(utils.parser_function_name(function),) + args] += 1
+        return lxml_function(self.root, *args)
+
+
+def build_article_basic(article, document, detail=None, remove_tags=None):
+    "set the basic article values"
     # version doi
-    if build_part("basic"):
-        article.version_doi = parser.version_doi(soup)
+    article.version_doi = document.parse(parser.version_doi)
 
     # journal title
-    if build_part("basic"):
-        article.journal_title = parser.journal_title(soup)
+    article.journal_title = document.parse(parser.journal_title)
 
     # issn
-    if build_part("basic"):
-        article.journal_issn = parser.journal_issn(soup, "electronic")
-        if article.journal_issn is None:
-            article.journal_issn = parser.journal_issn(soup)
-
-    # Related articles
-    if build_part("related_articles"):
-        article.related_articles = build_related_articles(parser.related_article(soup))
+    article.journal_issn = document.parse(parser.journal_issn, "electronic")
+    if article.journal_issn is None:
+        article.journal_issn = document.parse(parser.journal_issn)
 
     # Get publisher_id pii
-    if build_part("basic"):
-        article.pii = parser.publisher_id(soup)
+    article.pii = document.parse(parser.publisher_id)
 
     # set object manuscript value
-    if build_part("basic"):
-        manuscript = parser.publisher_id(soup)
-        if not manuscript and doi:
-            # try to get it from the DOI
-            manuscript = doi.split(".")[-1]
-        article.manuscript = manuscript
+    manuscript = document.parse(parser.publisher_id)
+    if not manuscript and article.doi:
+        # try to get it from the DOI
+        manuscript = article.doi.split(".")[-1]
+    article.manuscript = manuscript
 
     # Set the articleType
-    if build_part("basic"):
-        article_type = parser.article_type(soup)
-        if article_type:
-            article.article_type = article_type
+    article_type = document.parse(parser.article_type)
+    if article_type:
+        article.article_type = article_type
 
     # Set the publication_state
-    if build_part("basic"):
-        article.publication_state = parser.publication_state(soup)
+    article.publication_state = document.parse(parser.publication_state)
 
     # title
-    if build_part("basic"):
-        article.title = parser.full_title(soup)
-    # print article.title
-
-    # publisher_name
-    if build_part("basic"):
-        article.publisher_name = parser.publisher(soup)
+    article.title = document.parse(parser.full_title)
 
     # publisher_name
-    if build_part("basic"):
-        article.clinical_trials = build_clinical_trials(parser.clinical_trials(soup))
-
-    # abstract
-    if build_part("abstract"):
-        article.abstract = clean_abstract(parser.full_abstract(soup), remove_tags)
-        article.abstract_json = parser.abstract_json(soup)
-        article.abstract_xml = parser.abstract_xml(soup)
+    article.publisher_name = document.parse(parser.publisher)
 
-    # digest
-    if build_part("abstract"):
-        article.digest = clean_abstract(parser.full_digest(soup), remove_tags)
+    # clinical trials
+    article.clinical_trials = build_clinical_trials(
+        document.parse(parser.clinical_trials)
+    )
 
     # elocation-id
-    if build_part("basic"):
-        article.elocation_id = parser.elocation_id(soup)
+    article.elocation_id = document.parse(parser.elocation_id)
 
     # issue
-    if build_part("basic"):
-        article.issue = parser.issue(soup)
+    article.issue = document.parse(parser.issue)
 
     # self-uri
-    if build_part("basic"):
-        article.self_uri_list = build_self_uri_list(parser.self_uri(soup))
+    article.self_uri_list = build_self_uri_list(document.parse(parser.self_uri))
 
     # preprint
-    if build_part("basic"):
-        article.preprint = build_preprint(parser.pub_history(soup))
+    article.preprint = build_preprint(document.parse(parser.pub_history))
 
     # publication history events
-    if build_part("basic"):
-        article.publication_history = build_publication_history(
-            parser.pub_history(soup)
-        )
+    article.publication_history = build_publication_history(
+        document.parse(parser.pub_history)
+    )
 
-    # contributors
-    if build_part("contributors"):
-        # get the competing interests if available
-        competing_interests = parser.competing_interests(soup, None)
-        all_contributors = parser.contributors(soup, detail)
-        author_contributors = [
-            con
-            for con in all_contributors
-            if con.get("type") in ["author", "on-behalf-of"]
-        ]
-        contrib_type = "author"
-        contributors = build_contributors(
-            author_contributors, contrib_type, competing_interests
+
+def build_article_related_articles(article, document, detail=None, remove_tags=None):
+    "set the article related articles"
+    article.related_articles = build_related_articles(
+        document.parse(parser.related_article)
+    )
+
+
+def build_article_abstract(article, document, detail=None, remove_tags=None):
+    "set the article abstract and digest"
+    article.abstract = clean_abstract(document.parse(parser.full_abstract), remove_tags)
+    article.abstract_json = document.parse(parser.abstract_json)
+    article.abstract_xml = document.parse(parser.abstract_xml)
+
+    # digest
+    article.digest = clean_abstract(document.parse(parser.full_digest), remove_tags)
+
+
+# types of the parsed contributors built as the article contributors
+AUTHOR_CONTRIB_TYPES = ["author", "on-behalf-of"]
+
+# types of the parsed contributors built as the article editors, in order
+EDITOR_CONTRIB_TYPES = ["assoc_ed", "editor", "reviewer", "senior_editor"]
+
+
+def build_article_contributors(article, document, detail=None, remove_tags=None):
+    "set the article contributors and editors"
+    # get the competing interests if available
+    competing_interests = document.parse(parser.competing_interests, None)
+    all_contributors = document.parse(parser.contributors, detail)
+    contrib_type_groups = OrderedDict([("author", AUTHOR_CONTRIB_TYPES)])
+    for contrib_type in EDITOR_CONTRIB_TYPES:
+        contrib_type_groups[contrib_type] = [contrib_type]
+    contributor_groups = group_contributors(all_contributors, contrib_type_groups)
+    contrib_type = "author"
+    contributors = build_contributors(
+        contributor_groups.get("author"),
+        contrib_type,
+        competing_interests,
+        document.affiliation_pool,
+    )
+
+    contrib_type = "author non-byline"
+    authors = document.parse(parser.authors_non_byline, detail)
+    contributors_non_byline = build_contributors(
+        authors, contrib_type, competing_interests, document.affiliation_pool
+    )
+    article.contributors = contributors + contributors_non_byline
+
+    # also populate the editors when contributors flag is being built
+    for contrib_type in EDITOR_CONTRIB_TYPES:
+        article.editors += build_contributors(
+            contributor_groups.get(contrib_type),
+            contrib_type,
+            None,
+            document.affiliation_pool,
         )
 
-        contrib_type = "author non-byline"
-        authors = parser.authors_non_byline(soup, detail)
-        contributors_non_byline = build_contributors(
-            authors, contrib_type, competing_interests
+
+def build_article_license(article, document, detail=None, remove_tags=None):
+    "set the article license"
+    license_object = ea.License()
+    license_object.href = document.parse(parser.license_url)
+    license_object.copyright_statement = document.parse(parser.copyright_statement)
+    article.license = license_object
+
+
+def build_article_categories(article, document, detail=None, remove_tags=None):
+    "set the article categories and display channel"
+    article.article_categories = document.parse(parser.category)
+
+    # display channel
+    article.display_channel = eautils.firstnn(document.parse(parser.display_channel))
+
+
+def build_article_keywords(article, document, detail=None, remove_tags=None):
+    "set the article keywords"
+    article.author_keywords = document.parse(parser.keywords)
+
+
+def build_article_research_organisms(article, document, detail=None, remove_tags=None):
+    "set the article research organisms"
+    article.research_organisms = document.parse(parser.research_organism)
+
+
+def build_article_funding(article, document, detail=None, remove_tags=None):
+    "set the article funding awards"
+    article.funding_awards = build_funding(document.parse(parser.full_award_groups))
+
+
+def build_article_datasets(article, document, detail=None, remove_tags=None):
+    "set the article datasets and data availability"
+    datasets_json = document.parse(parser.datasets_json)
+    article.datasets = build_datasets(datasets_json)
+    article.data_availability = build_data_availability(datasets_json)
+
+
+def build_article_references(article, document, detail=None, remove_tags=None):
+    "set the article references or citations"
+    if document.lazy_references:
+        # each reference is parsed and built when it is first read
+        article.ref_list = LazySequence(iter_ref_list(document.iterate(iter_refs)))
+        article.data_ref_list = LazySequence(
+            iter_data_ref_list(document.iterate(iter_data_refs))
         )
-        article.contributors = contributors + contributors_non_byline
+        return
+    article.ref_list = build_ref_list(document.parse(parser.refs))
+    article.data_ref_list = build_ref_list(document.parse(parser.data_refs))
+
+
+def build_article_components(article, document, detail=None, remove_tags=None):
+    "set the article components with component DOI"
+    article.component_list = build_components(document.parse(parser.components))
+
+
+def build_article_history(article, document, detail=None, remove_tags=None):
+    "add the article history dates"
+    date_types = ["received", "accepted", "sent-for-review"]
+    for date_type in date_types:
+        history_date = document.parse(parser.history_date, date_type)
+        if history_date:
+            date_instance = ea.ArticleDate(date_type, history_date)
+            article.add_date(date_instance)
+
+
+def build_article_pub_dates(article, document, detail=None, remove_tags=None):
+    "add the article pub dates"
+    build_pub_dates(article, document.parse(parser.pub_dates))
+
+
+def build_article_volume(article, document, detail=None, remove_tags=None):
+    "set the volume if present"
+    volume = document.parse(parser.volume)
+    if volume:
+        article.volume = volume
+
+
+def build_article_is_poa(article, document, detail=None, remove_tags=None):
+    "set whether the article is POA"
+    article.is_poa = document.parse(parser.is_poa)
+
+
+def build_article_sub_articles(article, document, detail=None, remove_tags=None):
+    "set the peer review articles"
+    article.review_articles = build_review_articles(
+        document.parse(parser.sub_articles), document.affiliation_pool
+    )
+
+
+# functions to build each of the build parts, in the order they are built
+BUILD_PART_FUNCTIONS = OrderedDict(
+    [
+        ("basic", build_article_basic),
+        ("related_articles", build_article_related_articles),
+        ("abstract", build_article_abstract),
+        ("contributors", build_article_contributors),
+        ("license", build_article_license),
+        ("categories", build_article_categories),
+        ("keywords", build_article_keywords),
+        ("research_organisms", build_article_research_organisms),
+        ("funding", build_article_funding),
+        ("datasets", build_article_datasets),
+        ("references", build_article_references),
+        ("components", build_article_components),
+        ("history", build_article_history),
+        ("pub_dates", build_article_pub_dates),
+        ("volume", build_article_volume),
+        ("is_poa", build_article_is_poa),
+        ("sub_articles", build_article_sub_articles),
+    ]
+)
+
+# article attributes set by each of the build parts
+BUILD_PART_ATTRIBUTES = OrderedDict(
+    [
+        (
+            "basic",
+            [
+                "version_doi",
+                "journal_title",
+                "journal_issn",
+                "pii",
+                "manuscript",
+                "article_type",
+                "publication_state",
+                "title",
+                "publisher_name",
+                "clinical_trials",
+                "elocation_id",
+                "issue",
+                "self_uri_list",
+                "preprint",
+                "publication_history",
+            ],
+        ),
+        ("related_articles", ["related_articles"]),
+        ("abstract", ["abstract", "abstract_json", "abstract_xml", "digest"]),
+        ("contributors", ["contributors", "editors"]),
+        ("license", ["license"]),
+        ("categories", ["article_categories", "display_channel"]),
+        ("keywords", ["author_keywords"]),
+        ("research_organisms", ["research_organisms"]),
+        ("funding", ["funding_awards"]),
+        ("datasets", ["datasets", "data_availability"]),
+        ("references", ["ref_list", "data_ref_list"]),
+        ("components", ["component_list"]),
+        ("history", ["dates"]),
+        ("pub_dates", ["dates"]),
+        ("volume", ["volume"]),
+        ("is_poa", ["is_poa"]),
+        ("sub_articles", ["review_articles"]),
+    ]
+)
+
+
+# article sections, from parse_lxml.section_hashes, each build part reads,
+# the sections where eLife JATS puts the tags its parser functions look for
+BUILD_PART_SECTIONS = OrderedDict(
+    [
+        ("basic", ["front", "sub_articles"]),
+        ("related_articles", ["front"]),
+        ("abstract", ["front", "sub_articles"]),
+        ("contributors", ["front", "back"]),
+        ("license", ["front"]),
+        ("categories", ["front", "sub_articles"]),
+        ("keywords", ["front", "sub_articles"]),
+        ("research_organisms", ["front", "sub_articles"]),
+        ("funding", ["front"]),
+        ("datasets", ["back"]),
+        ("references", ["back", "sub_articles"]),
+        ("components", ["front", "body", "back", "sub_articles"]),
+        ("history", ["front"]),
+        ("pub_dates", ["front", "sub_articles"]),
+        ("volume", ["front", "back", "sub_articles"]),
+        ("is_poa", ["body"]),
+        # sub-articles also read the title, DOI, type and license of the parent
+        ("sub_articles", ["front", "sub_articles"]),
+    ]
+)
+
+
+def changed_build_parts(parts, section_hashes, previous_section_hashes):
+    """
+    the build parts which read a section that changed, all of the parts if
+    the hashes are missing or if the rest of the article changed, along with
+    any other parts which set the same attributes as a changed part
+    """
+    if (
+        not section_hashes
+        or not previous_section_hashes
+        or section_hashes.get("article") != previous_section_hashes.get("article")
+    ):
+        return list(parts)
+    changed_sections = [
+        section
+        for section, section_hash in section_hashes.items()
+        if previous_section_hashes.get(section) != section_hash
+    ]
+    changed_attributes = set()
+    for part in parts:
+        if set(BUILD_PART_SECTIONS.get(part)).intersection(changed_sections):
+            changed_attributes.update(BUILD_PART_ATTRIBUTES.get(part))
+    return [
+        part
+        for part in parts
+        if changed_attributes.intersection(BUILD_PART_ATTRIBUTES.get(part))
+    ]
+
+
+class LazyPartAttribute:
+    """
+    Descriptor for an article attribute set by build parts, the build parts
+    are built the first time the attribute is read or set
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        obj.build_unbuilt_parts(self.name)
+        return obj.__dict__[self.name]
+
+    def __set__(self, obj, value):
+        # build the parts first so they do not overwrite the value later
+        obj.build_unbuilt_parts(self.name)
+        obj.__dict__[self.name] = value
+
 
-        # also populate the editors when contributors flag is being built
-        editor_contrib_types = ["assoc_ed", "editor", "reviewer", "senior_editor"]
-        for contrib_type in editor_contrib_types:
-            editor_contributors = [
-                con for con in all_contributors if con.get("type") == contrib_type
+class LazyArticle(ea.Article):
+    """
+    Article which keeps the parsed document and builds each build part the
+    first time one of its attributes is read, the document is released when
+    all the parts are built or when close() is called, it is pickled as an
+    Article with every part built
+    """
+
+    # attributes used for building the parts, which are not article values
+    build_attribute_names = ("unbuilt_parts", "document", "detail", "remove_tags")
+
+    def __init__(
+        self, document, doi=None, build_parts=None, detail="brief", remove_tags=None
+    ):
+        self.unbuilt_parts = []
+        super().__init__(doi, title=None)
+        self.document = document
+        self.detail = detail
+        self.remove_tags = remove_tags
+        self.unbuilt_parts = [
+            part for part in BUILD_PART_FUNCTIONS if build_part_check(part, build_parts)
+        ]
+
+    def build_unbuilt_parts(self, attribute_name):
+        "build the unbuilt parts which set the attribute"
+        self.build_parts(
+            [
+                part
+                for part in self.unbuilt_parts
+                if attribute_name in BUILD_PART_ATTRIBUTES.get(part)
             ]
-            article.editors += build_contributors(editor_contributors, contrib_type)
+        )
 
-    # license href
-    if build_part("license"):
-        license_object = ea.License()
-        license_object.href = parser.license_url(soup)
-        license_object.copyright_statement = parser.copyright_statement(soup)
-        article.license = license_object
+    def build_parts(self, parts):
+        "build the parts in the order of BUILD_PART_FUNCTIONS if they are not built yet"
+        parts = [part for part in self.unbuilt_parts if part in parts]
+        if not parts:
+            return
+        # mark the parts as built first, otherwise parts setting the same
+        # attribute, such as dates, will build each other out of order
+        for part in parts:
+            self.unbuilt_parts.remove(part)
+        document = self.document
+        for part in parts:
+            BUILD_PART_FUNCTIONS.get(part)(
+                self, document, self.detail, self.remove_tags
+            )
+        if not self.unbuilt_parts:
+            self.close()
+
+    def build_all_parts(self):
+        "build every part which is not built yet"
+        self.build_parts(list(self.unbuilt_parts))
+
+    def close(self):
+        """
+        release the parsed document, any parts not yet built will not be built
+        and their attributes keep the default values
+        """
+        self.document = None
+        self.unbuilt_parts = []
+
+    def attribute_items(self):
+        "name and value of each article attribute, after building every part"
+        self.build_all_parts()
+        return [
+            (name, value)
+            for name, value in self.__dict__.items()
+            if name not in self.build_attribute_names
+        ]
 
-    # article_category
-    if build_part("categories"):
-        article.article_categories = parser.category(soup)
+    def built_article(self):
+        "Article with the attributes of this article, after building every part"
+        article = ea.Article.__new__(ea.Article)
+        article.__dict__.update(self.attribute_items())
+        return article
 
-    # display channel
-    if build_part("categories"):
-        article.display_channel = eautils.firstnn(parser.display_channel(soup))
-
-    # keywords
-    if build_part("keywords"):
-        article.author_keywords = parser.keywords(soup)
-
-    # research organisms
-    if build_part("research_organisms"):
-        article.research_organisms = parser.research_organism(soup)
-
-    # funding awards
-    if build_part("funding"):
-        article.funding_awards = build_funding(parser.full_award_groups(soup))
-
-    # datasets
-    if build_part("datasets"):
-        datasets_json = parser.datasets_json(soup)
-        article.datasets = build_datasets(datasets_json)
-        article.data_availability = build_data_availability(datasets_json)
-
-    # references or citations
-    if build_part("references"):
-        article.ref_list = build_ref_list(parser.refs(soup))
-        article.data_ref_list = build_ref_list(parser.data_refs(soup))
-
-    # components with component DOI
-    if build_part("components"):
-        article.component_list = build_components(parser.components(soup))
-
-    # History dates
-    if build_part("history"):
-        date_types = ["received", "accepted", "sent-for-review"]
-        for date_type in date_types:
-            history_date = parser.history_date(soup, date_type)
-            if history_date:
-                date_instance = ea.ArticleDate(date_type, history_date)
-                article.add_date(date_instance)
-
-    # Pub date
-    if build_part("pub_dates"):
-        build_pub_dates(article, parser.pub_dates(soup))
-
-    # Set the volume if present
-    if build_part("volume"):
-        volume = parser.volume(soup)
-        if volume:
-            article.volume = volume
-
-    if build_part("is_poa"):
-        article.is_poa = parser.is_poa(soup)
-
-    # peer review articles
-    if build_part("sub_articles"):
-        article.review_articles = build_review_articles(parser.sub_articles(soup))
+    def __reduce__(self):
+        # the parsed document cannot be pickled, pickle the built article instead
+        return unpickle_article, (self.built_article().__getstate__(),)
+
+    def __copy__(self):
+        return self.built_article()
+
+    def __deepcopy__(self, memo):
+        article = self.built_article()
+        memo[id(self)] = article
+        for name, value in article.__dict__.items():
+            article.__dict__[name] = copy.deepcopy(value, memo)
+        return article
+
+
+def unpickle_article(state):
+    "Article with the pickled state of a LazyArticle"
+    article = ea.Article.__new__(ea.Article)
+    article.__setstate__(state)
+    return article
+
+
+for lazy_attribute_name in sorted(
+    {name for names in BUILD_PART_ATTRIBUTES.values() for name in names}
+):
+    setattr(LazyArticle, lazy_attribute_name, LazyPartAttribute(lazy_attribute_name))
+
+
+def is_xml_filename(article_xml):
+    "True if the article XML argument is a filename rather than the XML itself"
+    return isinstance(article_xml, (str, os.PathLike))
+
+
+def read_article_xml(article_xml):
+    """
+    return the article XML from a filename, a bytes-like object, such as
+    bytes, memoryview or mmap, which is returned without copying it,
+    or a file-like object
+    """
+    if is_xml_filename(article_xml):
+        with open(article_xml, "rb") as open_file:
+            return open_file.read()
+    if hasattr(article_xml, "read") and not isinstance(article_xml, mmap.mmap):
+        return article_xml.read()
+    return article_xml
+
+
+def parse_soup(xml):
+    "parse bytes-like XML with BeautifulSoup, which only accepts bytes or str"
+    if not isinstance(xml, (bytes, str)):
+        xml = bytes(xml)
+    return parser.parse_xml(xml)
+
+
+def article_xml_version(article_xml):
+    "article version from the XML filename, or the name of a file object"
+    if is_xml_filename(article_xml):
+        return utils.version_from_xml_filename(os.fspath(article_xml))
+    name = getattr(article_xml, "name", None)
+    if isinstance(name, str):
+        return utils.version_from_xml_filename(name)
+    return None
+
+
+def parse_article_document(article_xml, engine="beautifulsoup"):
+    "parse the article XML with the engine into a document for the build parts"
+    if engine == "lxml":
+        return LxmlDocument(read_article_xml(article_xml))
+    if is_xml_filename(article_xml):
+        return ParsedDocument(parser.parse_document(article_xml))
+    return ParsedDocument(parse_soup(read_article_xml(article_xml)))
+
+
+def build_article_from_xml(
+    article_xml_filename,
+    detail="brief",
+    build_parts=None,
+    remove_tags=None,
+    engine="beautifulsoup",
+    lazy=False,
+    version=None,
+    cache=None,
+    profile=None,
+    affiliation_pool=None,
+    lazy_references=False,
+):
+    """
+    Parse JATS XML with elifetools parser, and populate an
+    eLifePOA article object
+    article_xml_filename can also be the XML as bytes, memoryview, mmap
+    or a file-like object
+    Basic data crossref needs: article_id, doi, title, contributors with names set
+    detail="brief" is normally enough,
+    detail="full" will populate all the contributor affiliations that are linked by xref tags
+    engine="lxml" will parse the XML with lxml, and with BeautifulSoup only if
+    a build part needs a parser function that has no lxml equivalent
+    lazy=True returns a LazyArticle which builds each part when it is first read
+    version sets the article version, otherwise it comes from the filename
+    cache is an ArticleCache to get the article from, or to add it to after
+    building it, it is not used for a lazy build
+    profile is a profiling.BuildProfile to add the time and the change in
+    allocated memory blocks of parsing the XML, each build part and each
+    parser call to, it is not used for a lazy build
+    affiliation_pool is an AffiliationPool to share affiliations between the
+    contributors of the article and with other articles built with it, an
+    article from the cache shares them too, otherwise each contributor has
+    its own affiliation objects
+    lazy_references=True sets ref_list and data_ref_list to a LazySequence
+    which parses and builds each reference when it is first read, instead of
+    holding the parsed references and the citations at the same time
+    remove_tags is a list of tag names to remove from the abstract and digest,
+    or a utils.TagCleaner made from one which can be shared by many builds
+    """
+
+    error_count = 0
+    if remove_tags is not None:
+        remove_tags = utils.tag_cleaner(remove_tags)
+
+    if cache is not None and not lazy:
+        if version is None:
+            version = article_xml_version(article_xml_filename)
+        xml = read_article_xml(article_xml_filename)
+        key = cache.key(xml, detail, build_parts, remove_tags, version)
+        article = cache.get(key)
+        if article is not None and affiliation_pool is not None:
+            affiliation_pool.share(article)
+        if article is None:
+            if isinstance(xml, str):
+                # str XML read from a text mode file, not a filename
+                xml = io.StringIO(xml)
+            article, error_count = build_article_from_xml(
+                xml,
+                detail,
+                build_parts,
+                remove_tags,
+                engine,
+                version=version,
+                profile=profile,
+                affiliation_pool=affiliation_pool,
+                lazy_references=lazy_references,
+            )
+            if error_count == 0:
+                cache.set(key, article)
+        return article, error_count
+
+    if profile is not None and not lazy:
+        with profile.measure("parse", engine):
+            document = parse_article_document(article_xml_filename, engine)
+        document = profiling.ProfiledDocument(document, profile)
+    else:
+        document = parse_article_document(article_xml_filename, engine)
+    document.affiliation_pool = affiliation_pool
+    document.lazy_references = lazy_references
+
+    # Get DOI
+    doi = document.parse(parser.doi)
+
+    # Create the article object
+    if lazy:
+        article = LazyArticle(document, doi, build_parts, detail, remove_tags)
+    else:
+        article = ea.Article(doi, title=None)
+
+    # article version from the filename if possible
+    if version is None:
+        version = article_xml_version(article_xml_filename)
+    utils.set_attr_if_value(article, "version", version)
+
+    if not lazy:
+        for part, build_function in BUILD_PART_FUNCTIONS.items():
+            if build_part_check(part, build_parts):
+                if profile is not None:
+                    with profile.measure("part", part):
+                        build_function(article, document, detail, remove_tags)
+                else:
+                    build_function(article, document, detail, remove_tags)
 
     return article, error_count
 
 
-def build_articles_from_article_xmls(
-    article_xmls, detail="full", build_parts=None, remove_tags=None
+def rebuild_article_from_xml(
+    article,
+    article_xml_filename,
+    detail="brief",
+    build_parts=None,
+    remove_tags=None,
+    engine="beautifulsoup",
+    version=None,
 ):
     """
-    Given a list of article XML filenames, convert to article objects
+    Build an article from a new revision of its XML, only the build parts
+    which read a section of the XML that changed are built again, the other
+    parts are copied from the previous article built with the same arguments,
+    the copies are deep copies so a change to one article does not change the
+    other. The section hashes are kept as article.section_hashes, an article without
+    them, such as one from build_article_from_xml, is built in full
     """
+    error_count = 0
+    xml = read_article_xml(article_xml_filename)
+    if version is None:
+        version = article_xml_version(article_xml_filename)
+
+    root = parse_lxml.parse_xml(xml)
+    section_hashes = parse_lxml.section_hashes(root) if root is not None else None
+    parts = [
+        part for part in BUILD_PART_FUNCTIONS if build_part_check(part, build_parts)
+    ]
+
+    previous_section_hashes = getattr(article, "section_hashes", None)
+    changed_parts = changed_build_parts(parts, section_hashes, previous_section_hashes)
+    front_changed = (
+        not section_hashes
+        or not previous_section_hashes
+        or section_hashes.get("front") != previous_section_hashes.get("front")
+    )
 
-    poa_articles = []
+    document = None
+    doi = article.doi if article is not None else None
+    if changed_parts or front_changed:
+        if engine == "lxml":
+            document = LxmlDocument(xml)
+        else:
+            document = ParsedDocument(parse_soup(xml))
+        doi = document.parse(parser.doi)
+
+    new_article = ea.Article(doi, title=None)
+    utils.set_attr_if_value(new_article, "version", version)
+    # one memo for every copied attribute keeps objects shared between them shared
+    copy_memo = {}
+    for part in parts:
+        if part in changed_parts:
+            BUILD_PART_FUNCTIONS.get(part)(new_article, document, detail, remove_tags)
+        else:
+            for name in BUILD_PART_ATTRIBUTES.get(part):
+                setattr(
+                    new_article, name, copy.deepcopy(getattr(article, name), copy_memo)
+                )
+    new_article.section_hashes = section_hashes
+
+    return new_article, error_count
+
+
+def build_article_from_xml_in_worker(
+    article_xml, detail="brief", build_parts=None, remove_tags=None, profile=False
+):
+    """
+    Build one article in a worker process, returning the exception message
+    instead of raising it so one bad file does not abort a parallel batch,
+    and a BuildProfile of the build if profile is True
+    """
+    build_profile = profiling.BuildProfile() if profile else None
+    try:
+        article, error_count = build_article_from_xml(
+            article_xml, detail, build_parts, remove_tags, profile=build_profile
+        )
+    except Exception as exception:  # pylint: disable=broad-except
+        error = "%s: %s" % (exception.__class__.__name__, exception)
+        return None, 1, error, build_profile
+    return article, error_count, None, build_profile
+
+
+def iter_articles_from_article_xmls_parallel(
+    article_xmls,
+    detail="full",
+    build_parts=None,
+    remove_tags=None,
+    workers=None,
+    profile=None,
+):
+    """
+    Given an iterable of article XML filenames, build them in a pool of worker
+    processes and yield the filename, article object and error count in the
+    input order, a file which fails to build is reported and yields no article
+    the profile of each worker build is merged into profile if it is given
+    """
+    workers = workers or os.cpu_count() or 1
+    if remove_tags is not None:
+        remove_tags = utils.tag_cleaner(remove_tags)
+    # only keep a few files per worker in flight so memory does not grow with the batch
+    max_pending = workers * 2
+
+    def result(article_xml, future):
+        print("working on ", article_xml)
+        article, error_count, error, build_profile = future.result()
+        if error:
+            print("failed on ", article_xml, error)
+        if build_profile is not None:
+            profile.merge(build_profile)
+        return article_xml, article, error_count
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for article_xml in article_xmls:
+            future = executor.submit(
+                build_article_from_xml_in_worker,
+                article_xml,
+                detail,
+                build_parts,
+                remove_tags,
+                profile is not None,
+            )
+            pending.append((article_xml, future))
+            if len(pending) >= max_pending:
+                yield result(*pending.popleft())
+        while pending:
+            yield result(*pending.popleft())
+
+
+def iter_articles_from_article_xmls(
+    article_xmls,
+    detail="full",
+    build_parts=None,
+    remove_tags=None,
+    workers=None,
+    profile=None,
+    affiliation_pool=None,
+):
+    """
+    Given an iterable of article XML filenames, yield the filename, article object
+    and error count as each article is built, so the caller can consume and
+    discard each article in turn
+    workers greater than 1 will build the articles in a pool of processes
+    profile is a profiling.BuildProfile to add the totals of every build to
+    affiliation_pool is an AffiliationPool to share affiliations across the
+    articles, articles built by worker processes share them when they are
+    returned
+    """
+    if remove_tags is not None:
+        # one TagCleaner is shared by every article in the batch
+        remove_tags = utils.tag_cleaner(remove_tags)
+    if workers and workers > 1:
+        for (
+            article_xml,
+            article,
+            error_count,
+        ) in iter_articles_from_article_xmls_parallel(
+            article_xmls, detail, build_parts, remove_tags, workers, profile
+        ):
+            if article is not None and affiliation_pool is not None:
+                affiliation_pool.share(article)
+            yield article_xml, article, error_count
+        return
 
     for article_xml in article_xmls:
         print("working on ", article_xml)
         article, error_count = build_article_from_xml(
-            article_xml, detail, build_parts, remove_tags
+            article_xml,
+            detail,
+            build_parts,
+            remove_tags,
+            profile=profile,
+            affiliation_pool=affiliation_pool,
         )
+        yield article_xml, article, error_count
+
+
+def build_articles_from_article_xmls_parallel(
+    article_xmls, detail="full", build_parts=None, remove_tags=None, workers=None
+):
+    """
+    Given a list of article XML filenames, convert to article objects using
+    a pool of worker processes, articles are returned in the input order
+    and files which fail to build are reported and left out of the list
+    """
+    return [
+        article
+        for article_xml, article, error_count in iter_articles_from_article_xmls_parallel(
+            article_xmls, detail, build_parts, remove_tags, workers
+        )
+        if error_count == 0
+    ]
+
+
+def build_articles_from_article_xmls(
+    article_xmls,
+    detail="full",
+    build_parts=None,
+    remove_tags=None,
+    workers=None,
+    profile=None,
+    affiliation_pool=None,
+):
+    """
+    Given a list of article XML filenames, convert to article objects
+    workers greater than 1 will build the articles in a pool of processes
+    profile is a profiling.BuildProfile to add the totals of every build to
+    affiliation_pool is an AffiliationPool to share affiliations across the
+    articles, articles built by worker processes share them when they are
+    returned
+    """
+
+    poa_articles = []
+
+    for article_xml, article, error_count in iter_articles_from_article_xmls(
+        article_xmls,
+        detail,
+        build_parts,
+        remove_tags,
+        workers,
+        profile,
+        affiliation_pool,
+    ):
         if error_count == 0:
             poa_articles.append(article)
 
@@ -0,0 +1,1162 @@
+"""
+Parser functions answering from an lxml tree, used by the lxml engine in place
+of the elifetools parser functions of the same name, they return the values
+the builders in parse.py use from the BeautifulSoup parser results
+"""
+
+from collections import OrderedDict
+import hashlib
+import re
+from lxml import etree
+from elifetools import utils as eautils
+
+ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+XLINK_NAMESPACE = "http://www.w3.org/1999/xlink"
+
+XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+# patterns work on any bytes-like XML, including memoryview and mmap objects
+XMLNS_PATTERN = re.compile(rb"xmlns")
+
+CDATA_PATTERN = re.compile(rb"<!\[CDATA\[")
+
+
+def xml_bytes(xml):
+    "str XML, such as read from a text mode file, as UTF-8 encoded bytes"
+    if isinstance(xml, str):
+        return xml.encode("utf8")
+    return xml
+
+
+def parse_xml(xml):
+    """
+    Parse bytes-like or str XML into an lxml element tree, returning the root
+    element or None if the document cannot be handled by the lxml parser
+    functions
+    """
+    encoding = None
+    if isinstance(xml, str):
+        # lxml does not accept str with an encoding declaration, the str is
+        # already decoded so the declaration is overridden
+        xml = xml_bytes(xml)
+        encoding = "utf-8"
+    # same parser options as the BeautifulSoup lxml-xml tree builder
+    xml_parser = etree.XMLParser(recover=True, strip_cdata=False, encoding=encoding)
+    try:
+        root = etree.fromstring(xml, xml_parser)
+    except etree.XMLSyntaxError:
+        return None
+    if root is None or root.tag != "article":
+        # JATS tags in a default namespace are not supported
+        return None
+    return root
+
+
+def collapse_whitespace(string):
+    """
+    BeautifulSoup replaces a string of only whitespace with a single
+    newline, if it contains one, otherwise with a single space
+    """
+    if string and not string.strip(ASCII_SPACES):
+        return "\n" if "\n" in string else " "
+    return string
+
+
+def node_text(element, remove_tag=None):
+    """
+    text contents of an element, like the text of a BeautifulSoup tag, with
+    the tags named remove_tag left out as if they were decomposed
+    """
+    if element is None:
+        return None
+    if remove_tag is None:
+        strings = element.itertext()
+    else:
+        strings = text_strings(element, remove_tag)
+    return "".join(collapse_whitespace(string) for string in strings)
+
+
+def text_strings(element, remove_tag):
+    "the strings itertext() yields, leaving out the tags named remove_tag"
+    if element.text is not None:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str) and child.tag != remove_tag:
+            yield from text_strings(child, remove_tag)
+        if child.tail is not None:
+            yield child.tail
+
+
+def node_contents_str(element, remove_tag=None):
+    """
+    Return the contents of an element, including its children, as a string.
+    Like the elifetools function, strings directly inside the element are
+    not escaped. Tags named remove_tag are left out as if they were decomposed
+    """
+    if element is None:
+        return None
+    tag_string = collapse_whitespace(element.text) or ""
+    for child in element:
+        if child.tag != remove_tag:
+            tag_string += tag_str(child, remove_tag)
+        tag_string += collapse_whitespace(child.tail) or ""
+    return tag_string if tag_string != "" else None
+
+
+def tag_str(element, remove_tag=None):
+    """
+    Serialise an element the same as BeautifulSoup, with its attributes
+    sorted by name and an empty element closed in its start tag
+    """
+    if isinstance(element, etree._Comment):
+        return "<!--%s-->" % collapse_whitespace(element.text or "")
+    if isinstance(element, etree._ProcessingInstruction):
+        return "<?%s %s?>" % (element.target, element.text or "")
+    name = qualified_name(element, element.tag)
+    attributes = sorted(
+        (qualified_name(element, key), value) for key, value in element.attrib.items()
+    )
+    start_tag = "<" + name
+    for key, value in attributes:
+        start_tag += ' %s="%s"' % (key, escape_text(value))
+    if element.text is None and all(
+        child.tag == remove_tag and child.tail is None for child in element
+    ):
+        return start_tag + "/>"
+    tag_string = start_tag + ">" + escape_text(collapse_whitespace(element.text) or "")
+    for child in element:
+        if child.tag != remove_tag:
+            tag_string += tag_str(child, remove_tag)
+        tag_string += escape_text(collapse_whitespace(child.tail) or "")
+    return tag_string + "</%s>" % name
+
+
+def qualified_name(element, name):
+    "convert an lxml {namespace}name to the prefix:name BeautifulSoup uses"
+    if not name.startswith("{"):
+        return name
+    namespace, local_name = name[1:].split("}", 1)
+    if namespace == XML_NAMESPACE:
+        return "xml:" + local_name
+    for prefix, prefix_namespace in element.nsmap.items():
+        if prefix and prefix_namespace == namespace:
+            return prefix + ":" + local_name
+    return local_name
+
+
+def escape_text(string):
+    "escape a string the same as the BeautifulSoup minimal formatter"
+    return string.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def serialisable_document(xml, root):
+    """
+    True if tags can be serialised the same as BeautifulSoup, which is not
+    the case if tags other than the root tag declare namespaces, because
+    BeautifulSoup keeps those declarations as attributes, or if there is
+    CDATA, which BeautifulSoup keeps as a CDATA section
+    """
+    xml = xml_bytes(xml)
+    return len(XMLNS_PATTERN.findall(xml)) <= len(root.nsmap) and not (
+        CDATA_PATTERN.search(xml)
+    )
+
+
+def serialisable(element):
+    """
+    True if the contents of an element serialise the same as BeautifulSoup,
+    which is not the case if an attribute value contains a double quote,
+    BeautifulSoup changes how the value is quoted
+    """
+    for descendant in element.iterdescendants():
+        if not isinstance(descendant.tag, str):
+            continue
+        for value in descendant.attrib.values():
+            if '"' in value:
+                return False
+    return True
+
+
+# article child tags hashed as their own section, see section_hashes
+SECTION_TAGS = OrderedDict(
+    [
+        ("front", "front"),
+        ("body", "body"),
+        ("back", "back"),
+        ("sub-article", "sub_articles"),
+    ]
+)
+
+
+def section_hashes(root):
+    """
+    sha256 hex digest of each top level section of the article, the front,
+    body, back and all of the sub-article tags, and of the rest of the
+    article, its tag attributes, namespaces and any other child tags
+    """
+    hashes = OrderedDict([("article", hashlib.sha256())])
+    for section in SECTION_TAGS.values():
+        hashes[section] = hashlib.sha256()
+    hashes["article"].update(
+        repr(
+            (
+                sorted(root.attrib.items()),
+                sorted((prefix or "", uri) for prefix, uri in root.nsmap.items()),
+                root.text,
+            )
+        ).encode("utf8")
+    )
+    for child in root:
+        section = SECTION_TAGS.get(child.tag, "article")
+        hashes[section].update(etree.tostring(child))
+    return OrderedDict(
+        (section, section_hash.hexdigest()) for section, section_hash in hashes.items()
+    )
+
+
+def xlink_href(element):
+    return element.get("{%s}href" % XLINK_NAMESPACE)
+
+
+def first(elements):
+    return next(iter(elements), None)
+
+
+def first_text(root, tag_name):
+    return node_text(first(root.iter(tag_name)))
+
+
+def article_meta(root):
+    return first(root.iter("article-meta"))
+
+
+def meta_article_id(root, pub_id_type, specific_use=None):
+    for element in root.iter("article-id"):
+        if (
+            element.get("pub-id-type") == pub_id_type
+            and element.get("specific-use") == specific_use
+            and element.getparent().tag == "article-meta"
+        ):
+            return element
+    return None
+
+
+def doi(root):
+    return eautils.doi_uri_to_doi(node_text(meta_article_id(root, "doi")))
+
+
+def version_doi(root):
+    return eautils.doi_uri_to_doi(
+        node_text(meta_article_id(root, "doi", specific_use="version"))
+    )
+
+
+def publisher_id(root):
+    return node_text(meta_article_id(root, "publisher-id"))
+
+
+def journal_title(root):
+    return first_text(root, "journal-title")
+
+
+def journal_issn(root, pub_format=None, pub_type=None):
+    for element in root.iter("issn"):
+        if pub_format is not None:
+            if element.get("publication-format") == pub_format:
+                return node_text(element)
+        elif pub_type is not None:
+            if element.get("pub-type") == pub_type:
+                return node_text(element)
+        else:
+            return node_text(element)
+    return None
+
+
+def publisher(root):
+    return first_text(root, "publisher-name")
+
+
+def article_type(root):
+    return root.get("article-type")
+
+
+def publication_state(root):
+    for element in root.iter("article-version"):
+        if element.get("article-version-type") == "publication-state":
+            return node_text(element)
+    return None
+
+
+def full_title(root):
+    return node_contents_str(first(root.iter("article-title")))
+
+
+def clinical_trials(root):
+    trials = []
+    meta_tag = article_meta(root)
+    if meta_tag is None:
+        return trials
+    for element in meta_tag.iter("related-object"):
+        if "source-id-type" not in element.attrib:
+            continue
+        clinical_trial = OrderedDict()
+        for attribute in [
+            "id",
+            "content-type",
+            "document-id",
+            "document-id-type",
+            "source-id",
+            "source-id-type",
+            "source-type",
+        ]:
+            eautils.copy_attribute(element.attrib, attribute, clinical_trial)
+        clinical_trial["text"] = node_text(element)
+        if xlink_href(element) is not None:
+            clinical_trial["xlink_href"] = xlink_href(element)
+        trials.append(clinical_trial)
+    return trials
+
+
+def elocation_id(root):
+    meta_tag = article_meta(root)
+    if meta_tag is None:
+        return None
+    return first_text(meta_tag, "elocation-id")
+
+
+def issue(root):
+    meta_tag = article_meta(root)
+    if meta_tag is None:
+        return None
+    return first_text(meta_tag, "issue")
+
+
+def volume(root):
+    return first_text(root, "volume")
+
+
+def self_uri(root):
+    uri_list = []
+    for element in root.iter("self-uri"):
+        item = {}
+        if xlink_href(element) is not None:
+            item["xlink_href"] = xlink_href(element)
+        eautils.copy_attribute(element.attrib, "content-type", item)
+        uri_list.append(item)
+    return uri_list
+
+
+def ymd(element):
+    "day, month and year text from child tags"
+    return (
+        first_text(element, "day"),
+        first_text(element, "month"),
+        first_text(element, "year"),
+    )
+
+
+def pub_history(root):
+    events = []
+    pub_history_tag = first(root.iter("pub-history"))
+    if pub_history_tag is None:
+        return events
+    for event_tag in pub_history_tag.iter("event"):
+        event = OrderedDict()
+        date_tag = first(event_tag.iter("date"))
+        eautils.set_if_value(event, "event_type", event_tag.get("event-type"))
+        if not event.get("event_type") and date_tag is not None:
+            eautils.set_if_value(event, "event_type", date_tag.get("date-type"))
+        event_desc_tag = first(event_tag.iter("event-desc"))
+        if event_desc_tag is not None:
+            event_desc = node_contents_str(event_desc_tag)
+            eautils.set_if_value(
+                event, "event_desc", event_desc and event_desc.rstrip()
+            )
+        self_uri_tag = first(event_tag.iter("self-uri"))
+        if self_uri_tag is not None:
+            eautils.set_if_value(event, "uri", xlink_href(self_uri_tag))
+        else:
+            for uri_tag in event_tag.iter("ext-link"):
+                if uri_tag.get("ext-link-type") == "uri":
+                    eautils.set_if_value(event, "uri", xlink_href(uri_tag))
+                    break
+        if date_tag is not None:
+            day, month, year = ymd(date_tag)
+            event["date"] = eautils.date_struct_nn(year, month, day)
+        events.append(event)
+    return events
+
+
+def is_poa(root):
+    return first(root.iter("body")) is None
+
+
+def keywords(root):
+    author_keywords = []
+    for group_tag in root.iter("kwd-group"):
+        if group_tag.get("kwd-group-type") in ["author-keywords", None]:
+            author_keywords += [
+                node_text(element) for element in group_tag if element.tag == "kwd"
+            ]
+    return author_keywords
+
+
+def research_organism(root):
+    for group_tag in root.iter("kwd-group"):
+        if group_tag.get("kwd-group-type") == "research-organism":
+            return [node_text(element) for element in group_tag if element.tag == "kwd"]
+    return []
+
+
+def subject_area(root, subject_group_type):
+    return [
+        node_text(element)
+        for element in root.iter("subject")
+        if element.getparent().get("subj-group-type") == subject_group_type
+    ]
+
+
+def category(root):
+    return subject_area(root, "heading")
+
+
+def display_channel(root):
+    return subject_area(root, "display-channel")
+
+
+def article_permissions(root):
+    for element in root.iter("permissions"):
+        if element.getparent().tag == "article-meta":
+            return element
+    return None
+
+
+def license_url(root):
+    permissions_tag = article_permissions(root)
+    if permissions_tag is None:
+        return None
+    license_tag = first(permissions_tag.iter("license"))
+    if license_tag is None:
+        return None
+    return xlink_href(license_tag)
+
+
+def copyright_statement(root):
+    permissions_tag = article_permissions(root)
+    if permissions_tag is None:
+        return None
+    return first_text(permissions_tag, "copyright-statement")
+
+
+def history_date(root, date_type=None):
+    if date_type is None:
+        return None
+    for element in root.iter("date"):
+        if (
+            element.get("date-type") == date_type
+            and element.getparent().tag == "history"
+        ):
+            day, month, year = ymd(element)
+            return eautils.date_struct(year, month, day)
+    return None
+
+
+def pub_dates(root):
+    dates = []
+    for element in root.iter("pub-date"):
+        pub_date = OrderedDict()
+        for attribute in ["publication-format", "date-type", "pub-type"]:
+            eautils.copy_attribute(element.attrib, attribute, pub_date)
+        if "date-type" in element.attrib or "pub-type" in element.attrib:
+            day, month, year = ymd(element)
+            pub_date["day"] = day
+            pub_date["month"] = month
+            pub_date["year"] = year
+            pub_date["date"] = eautils.date_struct_nn(year, month, day)
+        dates.append(pub_date)
+    return dates
+
+
+def descendants(element, tag_name, attribute=None, value=None):
+    "descendant tags, like the elifetools extract_nodes, not including the element"
+    for descendant in element.iterdescendants(tag_name):
+        if attribute is None or value is None or descendant.get(attribute) == value:
+            yield descendant
+
+
+def first_descendant(element, tag_name, attribute=None, value=None):
+    return first(descendants(element, tag_name, attribute, value))
+
+
+def first_descendant_text(element, tag_name):
+    return node_text(first_descendant(element, tag_name))
+
+
+def first_descendant_str(element, tag_name, attribute=None, value=None):
+    return node_contents_str(first_descendant(element, tag_name, attribute, value))
+
+
+def ref_text(element):
+    "human readable text of a reference, the same as the elifetools ref_text"
+    text = " ".join(node_text(element).strip().split())
+    return eautils.strip_punctuation_space(text.strip())
+
+
+def populate_ref(element, article_doi, wrapped=False):
+    """
+    the parsed reference of a ref tag, the same as elifetools populate_refs,
+    if wrapped is True the element is an element-citation tag which elifetools
+    data_refs wraps in a ref tag, moving its id to the ref tag
+    """
+    ref = {}
+    ref["ref"] = ref_text(element)
+    if not wrapped:
+        eautils.copy_attribute(element.attrib, "id", ref)
+    elif element.attrib["id"]:
+        ref["id"] = element.attrib["id"]
+
+    article_title_tag = first_descendant(element, "article-title")
+    if article_title_tag is not None:
+        ref["article_title"] = node_text(article_title_tag)
+        ref["full_article_title"] = node_contents_str(article_title_tag)
+
+    pmid_tag = first_descendant(element, "pub-id", "pub-id-type", "pmid")
+    if pmid_tag is not None:
+        ref["pmid"] = node_contents_str(pmid_tag)
+    isbn_tag = first_descendant(element, "pub-id", "pub-id-type", "isbn")
+    if isbn_tag is not None:
+        ref["isbn"] = node_contents_str(isbn_tag)
+    doi_tag = first_descendant(element, "pub-id", "pub-id-type", "doi")
+    if doi_tag is not None:
+        ref["reference_id"] = node_contents_str(doi_tag)
+        ref["doi"] = eautils.doi_uri_to_doi(node_contents_str(doi_tag))
+
+    uri_tag = first_descendant(element, "ext-link", "ext-link-type", "uri")
+    if uri_tag is None:
+        uri_tag = first_descendant(element, "uri")
+    if uri_tag is not None:
+        eautils.set_if_value(ref, "uri", xlink_href(uri_tag))
+        eautils.set_if_value(ref, "uri_text", node_contents_str(uri_tag))
+    # look for a pub-id tag if no uri yet
+    if not ref.get("uri"):
+        for pub_id_type in ["archive", "accession"]:
+            pub_id_tag = first_descendant(element, "pub-id", "pub-id-type", pub_id_type)
+            if pub_id_tag is not None:
+                eautils.set_if_value(ref, "uri", xlink_href(pub_id_tag))
+            if ref.get("uri"):
+                break
+
+    # accession, could be in either of two tags
+    eautils.set_if_value(
+        ref,
+        "accession",
+        first_descendant_str(element, "object-id", "pub-id-type", "art-access-id"),
+    )
+    for pub_id_type in ["accession", "archive"]:
+        if not ref.get("accession"):
+            eautils.set_if_value(
+                ref,
+                "accession",
+                first_descendant_str(element, "pub-id", "pub-id-type", pub_id_type),
+            )
+
+    year_tag = first_descendant(element, "year")
+    if year_tag is not None:
+        eautils.set_if_value(ref, "year", node_text(year_tag))
+        eautils.set_if_value(ref, "year-iso-8601-date", year_tag.get("iso-8601-date"))
+
+    date_in_citation_tag = first_descendant(element, "date-in-citation")
+    if date_in_citation_tag is not None:
+        eautils.set_if_value(ref, "date-in-citation", node_text(date_in_citation_tag))
+        eautils.set_if_value(
+            ref, "iso-8601-date", date_in_citation_tag.get("iso-8601-date")
+        )
+
+    patent_tag = first_descendant(element, "patent")
+    if patent_tag is not None:
+        eautils.set_if_value(ref, "patent", node_text(patent_tag))
+        eautils.set_if_value(ref, "country", patent_tag.get("country"))
+
+    eautils.set_if_value(ref, "source", first_descendant_text(element, "source"))
+    eautils.set_if_value(
+        ref, "elocation-id", first_descendant_text(element, "elocation-id")
+    )
+    if wrapped:
+        element_citation_tag = element
+    else:
+        element_citation_tag = first_descendant(element, "element-citation")
+    if element_citation_tag is not None:
+        eautils.copy_attribute(element_citation_tag.attrib, "publication-type", ref)
+    mixed_citation_tag = first_descendant(element, "mixed-citation")
+    if "publication-type" not in ref and mixed_citation_tag is not None:
+        eautils.copy_attribute(mixed_citation_tag.attrib, "publication-type", ref)
+
+    # authors
+    person_group_tags = list(descendants(element, "person-group"))
+    authors = []
+    for group in person_group_tags:
+        author_type = group.get("person-group-type")
+        # read name or collab tags in the order they are listed
+        for name_or_collab_tag in group.iterdescendants(
+            "name", "string-name", "collab"
+        ):
+            author = {}
+            eautils.set_if_value(author, "group-type", author_type)
+            if name_or_collab_tag.tag in ["name", "string-name"]:
+                for key in ["surname", "given-names", "suffix"]:
+                    eautils.set_if_value(
+                        author, key, first_descendant_text(name_or_collab_tag, key)
+                    )
+            if name_or_collab_tag.tag == "collab":
+                eautils.set_if_value(
+                    author, "collab", node_contents_str(name_or_collab_tag)
+                )
+            if author:
+                authors.append(author)
+        # etal for the person group
+        if first_descendant(group, "etal") is not None:
+            author = {}
+            author["etal"] = True
+            eautils.set_if_value(author, "group-type", author_type)
+            authors.append(author)
+    # collab tags not wrapped in a person-group, for backwards compatibility
+    if not person_group_tags:
+        for collab_tag in descendants(element, "collab"):
+            author = {"group-type": "author"}
+            eautils.set_if_value(author, "collab", node_contents_str(collab_tag))
+            authors.append(author)
+    if authors:
+        ref["authors"] = authors
+
+    for key, tag_name in [
+        ("volume", "volume"),
+        ("issue", "issue"),
+        ("fpage", "fpage"),
+        ("lpage", "lpage"),
+        ("collab", "collab"),
+        ("publisher_loc", "publisher-loc"),
+        ("publisher_name", "publisher-name"),
+    ]:
+        eautils.set_if_value(ref, key, first_descendant_text(element, tag_name))
+    for key in ["edition", "version", "chapter-title"]:
+        eautils.set_if_value(ref, key, first_descendant_str(element, key))
+    eautils.set_if_value(ref, "comment", first_descendant_text(element, "comment"))
+    eautils.set_if_value(ref, "data-title", first_descendant_str(element, "data-title"))
+    eautils.set_if_value(ref, "conf-name", first_descendant_text(element, "conf-name"))
+    if element_citation_tag is not None:
+        eautils.copy_attribute(element_citation_tag.attrib, "specific-use", ref)
+
+    ref["article_doi"] = article_doi
+    return ref
+
+
+def iter_refs(root):
+    "parsed references of the ref tags, one at a time, positions start from 1"
+    article_doi = doi(root)
+    for position, element in enumerate(root.iter("ref"), 1):
+        ref = populate_ref(element, article_doi)
+        ref["position"] = position
+        yield ref
+
+
+def refs(root):
+    return list(iter_refs(root))
+
+
+def data_refs(root):
+    "references in the data availability section, None if there is no section"
+    for sec_tag in root.iter("sec"):
+        if sec_tag.get("sec-type") == "data-availability":
+            break
+    else:
+        return None
+    article_doi = doi(root)
+    references = []
+    for position, element in enumerate(sec_tag.iterdescendants("element-citation"), 1):
+        ref = populate_ref(element, article_doi, wrapped=True)
+        ref["position"] = position
+        references.append(ref)
+    return references
+
+
+def iter_data_refs(root):
+    yield from data_refs(root) or []
+
+
+def add_to_list_dictionary(list_dict, list_key, value):
+    if value is not None:
+        list_dict.setdefault(list_key, []).append(value)
+
+
+def contrib_email(contrib_tag):
+    "email addresses in a contrib tag which are not inside an aff tag"
+    emails = [
+        node_text(email_tag)
+        for email_tag in contrib_tag.iterdescendants("email")
+        if email_tag.getparent().tag != "aff"
+    ]
+    return emails or None
+
+
+def contrib_phone(contrib_tag):
+    phone_tag = first_descendant(contrib_tag, "phone")
+    if phone_tag is None:
+        return None
+    return node_text(phone_tag)
+
+
+def first_parent(element, tag_names):
+    for parent in element.iterancestors(*tag_names):
+        return parent
+    return None
+
+
+def is_author_non_byline(element, contrib_type="author non-byline"):
+    if element.get("contrib-type") == contrib_type:
+        return True
+    parent = element.getparent()
+    if parent is not None and parent.getparent() is not None:
+        return parent.getparent().tag == "collab"
+    return False
+
+
+def is_author_group_author(element):
+    for child in element:
+        if child.tag == "collab":
+            parent = first_parent(element, ["collab", "article-meta", "front-stub"])
+            if parent is not None and parent.tag != "collab":
+                return True
+    return False
+
+
+def author_group_author_key(
+    contrib_tag, contrib_type=None, group_author_id=0, prev_group_author_id=0
+):
+    "the elifetools group author key of a contrib tag"
+    if is_author_group_author(contrib_tag):
+        group_author_id = group_author_id + 1
+        group_author_key = "group-author-id" + str(group_author_id)
+    else:
+        group_author_key = None
+    if is_author_non_byline(contrib_tag) and contrib_type is None:
+        group_author_key = "group-author-id" + str(prev_group_author_id)
+    elif not is_author_non_byline(contrib_tag) and not is_author_group_author(
+        contrib_tag
+    ):
+        group_author_key = None
+    contrib_id_tag = first_descendant(contrib_tag, "contrib-id")
+    if (
+        contrib_id_tag is not None
+        and contrib_id_tag.get("contrib-id-type") == "group-author-key"
+    ):
+        group_author_key = node_contents_str(contrib_id_tag)
+    return group_author_id, group_author_key
+
+
+def format_contrib_refs(contrib_tag, corresp_id_map):
+    contrib_refs = {}
+    ref_type_aff_count = 0
+    for ref_tag in contrib_tag.iterdescendants("xref"):
+        ref_type = ref_tag.get("ref-type")
+        rid = ref_tag.get("rid")
+        if ref_type is None or rid is None:
+            continue
+        if ref_type == "aff":
+            ref_type_aff_count += 1
+            add_to_list_dictionary(contrib_refs, "affiliation", rid)
+        elif ref_type == "corresp":
+            # check for email or phone type
+            corresp_tag = corresp_id_map.get(rid)
+            if corresp_tag is not None:
+                if contrib_phone(corresp_tag):
+                    add_to_list_dictionary(contrib_refs, "phone", rid)
+                elif contrib_email(corresp_tag):
+                    add_to_list_dictionary(contrib_refs, "email", rid)
+        elif ref_type == "fn":
+            if rid.startswith("equal-contrib"):
+                add_to_list_dictionary(contrib_refs, "equal-contrib", rid)
+            elif rid.startswith("conf"):
+                add_to_list_dictionary(contrib_refs, "competing-interest", rid)
+            elif rid.startswith("con"):
+                add_to_list_dictionary(contrib_refs, "contribution", rid)
+            elif rid.startswith("pa"):
+                add_to_list_dictionary(contrib_refs, "present-address", rid)
+            elif rid.startswith("fn"):
+                add_to_list_dictionary(contrib_refs, "foot-note", rid)
+        elif ref_type == "other":
+            if rid.startswith("par-") or rid.startswith("fund"):
+                add_to_list_dictionary(contrib_refs, "funding", rid)
+            elif rid.startswith("dataro") or rid.startswith("dataset"):
+                add_to_list_dictionary(contrib_refs, "related-object", rid)
+    return contrib_refs, ref_type_aff_count
+
+
+# affiliation values copied from format_aff to a contributor affiliation
+AFF_ATTRIBUTES = ("dept", "institution", "country", "city", "email", "ror", "text")
+
+
+def format_aff(aff_tag):
+    "the values of an aff tag, the same as the elifetools format_aff values"
+    if aff_tag is None:
+        return {}
+    values = {
+        "dept": first_descendant_str(aff_tag, "institution", "content-type", "dept"),
+        "institution": node_contents_str(
+            first(
+                element
+                for element in aff_tag.iterdescendants("institution")
+                if "content-type" not in element.attrib
+            )
+        ),
+        "city": first_descendant_str(aff_tag, "named-content", "content-type", "city"),
+        "country": first_descendant_str(aff_tag, "country"),
+        "email": first_descendant_str(aff_tag, "email"),
+        "ror": first_descendant_str(
+            aff_tag, "institution-id", "institution-id-type", "ror"
+        ),
+    }
+    values = {key: value for key, value in values.items() if value is not None}
+    if not values:
+        # the text leaving out the label tag
+        values = {"text": node_text(aff_tag, remove_tag="label").strip()}
+    return values
+
+
+def contrib_affiliation(aff_detail):
+    return {
+        key: aff_detail[key]
+        for key in AFF_ATTRIBUTES
+        if aff_detail.get(key) is not None
+    }
+
+
+def format_contributor(
+    contrib_tag,
+    detail,
+    contrib_type,
+    group_author_key,
+    corresp_id_map,
+    fn_id_map,
+    aff_id_map,
+):
+    """
+    the values of a contrib tag, the same as the elifetools format_contributor
+    values except for a bio, contributors with a bio are parsed by elifetools
+    """
+    contributor = {}
+    eautils.copy_attribute(contrib_tag.attrib, "contrib-type", contributor, "type")
+    if not contributor.get("type") and contrib_type:
+        contributor["type"] = contrib_type
+    for attribute in ["equal-contrib", "corresp", "deceased", "id"]:
+        eautils.copy_attribute(contrib_tag.attrib, attribute, contributor)
+    contrib_id_tag = first_descendant(contrib_tag, "contrib-id")
+    contrib_id_type = None
+    if contrib_id_tag is not None:
+        contrib_id_type = contrib_id_tag.get("contrib-id-type")
+    if contrib_id_type == "group-author-key":
+        contributor["group-author-key"] = node_contents_str(contrib_id_tag)
+    if not contributor.get("group-author-key") and group_author_key:
+        contributor["group-author-key"] = group_author_key
+
+    collab_tag = first_descendant(contrib_tag, "collab")
+    if collab_tag is not None:
+        # leave out tags inside the collab tag
+        contributor["collab"] = node_contents_str(
+            collab_tag, remove_tag="contrib-group"
+        ).rstrip()
+
+    # set anonymous value only if the tag is present
+    if first_descendant(contrib_tag, "anonymous") is not None:
+        contributor["anonymous"] = True
+
+    if not is_author_group_author(contrib_tag):
+        if contrib_id_type == "orcid":
+            contributor["orcid"] = node_contents_str(contrib_id_tag)
+        eautils.set_if_value(
+            contributor, "role", first_descendant_str(contrib_tag, "role")
+        )
+        eautils.set_if_value(contributor, "email", contrib_email(contrib_tag))
+        eautils.set_if_value(contributor, "phone", contrib_phone(contrib_tag))
+        for key in ["surname", "given-names", "suffix", "collab"]:
+            eautils.set_if_value(
+                contributor, key, first_descendant_str(contrib_tag, key)
+            )
+        # the sub-group from the parent role tag if it is inside a group
+        parent = contrib_tag.getparent()
+        group_tag = None
+        if parent is not None and parent.getparent() is not None:
+            group_tag = parent.getparent().getparent()
+        if group_tag is not None and is_author_group_author(group_tag):
+            eautils.set_if_value(
+                contributor, "sub-group", first_descendant_str(parent, "role")
+            )
+    elif contributor.get("corresp") and not contributor.get("email"):
+        # corresponding group authors, an email address anywhere in the group
+        eautils.set_if_value(contributor, "email", contrib_email(contrib_tag))
+
+    if contrib_tag.tag == "on-behalf-of":
+        contributor["type"] = "on-behalf-of"
+        contributor["on-behalf-of"] = node_contents_str(contrib_tag)
+
+    contrib_refs, ref_type_aff_count = format_contrib_refs(contrib_tag, corresp_id_map)
+    if contrib_refs:
+        contributor["references"] = contrib_refs
+
+    inline_aff_tags = [child for child in contrib_tag if child.tag == "aff"]
+    if detail == "brief" or ref_type_aff_count == 0:
+        # brief format only allows one aff and it must be within the contrib tag
+        if inline_aff_tags:
+            contributor["affiliations"] = []
+            contrib_affs = contrib_affiliation(format_aff(inline_aff_tags[0]))
+            if contrib_affs:
+                contributor["affiliations"].append(contrib_affs)
+
+    if detail == "full":
+        if "id" in contributor and contributor["id"].startswith("author"):
+            person_id = contributor["id"].replace("author-", "")
+            contributor["person_id"] = int(person_id) if person_id else None
+        author_name = ""
+        if "given-names" in contributor:
+            author_name += contributor["given-names"] + " "
+        if "surname" in contributor:
+            author_name += contributor["surname"]
+        if author_name != "":
+            contributor["author"] = author_name
+
+        aff_tags = list(descendants(contrib_tag, "xref", "ref-type", "aff"))
+        if not aff_tags:
+            aff_tags = inline_aff_tags
+        if aff_tags:
+            contributor["affiliations"] = []
+        for aff_tag in aff_tags:
+            rid = aff_tag.get("rid")
+            if rid and aff_id_map:
+                # every aff tag with an id is in aff_id_map
+                aff_node = aff_id_map.get(rid)
+            else:
+                # aff tag inside the contrib tag
+                aff_node = aff_tag
+            aff_detail = format_aff(aff_node)
+            if aff_detail:
+                contributor["affiliations"].append(contrib_affiliation(aff_detail))
+
+        # xref linked correspondence author notes
+        corresp_tags = list(descendants(contrib_tag, "xref", "ref-type", "corresp"))
+        if corresp_tags:
+            contributor.setdefault("notes-corresp", [])
+            for corresp_tag in corresp_tags:
+                corresp_node = corresp_id_map.get(corresp_tag.get("rid"))
+                if corresp_node is not None:
+                    author_notes = node_text(corresp_node)
+                    if author_notes:
+                        contributor["notes-corresp"].append(author_notes)
+        # xref linked footnotes
+        fn_tags = list(descendants(contrib_tag, "xref", "ref-type", "fn"))
+        if fn_tags:
+            contributor.setdefault("notes-fn", [])
+            for fn_tag in fn_tags:
+                fn_node = fn_id_map.get(fn_tag.get("rid"))
+                if fn_node is not None:
+                    fn_text = node_text(fn_node)
+                    if fn_text:
+                        contributor["notes-fn"].append(fn_text)
+
+    return contributor
+
+
+def id_map(root, tag_name):
+    "tags with an id keyed by the id, a later tag with the same id replaces one"
+    return {
+        element.get("id"): element
+        for element in root.iter(tag_name)
+        if element.get("id")
+    }
+
+
+def format_authors(root, contrib_tags, detail="full", contrib_type=None):
+    "the values of each contrib tag, the same as the elifetools format_authors"
+    authors = []
+    position = 1
+    article_doi = doi(root)
+    group_author_id = 0
+    prev_group_author_id = 0
+    corresp_id_map = id_map(root, "corresp")
+    aff_id_map = id_map(root, "aff")
+    fn_id_map = id_map(root, "fn")
+    for contrib_tag in contrib_tags:
+        group_author_id, group_author_key = author_group_author_key(
+            contrib_tag, contrib_type, group_author_id, prev_group_author_id
+        )
+        author_contrib_type = contrib_type
+        if is_author_non_byline(contrib_tag) and contrib_type is None:
+            author_contrib_type = "author non-byline"
+        author = format_contributor(
+            contrib_tag,
+            detail,
+            author_contrib_type,
+            group_author_key,
+            corresp_id_map,
+            fn_id_map,
+            aff_id_map,
+        )
+        if author:
+            if detail == "full":
+                author["article_doi"] = article_doi
+                author["position"] = position
+            authors.append(author)
+            position += 1
+        prev_group_author_id = group_author_id
+    return authors
+
+
+def article_contributors(root):
+    "contrib and on-behalf-of tags of the article-meta, None if there is none"
+    meta_tag = article_meta(root)
+    if meta_tag is None:
+        return None
+    return [
+        element
+        for element in meta_tag.iterdescendants("contrib", "on-behalf-of")
+        if element.getparent().tag == "contrib-group"
+    ]
+
+
+def contributors(root, detail="brief"):
+    return format_authors(root, article_contributors(root), detail)
+
+
+def authors_non_byline(root, detail="full"):
+    "non-byline authors of group authors, the same as elifetools authors_non_byline"
+    contrib_type = "author non-byline"
+    contrib_tags = article_contributors(root)
+    non_byline_contrib_tags = [
+        element for element in contrib_tags if is_author_non_byline(element)
+    ]
+    non_byline_authors = [
+        author
+        for author in format_authors(root, non_byline_contrib_tags, detail)
+        if author.get("type", None) == contrib_type
+    ]
+    # the group-author-key values found using all the contrib tags
+    group_author_keys = []
+    group_author_id = 0
+    prev_group_author_id = 0
+    for element in contrib_tags:
+        group_author_id, group_author_key = author_group_author_key(
+            element, None, group_author_id, prev_group_author_id
+        )
+        if is_author_non_byline(element):
+            group_author_keys.append(group_author_key)
+        prev_group_author_id = group_author_id
+    for author, group_author_key in zip(non_byline_authors, group_author_keys):
+        author["group-author-key"] = group_author_key
+    for position, author in enumerate(non_byline_authors, 1):
+        author["position"] = position
+    return non_byline_authors
+
+
+def competing_interests(root, fntype_filter):
+    "the fn tags of the first competing interest fn-group, None if there are none"
+    section_tag = None
+    for element in root.iter("fn-group"):
+        if element.get("content-type") == "competing-interest":
+            section_tag = element
+            break
+    if section_tag is None:
+        return None
+    interests = []
+    for fn_tag in section_tag.iterdescendants("fn"):
+        if "id" not in fn_tag.attrib or "fn-type" not in fn_tag.attrib:
+            continue
+        if fntype_filter is None or fn_tag.get("fn-type") in fntype_filter:
+            interests.append(
+                {
+                    "id": fn_tag.get("id"),
+                    "text": eautils.clean_whitespace(node_contents_str(fn_tag)),
+                    "fn-type": fn_tag.get("fn-type"),
+                }
+            )
+    return interests or None
+
+
+# parser functions which return a string of XML need the contents to serialise
+# the same as BeautifulSoup, maps the function to the tags it serialises
+SERIALISED_TAGS = OrderedDict(
+    [
+        ("authors_non_byline", ("contrib", "on-behalf-of", "aff")),
+        ("competing_interests", ("fn-group",)),
+        ("contributors", ("contrib", "on-behalf-of", "aff")),
+        ("data_refs", ("element-citation",)),
+        ("full_title", ("article-title",)),
+        ("iter_data_refs", ("element-citation",)),
+        ("iter_refs", ("ref",)),
+        ("pub_history", ("pub-history",)),
+        ("refs", ("ref",)),
+    ]
+)
+
+# parser functions which are left to elifetools for a document with these tags
+UNSUPPORTED_TAGS = OrderedDict(
+    [
+        ("authors_non_byline", ("bio",)),
+        ("contributors", ("bio",)),
+    ]
+)
+
+
+def supported(root, function_name, serialisable_xml=True):
+    """
+    True if the lxml equivalent of the parser function returns the same as
+    the parser function for the document, serialisable_xml is the result of
+    serialisable_document
+    """
+    if function_name not in PARSER_FUNCTIONS:
+        return False
+    unsupported_tag_names = UNSUPPORTED_TAGS.get(function_name)
+    if unsupported_tag_names and first(root.iter(*unsupported_tag_names)) is not None:
+        return False
+    tag_names = SERIALISED_TAGS.get(function_name)
+    if not tag_names:
+        return True
+    if not serialisable_xml:
+        return first(root.iter(*tag_names)) is None
+    return all(serialisable(element) for element in root.iter(*tag_names))
+
+
+PARSER_FUNCTIONS = OrderedDict(
+    (function.__name__, function)
+    for function in [
+        article_type,
+        authors_non_byline,
+        category,
+        clinical_trials,
+        competing_interests,
+        contributors,
+        copyright_statement,
+        data_refs,
+        display_channel,
+        doi,
+        elocation_id,
+        full_title,
+        history_date,
+        is_poa,
+        issue,
+        iter_data_refs,
+        iter_refs,
+        journal_issn,
+        journal_title,
+        keywords,
+        license_url,
+        pub_dates,
+        pub_history,
+        publication_state,
+        publisher,
+        publisher_id,
+        refs,
+        research_organism,
+        self_uri,
+        version_doi,
+        volume,
+    ]
+)
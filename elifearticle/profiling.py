@@ -0,0 +1,93 @@
+"""
+Collect the time spent building articles and the change in the number of
+allocated memory blocks, per build part and per parser call, to find which
+parts are slow across a corpus
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+import sys
+import time
+from elifearticle import utils
+
+# measurement values kept for each build part or parser call
+STAT_NAMES = ["calls", "wall_time", "cpu_time", "net_blocks"]
+
+
+class BuildProfile:
+    """
+    Totals of each measurement, keyed by the kind of step, "parse" for
+    parsing the XML, "part" for a build part or "parser" for a parser call,
+    and the name of the step, net_blocks is the change in the number of
+    memory blocks allocated by the interpreter during the step, blocks
+    allocated and freed again during the step are not counted so it can be
+    negative, it is not a count of allocations
+    """
+
+    def __init__(self):
+        self.stats = OrderedDict()
+
+    @contextmanager
+    def measure(self, kind, name):
+        "add the time and change in allocated blocks of the with block to the totals"
+        blocks = sys.getallocatedblocks()
+        cpu_time = time.process_time()
+        wall_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(
+                kind,
+                name,
+                1,
+                time.perf_counter() - wall_time,
+                time.process_time() - cpu_time,
+                sys.getallocatedblocks() - blocks,
+            )
+
+    def add(self, kind, name, calls, wall_time, cpu_time, net_blocks):
+        stats = self.stats.setdefault((kind, name), OrderedDict.fromkeys(STAT_NAMES, 0))
+        stats["calls"] += calls
+        stats["wall_time"] += wall_time
+        stats["cpu_time"] += cpu_time
+        stats["net_blocks"] += net_blocks
+
+    def merge(self, profile):
+        "add the totals of another profile, such as one from a worker process"
+        for (kind, name), stats in profile.stats.items():
+            self.add(kind, name, *[stats.get(stat_name) for stat_name in STAT_NAMES])
+
+    def report(self, kind=None, sort_by="wall_time"):
+        """
+        list of rows of kind, name and the measurements, for one kind of step
+        or all of them, the largest first
+        """
+        rows = [
+            OrderedDict([("kind", stats_kind), ("name", name)] + list(stats.items()))
+            for (stats_kind, name), stats in self.stats.items()
+            if kind is None or stats_kind == kind
+        ]
+        return sorted(rows, key=lambda row: row.get(sort_by), reverse=True)
+
+
+class ProfiledDocument:
+    "parsed document which measures each parser call made by the build parts"
+
+    def __init__(self, document, profile):
+        self.document = document
+        self.profile = profile
+
+    def __getattr__(self, name):
+        return getattr(self.document, name)
+
+    def parse(self, function, *args):
+        with self.profile.measure("parser", utils.parser_function_name(function)):
+            return self.document.parse(function, *args)
+
+
+def aggregate_profiles(profiles):
+    "one profile with the totals of each of the profiles, such as one per article"
+    total_profile = BuildProfile()
+    for profile in profiles:
+        total_profile.merge(profile)
+    return total_profile
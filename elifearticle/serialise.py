@@ -0,0 +1,162 @@
+"""
+Convert article objects to and from dicts of JSON compatible values, using a
+table of the fields of each class made once when the module is imported
+"""
+
+from collections import OrderedDict
+import json
+import time
+from elifearticle import article as ea
+from elifearticle import compact
+
+# key holding the class name of an article object in its dict
+CLASS_KEY = "_class"
+
+# key holding the values of a time.struct_time in its dict
+STRUCT_TIME_KEY = "_struct_time"
+
+PLAIN_TYPES = (str, int, float, bool, type(None))
+
+# fields which hold article objects, dates or containers of them, all other
+# fields normally hold plain values which are copied without converting
+NESTED_FIELDS = OrderedDict(
+    [
+        (
+            ea.Article,
+            [
+                "abstract_json",
+                "clinical_trials",
+                "component_list",
+                "contributors",
+                "data_ref_list",
+                "datasets",
+                "dates",
+                "editors",
+                "funding_awards",
+                "license",
+                "preprint",
+                "publication_history",
+                "ref_list",
+                "related_articles",
+                "related_objects",
+                "review_articles",
+                "self_uri_list",
+            ],
+        ),
+        (ea.ArticleDate, ["date"]),
+        (ea.Citation, ["authors"]),
+        (ea.Component, ["permissions"]),
+        (ea.Contributor, ["affiliations", "roles"]),
+        (ea.ContentBlock, ["attr", "content_blocks"]),
+        (ea.Event, ["date"]),
+        (ea.FundingAward, ["awards", "principal_award_recipients"]),
+    ]
+)
+
+
+def plain_value(value):
+    "a plain value as it is, any other value is converted"
+    if isinstance(value, PLAIN_TYPES):
+        return value
+    return to_dict(value)
+
+
+def object_to_dict(cls_name, table, attributes):
+    """
+    dict of the class name and the attributes which are set, converted by the
+    function for the field in the table, in the order they were set
+    """
+    data = {CLASS_KEY: cls_name}
+    for name, value in attributes.items():
+        data[name] = table.get(name, to_dict)(value)
+    return data
+
+
+def to_dict(value):
+    """
+    Convert an article object, or a list or dict containing them, to a dict
+    of JSON compatible values, attributes not set on an object are left out
+    so they keep their class default when it is converted back
+    """
+    cls = type(value)
+    table = FIELD_TABLES.get(cls)
+    if table is not None:
+        return object_to_dict(cls.__name__, table, value.__dict__)
+    if cls is list or cls is tuple:
+        return [to_dict(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_dict(item) for key, item in value.items()}
+    if cls is time.struct_time:
+        return {STRUCT_TIME_KEY: list(value)}
+    if cls in COMPACT_CLASS_NAMES:
+        cls_name = COMPACT_CLASS_NAMES.get(cls)
+        return object_to_dict(
+            cls_name,
+            FIELD_TABLES.get(CLASSES.get(cls_name)),
+            OrderedDict(value.attribute_items()),
+        )
+    if ea.is_list_value(value):
+        # a sequence used as a list, such as lazily built references
+        return [to_dict(item) for item in value]
+    for table_cls, table in FIELD_TABLES.items():
+        if isinstance(value, table_cls):
+            # a subclass, such as LazyArticle, read every field of its class
+            attributes = OrderedDict(
+                (name, getattr(value, name)) for name in table if hasattr(value, name)
+            )
+            return object_to_dict(table_cls.__name__, table, attributes)
+    return value
+
+
+def from_dict(data):
+    "Convert a value from to_dict back to article objects"
+    if isinstance(data, list):
+        return [from_dict(item) for item in data]
+    if not isinstance(data, dict):
+        return data
+    cls_name = data.get(CLASS_KEY)
+    if cls_name is not None:
+        cls = CLASSES[cls_name]
+        obj = cls.__new__(cls)
+        attributes = obj.__dict__
+        for name, item in data.items():
+            if name != CLASS_KEY:
+                attributes[name] = (
+                    item if isinstance(item, PLAIN_TYPES) else from_dict(item)
+                )
+        return obj
+    if STRUCT_TIME_KEY in data:
+        return time.struct_time(data.get(STRUCT_TIME_KEY))
+    return {key: from_dict(item) for key, item in data.items()}
+
+
+def field_table(cls):
+    """
+    the function to convert the value of each field of the class, by name,
+    fields are the same as the slots of the compact class
+    """
+    nested_fields = NESTED_FIELDS.get(cls, [])
+    return OrderedDict(
+        (name, to_dict if name in nested_fields else plain_value)
+        for name in compact.COMPACT_CLASSES.get(cls).__slots__
+    )
+
+
+FIELD_TABLES = OrderedDict((cls, field_table(cls)) for cls in compact.COMPACT_CLASSES)
+
+CLASSES = OrderedDict((cls.__name__, cls) for cls in compact.COMPACT_CLASSES)
+
+# compact classes are converted to the dict of the class they are a variant of
+COMPACT_CLASS_NAMES = OrderedDict(
+    (compact_cls, cls.__name__) for cls, compact_cls in compact.COMPACT_CLASSES.items()
+)
+
+
+def to_json(value, **kwargs):
+    "JSON string of the value, kwargs are passed to json.dumps"
+    return json.dumps(to_dict(value), **kwargs)
+
+
+def from_json(json_string):
+    "article objects from a JSON string from to_json"
+    return from_dict(json.loads(json_string))
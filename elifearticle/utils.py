@@ -3,22 +3,104 @@ Utility functions for converting content and some shared by other libraries
 """
 
 from collections import OrderedDict
+from functools import lru_cache
 import re
 import os
 from git import Repo, InvalidGitRepositoryError, NoSuchPathError
+from elifetools import parseJATS as parser
 from elifetools import utils as etoolsutils
 
+# name of each elifetools parser function, the functions with a decorator
+# such as nullify are named wrapper
+PARSER_FUNCTION_NAMES = {
+    function: name for name, function in vars(parser).items() if callable(function)
+}
+
+
+def parser_function_name(function):
+    "the name of a parser function in the elifetools parser, or its own name"
+    return PARSER_FUNCTION_NAMES.get(function, function.__name__)
+
+
+@lru_cache(maxsize=128)
+def tag_pattern(tag_names):
+    """
+    compiled pattern matching the open and close tags of any of a tuple of
+    tag names, which can be patterns such as mml:*, compiled once per tuple
+    """
+    return re.compile("</?(?:" + "|".join(tag_names) + ").*?>")
+
 
 def remove_tag(tag_name, string):
     """
     Remove open and close tags - the tags themselves only - using
     a non-greedy angle bracket pattern match
     """
-    if not string:
+    return remove_tags([tag_name], string)
+
+
+def remove_tags(tag_names, string):
+    """
+    Remove the open and close tags of each of the tag names in one pass
+    over the string
+    """
+    if not string or not tag_names:
         return string
-    pattern = re.compile("</?" + tag_name + ".*?>")
-    string = pattern.sub("", string)
-    return string
+    return tag_pattern(tuple(tag_names)).sub("", string)
+
+
+class TagCleaner:
+    """
+    Removes the open and close tags of a list of tag names from strings in
+    one pass, with the pattern compiled when it is created, it cannot be
+    changed and is pickled as its tag names so it can be sent to worker
+    processes, iterating it gives the tag names
+    """
+
+    __slots__ = ("tag_names", "pattern")
+
+    def __init__(self, tag_names):
+        tag_names = tuple(tag_names)
+        object.__setattr__(self, "tag_names", tag_names)
+        object.__setattr__(
+            self, "pattern", tag_pattern(tag_names) if tag_names else None
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TagCleaner is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("TagCleaner is immutable")
+
+    def __reduce__(self):
+        return (TagCleaner, (self.tag_names,))
+
+    def __iter__(self):
+        return iter(self.tag_names)
+
+    def __eq__(self, other):
+        if isinstance(other, TagCleaner):
+            return self.tag_names == other.tag_names
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.tag_names)
+
+    def __repr__(self):
+        return "TagCleaner(%r)" % (list(self.tag_names),)
+
+    def clean(self, string):
+        "the string without the tags"
+        if not string or self.pattern is None:
+            return string
+        return self.pattern.sub("", string)
+
+
+def tag_cleaner(remove_tags):
+    "a TagCleaner for a list of tag names, or the TagCleaner itself"
+    if isinstance(remove_tags, TagCleaner):
+        return remove_tags
+    return TagCleaner(remove_tags)
 
 
 def replace_tags(string, from_tag="i", to_tag="italic"):
@@ -58,6 +140,29 @@ def set_attr_if_value(obj, attr_name, value):
         setattr(obj, attr_name, value)
 
 
+# number of distinct URIs kept by the doi_uri_to_doi memo
+DOI_URI_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DOI_URI_CACHE_SIZE)
+def doi_uri_to_doi(value):
+    """
+    DOI from a DOI URI, memoised so each URI is normalised once, the hits and
+    misses are in doi_uri_to_doi.cache_info()
+    """
+    return etoolsutils.doi_uri_to_doi(value)
+
+
+def doi_from_uri(uri):
+    "DOI of a uri which is a DOI URI, otherwise None"
+    if not uri:
+        return None
+    doi = doi_uri_to_doi(uri)
+    if doi != uri:
+        return doi
+    return None
+
+
 def is_year_numeric(value):
     "True if value is all digits"
     if value and re.match("^[0-9]+$", value):
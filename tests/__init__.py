@@ -3,3 +3,14 @@ import os
 # Test settings to read in test data
 TEST_BASE_PATH = os.path.dirname(os.path.abspath(__file__)) + os.sep
 XLS_PATH = TEST_BASE_PATH + "test_data" + os.sep
+
+
+def article_values(value):
+    "all the values of an article and its child objects for comparing builds"
+    if isinstance(value, list):
+        return [article_values(item) for item in value]
+    if isinstance(value, dict):
+        return {key: article_values(item) for key, item in value.items()}
+    if hasattr(value, "__dict__"):
+        return article_values(value.__dict__)
+    return value
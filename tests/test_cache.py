@@ -0,0 +1,122 @@
+import unittest
+import os
+import tempfile
+from elifearticle import parse, utils
+from elifearticle.cache import ArticleCache
+from tests import XLS_PATH
+
+
+class TestArticleCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ArticleCache(self.temp_dir.name)
+        self.xml_file = os.path.join(XLS_PATH, "elife-02935-v2.xml")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_build_article_from_xml_cache(self):
+        article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", cache=self.cache
+        )
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+        cached_article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", cache=self.cache
+        )
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(error_count, 0)
+        self.assertIsNot(cached_article, article)
+        self.assertEqual(cached_article.doi, article.doi)
+        self.assertEqual(cached_article.version, 2)
+        self.assertEqual(len(cached_article.contributors), 180)
+        self.assertEqual(
+            cached_article.get_date("received").date, article.get_date("received").date
+        )
+
+    def test_build_article_from_xml_cache_affiliation_pool(self):
+        "an article from the cache shares the affiliations of the pool"
+        affiliation_pool = parse.AffiliationPool()
+        article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", cache=self.cache, affiliation_pool=affiliation_pool
+        )
+        cached_article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", cache=self.cache, affiliation_pool=affiliation_pool
+        )
+        self.assertEqual(self.cache.hits, 1)
+        self.assertIs(
+            cached_article.contributors[1].affiliations[0],
+            article.contributors[1].affiliations[0],
+        )
+        self.assertEqual(
+            len(affiliation_pool.built_affiliations),
+            len(affiliation_pool.affiliations),
+        )
+
+    def test_key(self):
+        "arguments which change the built article change the key"
+        xml = b"<article/>"
+        key = self.cache.key(xml, "full", ["basic", "references"])
+        self.assertEqual(key, self.cache.key(xml, "full", ["references", "basic"]))
+        self.assertNotEqual(key, self.cache.key(xml, "brief", ["basic", "references"]))
+        self.assertNotEqual(key, self.cache.key(xml, "full", ["basic"]))
+        self.assertNotEqual(
+            key, self.cache.key(xml, "full", ["basic", "references"], version=2)
+        )
+        self.assertNotEqual(
+            self.cache.key(xml, remove_tags=None), self.cache.key(xml, remove_tags=[])
+        )
+        self.assertNotEqual(key, self.cache.key(b"<article></article>", "full"))
+        # a TagCleaner has the same key as its tag names
+        self.assertEqual(
+            self.cache.key(xml, remove_tags=utils.TagCleaner(["xref"])),
+            self.cache.key(xml, remove_tags=["xref"]),
+        )
+
+    def test_key_str(self):
+        self.assertEqual(
+            self.cache.key("<article>\u00e9</article>", "full"),
+            self.cache.key("<article>\u00e9</article>".encode("utf8"), "full"),
+        )
+
+    def test_build_article_from_text_file_cache(self):
+        "XML read from a text mode file is cached"
+        for engine in ["beautifulsoup", "lxml"]:
+            with open(self.xml_file, encoding="utf8") as open_file:
+                article, error_count = parse.build_article_from_xml(
+                    open_file, "full", engine=engine, cache=self.cache
+                )
+            self.assertEqual(len(article.contributors), 180)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.misses, 1)
+
+    def test_get_damaged(self):
+        with open(self.cache.path("damaged"), "wb") as open_file:
+            open_file.write(b"not compressed")
+        self.assertIsNone(self.cache.get("damaged"))
+        self.assertFalse(os.path.exists(self.cache.path("damaged")))
+
+    def test_evict(self):
+        "least recently used files are removed when the cache is too large"
+        for key in ["one", "two", "three"]:
+            self.cache.set(key, "x" * 100)
+        size = os.path.getsize(self.cache.path("one"))
+        os.utime(self.cache.path("one"), (1, 1))
+        os.utime(self.cache.path("two"), (2, 2))
+        os.utime(self.cache.path("three"), (3, 3))
+        # reading a file makes it the most recently used
+        self.assertEqual(self.cache.get("one"), "x" * 100)
+        self.cache.max_size = size * 2
+        self.cache.set("four", "x" * 100)
+        self.assertTrue(os.path.exists(self.cache.path("one")))
+        self.assertFalse(os.path.exists(self.cache.path("two")))
+        self.assertFalse(os.path.exists(self.cache.path("three")))
+        self.assertTrue(os.path.exists(self.cache.path("four")))
+        self.assertEqual(self.cache.size, size * 2)
+
+    def test_clear(self):
+        self.cache.set("one", "x")
+        self.cache.clear()
+        self.assertEqual(self.cache.total_size(), 0)
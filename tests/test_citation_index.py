@@ -0,0 +1,217 @@
+import unittest
+import glob
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+from elifearticle import article as ea
+from elifearticle import citation_index, parse
+from tests import XLS_PATH
+
+
+def citing_article(doi, cited_dois):
+    "article with a reference to each of the cited DOIs"
+    article = ea.Article(doi)
+    for position, cited_doi in enumerate(cited_dois):
+        ref = ea.Citation()
+        ref.id = "bib%s" % (position + 1)
+        ref.doi = cited_doi
+        article.ref_list.append(ref)
+    return article
+
+
+class TestCitationIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_path = os.path.join(self.temp_dir, "citations.idx")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_index_file(self):
+        "each citation of the test articles is found in the index file"
+        articles = [
+            parse.build_article_from_xml(xml_file, "full")[0]
+            for xml_file in sorted(glob.glob(os.path.join(XLS_PATH, "*.xml")))
+        ]
+        index = citation_index.CitationIndex()
+        for article in articles:
+            index.add_article(article)
+        index.write(self.index_path)
+        with citation_index.CitationIndexFile(self.index_path) as index_file:
+            self.assertEqual(list(index_file.entries()), index.entries())
+            for article in articles:
+                for ref in article.ref_list + article.data_ref_list:
+                    if ref.doi:
+                        self.assertIn((article.doi, ref.id), index_file.citing(ref.doi))
+                        self.assertEqual(
+                            index_file.citing(ref.doi), index.citing(ref.doi)
+                        )
+
+    def test_lazy_references(self):
+        "the citations of an article built with lazy references are indexed"
+        xml_file = os.path.join(XLS_PATH, "elife-00666.xml")
+        article, error_count = parse.build_article_from_xml(xml_file, "full")
+        lazy_article, error_count = parse.build_article_from_xml(
+            xml_file, "full", lazy_references=True
+        )
+        self.assertTrue(citation_index.article_citations(article))
+        self.assertEqual(
+            citation_index.article_citations(lazy_article),
+            citation_index.article_citations(article),
+        )
+
+    def test_citing(self):
+        index = citation_index.CitationIndex()
+        index.add_article(
+            citing_article("10.7554/eLife.00002", ["10.1/A", " 10.1/b", None])
+        )
+        index.add_article(citing_article("10.7554/eLife.00001", ["10.1/a"]))
+        index.write(self.index_path)
+        with citation_index.CitationIndexFile(self.index_path) as index_file:
+            self.assertEqual(len(index_file), 3)
+            self.assertEqual(
+                index_file.citing("10.1/a"),
+                [("10.7554/eLife.00001", "bib1"), ("10.7554/eLife.00002", "bib1")],
+            )
+            self.assertEqual(
+                index_file.citing("10.1/B"), [("10.7554/eLife.00002", "bib2")]
+            )
+            self.assertEqual(index_file.citing("10.1/c"), [])
+            self.assertEqual(index_file.citing(None), [])
+
+    def test_update_index_file(self):
+        "articles are added, replaced and removed one at a time"
+        citation_index.update_index_file(
+            self.index_path,
+            [
+                citing_article("10.7554/eLife.00001", ["10.1/a"]),
+                citing_article("10.7554/eLife.00002", ["10.1/a", "10.1/b"]),
+            ],
+        )
+        citation_index.update_index_file(
+            self.index_path, [citing_article("10.7554/eLife.00001", ["10.1/b"])]
+        )
+        with citation_index.CitationIndexFile(self.index_path) as index_file:
+            self.assertEqual(
+                index_file.citing("10.1/a"), [("10.7554/eLife.00002", "bib1")]
+            )
+            self.assertEqual(
+                index_file.citing("10.1/b"),
+                [("10.7554/eLife.00001", "bib1"), ("10.7554/eLife.00002", "bib2")],
+            )
+        citation_index.update_index_file(
+            self.index_path, remove_article_dois=["10.7554/eLife.00002"]
+        )
+        with citation_index.CitationIndexFile(self.index_path) as index_file:
+            self.assertEqual(index_file.citing("10.1/a"), [])
+            self.assertEqual(len(index_file), 1)
+
+    def test_update_appends_delta(self):
+        "an update is appended to the delta file, the index file is not written"
+        citation_index.update_index_file(
+            self.index_path,
+            [
+                citing_article("10.7554/eLife.00001", ["10.1/a"]),
+                citing_article("10.7554/eLife.00002", ["10.1/a", "10.1/b"]),
+            ],
+        )
+        citation_index.compact_index_file(self.index_path)
+        delta_path = citation_index.delta_file_path(self.index_path)
+        self.assertFalse(os.path.exists(delta_path))
+        index_stat = os.stat(self.index_path)
+        citation_index.update_index_file(
+            self.index_path,
+            [citing_article("10.7554/eLife.00003", ["10.1/b"])],
+            ["10.7554/eLife.00001"],
+        )
+        self.assertEqual(os.stat(self.index_path).st_ino, index_stat.st_ino)
+        self.assertEqual(os.stat(self.index_path).st_size, index_stat.st_size)
+        self.assertTrue(os.path.exists(delta_path))
+        expected_entries = [
+            ("10.1/a", "10.7554/eLife.00002", "bib1"),
+            ("10.1/b", "10.7554/eLife.00002", "bib2"),
+            ("10.1/b", "10.7554/eLife.00003", "bib1"),
+        ]
+        with citation_index.CitationIndexFile(self.index_path) as index_file:
+            self.assertEqual(len(index_file), 3)
+            self.assertEqual(list(index_file.entries()), expected_entries)
+            self.assertEqual(
+                index_file.citing("10.1/b"),
+                [("10.7554/eLife.00002", "bib2"), ("10.7554/eLife.00003", "bib1")],
+            )
+        self.assertEqual(
+            citation_index.CitationIndex.load(self.index_path).entries(),
+            expected_entries,
+        )
+        # the delta is written into the index file once it is too large
+        citation_index.update_index_file(
+            self.index_path,
+            [citing_article("10.7554/eLife.00004", ["10.1/c"])],
+            max_delta_articles=2,
+        )
+        self.assertFalse(os.path.exists(delta_path))
+        with citation_index.CitationIndexFile(self.index_path) as index_file:
+            self.assertEqual(len(index_file), 4)
+            self.assertEqual(
+                index_file.citing("10.1/c"), [("10.7554/eLife.00004", "bib1")]
+            )
+
+    @unittest.skipIf(citation_index.fcntl is None, "fcntl is not available")
+    def test_update_during_compaction(self):
+        "lines appended while the delta file is merged are not lost"
+        citation_index.update_index_file(
+            self.index_path, [citing_article("10.7554/eLife.00001", ["10.1/a"])]
+        )
+        update_thread = threading.Thread(
+            target=citation_index.update_index_file,
+            args=(
+                self.index_path,
+                [citing_article("10.7554/eLife.00002", ["10.1/b"])],
+            ),
+        )
+        write = citation_index.CitationIndex.write
+
+        def write_during_update(index, file_path):
+            # another writer appends to the delta file while this one merges it
+            update_thread.start()
+            time.sleep(0.2)
+            self.assertTrue(update_thread.is_alive())
+            write(index, file_path)
+
+        with patch.object(citation_index.CitationIndex, "write", write_during_update):
+            citation_index.compact_index_file(self.index_path)
+        update_thread.join()
+        with citation_index.CitationIndexFile(self.index_path) as index_file:
+            self.assertEqual(
+                index_file.citing("10.1/b"), [("10.7554/eLife.00002", "bib1")]
+            )
+            self.assertEqual(
+                index_file.citing("10.1/a"), [("10.7554/eLife.00001", "bib1")]
+            )
+
+    def test_incomplete_delta_line(self):
+        "a delta line still being written is left out"
+        citation_index.update_index_file(
+            self.index_path, [citing_article("10.7554/eLife.00001", ["10.1/a"])]
+        )
+        with open(citation_index.delta_file_path(self.index_path), "ab") as open_file:
+            open_file.write(b'["10.7554/eLife.00002", [["10.1/a"')
+        with citation_index.CitationIndexFile(self.index_path) as index_file:
+            self.assertEqual(
+                index_file.citing("10.1/a"), [("10.7554/eLife.00001", "bib1")]
+            )
+
+    def test_empty_index(self):
+        citation_index.CitationIndex().write(self.index_path)
+        with citation_index.CitationIndexFile(self.index_path) as index_file:
+            self.assertEqual(len(index_file), 0)
+            self.assertEqual(index_file.citing("10.1/a"), [])
+
+    def test_not_index_file(self):
+        with open(self.index_path, "wb") as open_file:
+            open_file.write(b"not an index")
+        with self.assertRaises(ValueError):
+            citation_index.CitationIndexFile(self.index_path)
@@ -0,0 +1,125 @@
+import unittest
+import os
+import tempfile
+from elifearticle import article as ea
+from elifearticle import columnar, parse
+from tests import XLS_PATH
+
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.temp_dir.name, "articles.eacols")
+        self.articles = [
+            parse.build_article_from_xml(os.path.join(XLS_PATH, xml_file), "full")[0]
+            for xml_file in ["elife-02935-v2.xml", "elife-00666.xml"]
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_export_articles(self):
+        count = columnar.export_articles(iter(self.articles), self.file_path)
+        self.assertEqual(count, 2)
+        with columnar.ColumnarFile(self.file_path) as columnar_file:
+            self.assertEqual(columnar_file.tables(), list(columnar.TABLE_KEYS))
+            self.assertEqual(columnar_file.rows("articles"), 2)
+            self.assertEqual(
+                columnar_file.values("articles", "doi"),
+                ["10.7554/eLife.02935", "10.7554/eLife.00666"],
+            )
+            self.assertEqual(columnar_file.values("articles", "version"), [2, None])
+            self.assertEqual(
+                columnar_file.values("articles", "is_poa"),
+                [article.is_poa for article in self.articles],
+            )
+            contributor_count = sum(
+                len(article.contributors) for article in self.articles
+            )
+            self.assertEqual(columnar_file.rows("contributors"), contributor_count)
+            article_ids = columnar_file.column("contributors", "article_id")
+            self.assertEqual(article_ids.tolist().count(0), 180)
+            self.assertEqual(
+                columnar_file.values("contributors", "surname")[0],
+                self.articles[0].contributors[0].surname,
+            )
+            del article_ids
+
+    def test_citations(self):
+        columnar.export_articles(self.articles, self.file_path)
+        with columnar.ColumnarFile(self.file_path) as columnar_file:
+            article_ids = columnar_file.values("citations", "article_id")
+            data_refs = columnar_file.values("citations", "data_ref")
+            titles = columnar_file.values("citations", "article_title")
+            self.assertEqual(
+                [
+                    title
+                    for article_id, data_ref, title in zip(
+                        article_ids, data_refs, titles
+                    )
+                    if article_id == 0 and data_ref == 0
+                ],
+                [ref.article_title for ref in self.articles[0].ref_list],
+            )
+
+    def test_affiliations(self):
+        "affiliation rows join to contributor rows by contributor_id"
+        columnar.export_articles(self.articles, self.file_path)
+        with columnar.ColumnarFile(self.file_path) as columnar_file:
+            contributor_ids = columnar_file.values("affiliations", "contributor_id")
+            institutions = columnar_file.values("affiliations", "institution")
+        contributor = self.articles[0].contributors[0]
+        self.assertEqual(
+            [
+                institution
+                for contributor_id, institution in zip(contributor_ids, institutions)
+                if contributor_id == 0
+            ],
+            [affiliation.institution for affiliation in contributor.affiliations],
+        )
+
+    def test_awards(self):
+        "every award of a funding award is a row joined by funding_award_id"
+        article = parse.build_article_from_xml(
+            os.path.join(XLS_PATH, "elife-1234567890-v2.xml"), "full"
+        )[0]
+        funding_award = article.funding_awards[0]
+        award = ea.Award()
+        award.award_id = "second"
+        funding_award.add_award(award)
+        columnar.export_articles([article], self.file_path)
+        with columnar.ColumnarFile(self.file_path) as columnar_file:
+            self.assertEqual(
+                columnar_file.rows("awards"),
+                sum(
+                    len(funding_award.awards)
+                    for funding_award in article.funding_awards
+                ),
+            )
+            funding_award_ids = columnar_file.values("awards", "funding_award_id")
+            award_ids = columnar_file.values("awards", "award_id")
+            self.assertNotIn("award_id", columnar_file.columns("funding_awards"))
+        self.assertEqual(
+            [
+                award_id
+                for funding_award_id, award_id in zip(funding_award_ids, award_ids)
+                if funding_award_id == 0
+            ],
+            [award.award_id for award in funding_award.awards],
+        )
+
+    def test_str_codes(self):
+        "str columns are codes into the list of distinct values"
+        columnar.export_articles(self.articles, self.file_path)
+        with columnar.ColumnarFile(self.file_path) as columnar_file:
+            strings = columnar_file.string_values("contributors", "contrib_type")
+            codes = columnar_file.column("contributors", "contrib_type")
+            self.assertEqual(strings[codes[0]], "author")
+            self.assertEqual(len(strings), len(set(strings)))
+            del codes
+
+    def test_not_columnar_file(self):
+        with open(self.file_path, "wb") as open_file:
+            open_file.write(b"<article/>")
+        with self.assertRaises(ValueError):
+            columnar.ColumnarFile(self.file_path)
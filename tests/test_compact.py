@@ -0,0 +1,136 @@
+import unittest
+import copy
+import gc
+import os
+import pickle
+import time
+import tracemalloc
+from elifearticle import article as ea
+from elifearticle import compact, parse
+from tests import XLS_PATH
+
+
+def traced_memory(function):
+    "memory allocated by the function and still held by its return value"
+    gc.collect()
+    tracemalloc.start()
+    value = function()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del value
+    return size
+
+
+class TestCompactClasses(unittest.TestCase):
+    def test_slots(self):
+        contributor = compact.CompactContributor("author", "Surname", "Given")
+        self.assertFalse(hasattr(contributor, "__dict__"))
+        self.assertIn("orcid", compact.CompactContributor.__slots__)
+        self.assertIn("section_hashes", compact.CompactArticle.__slots__)
+
+    def test_defaults(self):
+        "attributes which are not set have the default of the original class"
+        contributor = compact.CompactContributor("author", "Surname", "Given")
+        self.assertIsNone(contributor.orcid)
+        self.assertEqual(contributor.roles, [])
+        self.assertFalse(contributor.corresp)
+        with self.assertRaises(AttributeError):
+            contributor.not_an_attribute
+        with self.assertRaises(AttributeError):
+            contributor.not_an_attribute = True
+
+    def test_str(self):
+        "only attributes which are set are included, the same as the original class"
+        role = compact.CompactRole("Author", "author")
+        self.assertEqual(str(role), str(ea.Role("Author", "author")))
+        contributor = compact.CompactContributor("author", "Surname", "Given")
+        self.assertEqual(
+            str(contributor), str(ea.Contributor("author", "Surname", "Given"))
+        )
+
+    def test_attribute_order(self):
+        "attributes are in the order they were set, the same as the original class"
+        affiliation = compact.CompactAffiliation()
+        original_affiliation = ea.Affiliation()
+        for obj in [affiliation, original_affiliation]:
+            obj.country = "UK"
+            obj.city = "Cambridge"
+            obj.country = "United Kingdom"
+        self.assertEqual(
+            affiliation.attribute_items(), list(original_affiliation.attribute_items())
+        )
+        self.assertEqual(str(affiliation), str(original_affiliation))
+        del affiliation.country
+        self.assertEqual(affiliation.attribute_items(), [("city", "Cambridge")])
+        self.assertIsNone(affiliation.country)
+
+    def test_methods(self):
+        article = compact.CompactArticle("10.7554/eLife.00666")
+        article.add_date(
+            compact.CompactArticleDate("received", time.strptime("2016", "%Y"))
+        )
+        self.assertEqual(article.get_date("received").date.tm_year, 2016)
+        self.assertFalse(article.has_contributor_conflict())
+        self.assertEqual(article.pretty().get("doi"), "10.7554/eLife.00666")
+
+
+class TestCompact(unittest.TestCase):
+    def setUp(self):
+        self.article, error_count = parse.build_article_from_xml(
+            os.path.join(XLS_PATH, "elife-00666.xml"), "full"
+        )
+
+    def test_compact(self):
+        compact_article = compact.compact(self.article)
+        self.assertIsInstance(compact_article, compact.CompactArticle)
+        self.assertEqual(compact_article.pretty(), self.article.pretty())
+        self.assertEqual(str(compact_article), str(self.article))
+        self.assertEqual(str(compact_article.license), str(self.article.license))
+        self.assertEqual(compact_article.title, self.article.title)
+        self.assertEqual(
+            [str(ref) for ref in compact_article.ref_list],
+            [str(ref) for ref in self.article.ref_list],
+        )
+        self.assertIsInstance(
+            compact_article.contributors[0], compact.CompactContributor
+        )
+        self.assertIsInstance(
+            compact_article.contributors[0].affiliations[0],
+            compact.CompactAffiliation,
+        )
+        self.assertEqual(
+            compact_article.get_date("received").date,
+            self.article.get_date("received").date,
+        )
+
+    def test_compact_shared_objects(self):
+        "an object in more than one place is still shared after compacting"
+        review_article = self.article.review_articles[0]
+        compact_article = compact.compact(self.article)
+        compact_review_article = compact_article.review_articles[0]
+        self.assertIs(
+            compact_review_article.license,
+            compact_review_article.related_articles[0].license,
+        )
+        self.assertIs(
+            review_article.license, review_article.related_articles[0].license
+        )
+
+    def test_pickle(self):
+        compact_article = compact.compact(self.article)
+        for copied_article in [
+            pickle.loads(pickle.dumps(compact_article)),
+            copy.deepcopy(compact_article),
+        ]:
+            self.assertEqual(str(copied_article), str(compact_article))
+            self.assertEqual(copied_article.pretty(), compact_article.pretty())
+            self.assertEqual(str(copied_article.license), str(compact_article.license))
+
+    def test_memory(self):
+        "compact articles use less memory than the original articles"
+        size = traced_memory(lambda: [copy.deepcopy(self.article) for i in range(20)])
+        compact_size = traced_memory(
+            lambda: [compact.compact(copy.deepcopy(self.article)) for i in range(20)]
+        )
+        self.assertLess(compact_size, size * 0.8)
@@ -0,0 +1,118 @@
+import unittest
+import glob
+import os
+import pickle
+from elifearticle import article as ea
+from elifearticle import compact, fingerprint, parse
+from tests import XLS_PATH
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_fingerprint_builds(self):
+        "an article built twice has the same fingerprint, each article is different"
+        fingerprints = set()
+        for xml_file in sorted(glob.glob(os.path.join(XLS_PATH, "*.xml"))):
+            article, error_count = parse.build_article_from_xml(xml_file, "full")
+            new_article, error_count = parse.build_article_from_xml(xml_file, "full")
+            self.assertEqual(
+                fingerprint.fingerprint(new_article), fingerprint.fingerprint(article)
+            )
+            self.assertEqual(
+                fingerprint.fingerprint(pickle.loads(pickle.dumps(article))),
+                fingerprint.fingerprint(article),
+            )
+            self.assertEqual(fingerprint.diff(article, new_article), [])
+            fingerprints.add(fingerprint.fingerprint(article))
+        self.assertEqual(
+            len(fingerprints), len(glob.glob(os.path.join(XLS_PATH, "*.xml")))
+        )
+
+    def test_fingerprint_compact(self):
+        article, error_count = parse.build_article_from_xml(
+            os.path.join(XLS_PATH, "elife-02935-v2.xml"), "full"
+        )
+        self.assertEqual(
+            fingerprint.fingerprint(compact.compact(article)),
+            fingerprint.fingerprint(article),
+        )
+
+    def test_fingerprint_attribute_order(self):
+        "the order attributes are set in does not change the fingerprint"
+        affiliation = ea.Affiliation()
+        affiliation.city = "Cambridge"
+        affiliation.country = "UK"
+        other_affiliation = ea.Affiliation()
+        other_affiliation.country = "UK"
+        other_affiliation.city = "Cambridge"
+        self.assertEqual(
+            fingerprint.fingerprint(other_affiliation),
+            fingerprint.fingerprint(affiliation),
+        )
+
+    def test_fingerprint_changed(self):
+        "a change to a child object changes the fingerprint of the article"
+        article = ea.Article("10.7554/eLife.00001", "Title")
+        contributor = ea.Contributor("author", "Surname", "Given")
+        article.add_contributor(contributor)
+        first_fingerprint = fingerprint.fingerprint(article)
+        contributor.surname = "Changed"
+        self.assertNotEqual(fingerprint.fingerprint(article), first_fingerprint)
+        contributor.surname = "Surname"
+        self.assertEqual(fingerprint.fingerprint(article), first_fingerprint)
+        contributor.corresp = 1
+        self.assertNotEqual(fingerprint.fingerprint(article), first_fingerprint)
+        contributor.corresp = True
+        self.assertNotEqual(
+            fingerprint.fingerprint(article),
+            fingerprint.fingerprint(ea.Contributor("author", "Surname", "Given")),
+        )
+
+    def test_diff(self):
+        article, error_count = parse.build_article_from_xml(
+            os.path.join(XLS_PATH, "elife-02935-v2.xml"), "full"
+        )
+        new_article, error_count = parse.build_article_from_xml(
+            os.path.join(XLS_PATH, "elife-02935-v2.xml"), "full"
+        )
+        new_article.contributors[3].surname = "Changed"
+        new_article.ref_list.pop()
+        new_article.get_date("received").day = "01"
+        new_article.section_hashes = {"article": "not content"}
+        self.assertEqual(
+            fingerprint.diff(article, new_article),
+            [
+                "contributors[3].surname",
+                "dates[received].day",
+                "ref_list[58]",
+            ],
+        )
+
+    def test_fingerprint_lazy_references(self):
+        "references built lazily have the same fingerprint as a list of them"
+        xml_file = os.path.join(XLS_PATH, "elife-00666.xml")
+        article, error_count = parse.build_article_from_xml(xml_file, "full")
+        lazy_articles = [
+            parse.build_article_from_xml(xml_file, "full", lazy_references=True)[0]
+            for i in range(2)
+        ]
+        self.assertEqual(
+            fingerprint.fingerprint(lazy_articles[0]),
+            fingerprint.fingerprint(lazy_articles[1]),
+        )
+        self.assertEqual(
+            fingerprint.fingerprint(lazy_articles[0]), fingerprint.fingerprint(article)
+        )
+        lazy_articles[1].ref_list[2].article_title = "Changed"
+        self.assertEqual(
+            fingerprint.diff(lazy_articles[0], lazy_articles[1]),
+            ["ref_list[2].article_title"],
+        )
+
+    def test_diff_values(self):
+        self.assertEqual(fingerprint.diff("a", "a"), [])
+        self.assertEqual(fingerprint.diff("a", "b"), [""])
+        self.assertEqual(fingerprint.diff([1, 2], [1, 3, 4]), ["[1]", "[2]"])
+        self.assertEqual(
+            fingerprint.diff(ea.Affiliation(), ea.Role()),
+            [""],
+        )
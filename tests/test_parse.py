@@ -1,9 +1,16 @@
 import unittest
+from unittest.mock import patch
+import copy
+import io
+import mmap
 import os
+import pickle
 from collections import OrderedDict
-from elifearticle import parse
+from elifetools import parseJATS as parser
+from elifearticle import article as ea
+from elifearticle import fingerprint, parse, utils
 from elifearticle.article import Preprint
-from tests import XLS_PATH
+from tests import XLS_PATH, article_values
 
 
 class TestParseXml(unittest.TestCase):
@@ -21,6 +28,102 @@ class TestParseXml(unittest.TestCase):
         articles = parse.build_articles_from_article_xmls(self.passes)
         self.assertEqual(len(articles), 7)
 
+    def test_iter_articles_from_article_xmls(self):
+        "articles are yielded one at a time with the filename and error count"
+        articles = parse.iter_articles_from_article_xmls(self.passes)
+        self.assertFalse(isinstance(articles, list))
+        article_xml, article, error_count = next(articles)
+        self.assertEqual(article_xml, self.passes[0])
+        self.assertEqual(article.doi, "10.7554/eLife.02935")
+        self.assertEqual(error_count, 0)
+        self.assertEqual(len(list(articles)), 6)
+
+    def test_iter_articles_from_article_xmls_workers(self):
+        article_xmls = [
+            os.path.join(XLS_PATH, "not-a-file.xml"),
+            os.path.join(XLS_PATH, "elife-00666.xml"),
+        ]
+        results = list(parse.iter_articles_from_article_xmls(article_xmls, workers=2))
+        self.assertEqual(
+            [(article_xml, error_count) for article_xml, _, error_count in results],
+            [(article_xmls[0], 1), (article_xmls[1], 0)],
+        )
+        self.assertIsNone(results[0][1])
+        self.assertEqual(results[1][1].doi, "10.7554/eLife.00666")
+
+    def test_iter_articles_from_article_xmls_workers_affiliation_pool(self):
+        "articles built by workers share the affiliations of the pool"
+        article_xml = os.path.join(XLS_PATH, "elife-02935-v2.xml")
+        affiliation_pool = parse.AffiliationPool()
+        article, error_count = parse.build_article_from_xml(
+            article_xml, "full", affiliation_pool=affiliation_pool
+        )
+        results = list(
+            parse.iter_articles_from_article_xmls(
+                [article_xml, article_xml],
+                workers=2,
+                affiliation_pool=affiliation_pool,
+            )
+        )
+        for article_xml, worker_article, error_count in results:
+            self.assertIs(
+                worker_article.contributors[0].affiliations[0],
+                article.contributors[0].affiliations[0],
+            )
+            self.assertEqual(str(worker_article), str(article))
+
+    def test_parse_workers(self):
+        "build in a pool of processes, articles are in the same order as the input"
+        articles = parse.build_articles_from_article_xmls(self.passes, workers=2)
+        expected = parse.build_articles_from_article_xmls(self.passes)
+        self.assertEqual(
+            [article.doi for article in articles],
+            [article.doi for article in expected],
+        )
+
+    def test_parse_workers_tag_cleaner(self):
+        "a TagCleaner is sent to the worker processes"
+        tag_cleaner = utils.TagCleaner(["italic"])
+        articles = parse.build_articles_from_article_xmls(
+            self.passes[:2], remove_tags=tag_cleaner, workers=2
+        )
+        expected = parse.build_articles_from_article_xmls(
+            self.passes[:2], remove_tags=["italic"]
+        )
+        self.assertEqual(
+            [article.abstract for article in articles],
+            [article.abstract for article in expected],
+        )
+
+    def test_parse_workers_failure(self):
+        "a file which cannot be built is left out and the batch continues"
+        article_xmls = [
+            os.path.join(XLS_PATH, "elife-02935-v2.xml"),
+            os.path.join(XLS_PATH, "not-a-file.xml"),
+            os.path.join(XLS_PATH, "elife-00666.xml"),
+        ]
+        articles = parse.build_articles_from_article_xmls_parallel(
+            article_xmls, workers=2
+        )
+        self.assertEqual(
+            [article.doi for article in articles],
+            ["10.7554/eLife.02935", "10.7554/eLife.00666"],
+        )
+
+    def test_build_article_from_xml_in_worker_failure(self):
+        (
+            article,
+            error_count,
+            error,
+            build_profile,
+        ) = parse.build_article_from_xml_in_worker(
+            os.path.join(XLS_PATH, "not-a-file.xml")
+        )
+        self.assertIsNone(article)
+        self.assertEqual(error_count, 1)
+        self.assertTrue(error.startswith("FileNotFoundError"))
+        self.assertIsNone(build_profile)
+
     def test_parse_build_parts_default(self):
         "test parse build parts"
 
@@ -114,6 +217,411 @@ class TestParseXml(unittest.TestCase):
         self.assertEqual(len(article.related_articles), 0)
 
 
+class TestParsedDocument(unittest.TestCase):
+    def test_parsed_document_partitions(self):
+        soup = parser.parse_document(os.path.join(XLS_PATH, "elife-00666.xml"))
+        document = parse.ParsedDocument(soup)
+        self.assertEqual(document.front.name, "front")
+        self.assertEqual(document.body.name, "body")
+        self.assertEqual(document.back.name, "back")
+        self.assertEqual(len(document.sub_articles), 2)
+
+    def test_parsed_document_parse(self):
+        "front parser functions return the same value as searching the whole soup"
+        soup = parser.parse_document(os.path.join(XLS_PATH, "elife-00666.xml"))
+        document = parse.ParsedDocument(soup)
+        for function_name in parse.FRONT_PARSER_FUNCTIONS:
+            function = getattr(parser, function_name)
+            self.assertEqual(
+                str(document.parse(function)), str(function(soup)), function_name
+            )
+
+    def test_parsed_document_parse_cached(self):
+        soup = parser.parse_document(os.path.join(XLS_PATH, "elife-00666.xml"))
+        document = parse.ParsedDocument(soup)
+        pub_history = document.parse(parser.pub_history)
+        self.assertIs(document.parse(parser.pub_history), pub_history)
+        self.assertEqual(document.parse(parser.journal_issn), "2050-084X")
+        self.assertEqual(document.parse(parser.journal_issn, "electronic"), "2050-084X")
+        self.assertEqual(
+            dict(document.parser_calls),
+            {
+                ("pub_history",): 1,
+                ("journal_issn",): 1,
+                ("journal_issn", "electronic"): 1,
+            },
+        )
+
+    def test_build_article_parser_calls(self):
+        "building an article runs each parser call only once"
+        documents = []
+
+        class RecordedDocument(parse.ParsedDocument):
+            def __init__(self, soup):
+                super().__init__(soup)
+                documents.append(self)
+
+        with patch.object(parse, "ParsedDocument", RecordedDocument):
+            parse.build_article_from_xml(
+                os.path.join(XLS_PATH, "elife-00666.xml"), detail="full"
+            )
+        parser_calls = documents[0].parser_calls
+        self.assertEqual(parser_calls.get(("publisher_id",)), 1)
+        self.assertEqual(parser_calls.get(("pub_history",)), 1)
+        self.assertEqual(max(parser_calls.values()), 1)
+
+    def test_parsed_document_no_front(self):
+        soup = parser.parse_xml("<root><doi>10.7554/eLife.00666</doi></root>")
+        document = parse.ParsedDocument(soup)
+        self.assertIsNone(document.front)
+        self.assertEqual(document.sub_articles, [])
+        self.assertIsNone(document.parse(parser.doi))
+
+
+class TestBuildArticleFromXmlInput(unittest.TestCase):
+    def setUp(self):
+        self.xml_file = os.path.join(XLS_PATH, "elife-02935-v2.xml")
+        with open(self.xml_file, "rb") as open_file:
+            self.xml = open_file.read()
+
+    def assert_article(self, article, version=2):
+        self.assertEqual(article.doi, "10.7554/eLife.02935")
+        self.assertEqual(article.version, version)
+        self.assertEqual(len(article.contributors), 180)
+
+    def test_bytes(self):
+        for engine in ["beautifulsoup", "lxml"]:
+            article, error_count = parse.build_article_from_xml(
+                self.xml, engine=engine, version=2
+            )
+            self.assert_article(article)
+
+    def test_bytes_no_version(self):
+        article, error_count = parse.build_article_from_xml(self.xml)
+        self.assert_article(article, version=None)
+
+    def test_memoryview(self):
+        for engine in ["beautifulsoup", "lxml"]:
+            article, error_count = parse.build_article_from_xml(
+                memoryview(self.xml), engine=engine, version=2
+            )
+            self.assert_article(article)
+
+    def test_mmap(self):
+        with open(self.xml_file, "rb") as open_file:
+            with mmap.mmap(open_file.fileno(), 0, access=mmap.ACCESS_READ) as xml:
+                for engine in ["beautifulsoup", "lxml"]:
+                    article, error_count = parse.build_article_from_xml(
+                        xml, engine=engine, version=2
+                    )
+                    self.assert_article(article)
+
+    def test_file_object(self):
+        "the version is taken from the name of the file object"
+        for engine in ["beautifulsoup", "lxml"]:
+            with open(self.xml_file, "rb") as open_file:
+                article, error_count = parse.build_article_from_xml(
+                    open_file, engine=engine
+                )
+            self.assert_article(article)
+
+    def test_file_like_object(self):
+        article, error_count = parse.build_article_from_xml(
+            io.BytesIO(self.xml), version=3
+        )
+        self.assert_article(article, version=3)
+
+    def test_text_file_object(self):
+        "str XML read from a text mode file is built by each engine"
+        for engine in ["beautifulsoup", "lxml"]:
+            with open(self.xml_file, encoding="utf8") as open_file:
+                article, error_count = parse.build_article_from_xml(
+                    open_file, engine=engine
+                )
+            self.assert_article(article)
+
+    def test_version_override(self):
+        article, error_count = parse.build_article_from_xml(self.xml_file, version=5)
+        self.assert_article(article, version=5)
+
+
+class TestLazyArticle(unittest.TestCase):
+    def setUp(self):
+        self.xml_file = os.path.join(XLS_PATH, "elife-02935-v2.xml")
+
+    def test_lazy_build_part(self):
+        "a part is only built when one of its attributes is read"
+        article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", lazy=True
+        )
+        self.assertEqual(error_count, 0)
+        self.assertEqual(article.doi, "10.7554/eLife.02935")
+        self.assertEqual(article.version, 2)
+        self.assertNotIn(("refs",), article.document.parser_calls)
+        self.assertEqual(len(article.contributors), 180)
+        self.assertEqual(len(article.editors), 1)
+        self.assertNotIn(("refs",), article.document.parser_calls)
+        self.assertNotIn("contributors", article.unbuilt_parts)
+        self.assertEqual(len(article.ref_list), 59)
+        self.assertEqual(article.document.parser_calls[("refs",)], 1)
+
+    def test_lazy_same_as_eager(self):
+        article, error_count = parse.build_article_from_xml(self.xml_file, "full")
+        lazy_article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", lazy=True
+        )
+        self.assertEqual(
+            [str(date) for date in lazy_article.dates.values()],
+            [str(date) for date in article.dates.values()],
+        )
+        self.assertEqual(lazy_article.title, article.title)
+        self.assertEqual(lazy_article.is_poa, article.is_poa)
+        self.assertEqual(
+            len(lazy_article.review_articles), len(article.review_articles)
+        )
+
+    def test_lazy_release_document(self):
+        "the document is released when all parts are built"
+        article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", ["basic", "volume"], lazy=True
+        )
+        self.assertEqual(article.unbuilt_parts, ["basic", "volume"])
+        self.assertEqual(article.volume, "3")
+        self.assertIsNotNone(article.document)
+        article.build_all_parts()
+        self.assertIsNone(article.document)
+        self.assertEqual(article.unbuilt_parts, [])
+        # parts not in build_parts are not built
+        self.assertEqual(article.ref_list, [])
+
+    def test_lazy_close(self):
+        article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", lazy=True
+        )
+        article.close()
+        self.assertIsNone(article.document)
+        self.assertEqual(article.contributors, [])
+        self.assertIsNone(article.title)
+
+    def test_lazy_set_attribute(self):
+        article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", lazy=True
+        )
+        article.title = "A title"
+        self.assertEqual(article.title, "A title")
+        self.assertNotIn("basic", article.unbuilt_parts)
+        article.build_all_parts()
+        self.assertEqual(article.title, "A title")
+
+    def test_lazy_deepcopy(self):
+        "a copy is an Article with every part built"
+        article, error_count = parse.build_article_from_xml(self.xml_file, "full")
+        lazy_article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", lazy=True
+        )
+        copied_article = copy.deepcopy(lazy_article)
+        self.assertIs(type(copied_article), ea.Article)
+        self.assertEqual(str(copied_article), str(article))
+        self.assertEqual(article_values(copied_article), article_values(article))
+
+    def test_lazy_str_and_pretty(self):
+        "the output has every part built and not the attributes used to build"
+        article, error_count = parse.build_article_from_xml(self.xml_file, "full")
+        lazy_article, error_count = parse.build_article_from_xml(
+            self.xml_file, "full", lazy=True
+        )
+        self.assertEqual(str(lazy_article), str(article))
+        self.assertEqual(lazy_article.pretty(), article.pretty())
+
+    def test_lazy_pickle(self):
+        "a lazy article is pickled as an article with every part built"
+        article, error_count = parse.build_article_from_xml(self.xml_file, "full")
+        for engine in ["beautifulsoup", "lxml"]:
+            lazy_article, error_count = parse.build_article_from_xml(
+                self.xml_file, "full", lazy=True, engine=engine
+            )
+            new_article = pickle.loads(pickle.dumps(lazy_article))
+            self.assertIs(type(new_article), ea.Article)
+            self.assertEqual(fingerprint.diff(article, new_article), [])
+
+
+class TestRebuildArticleFromXml(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(XLS_PATH, "elife-02935-v2.xml"), "rb") as open_file:
+            self.xml = open_file.read()
+        self.built_parts = []
+        build_part_functions = OrderedDict(
+            (part, self.recorder(part, function))
+            for part, function in parse.BUILD_PART_FUNCTIONS.items()
+        )
+        patcher = patch.dict(parse.BUILD_PART_FUNCTIONS, build_part_functions)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def recorder(self, part, function):
+        def build_part(*args):
+            self.built_parts.append(part)
+            return function(*args)
+
+        return build_part
+
+    def test_rebuild_unchanged(self):
+        article, error_count = parse.rebuild_article_from_xml(None, self.xml, "full")
+        self.assertEqual(self.built_parts, list(parse.BUILD_PART_FUNCTIONS))
+        self.assertEqual(
+            sorted(article.section_hashes),
+            ["article", "back", "body", "front", "sub_articles"],
+        )
+        self.built_parts = []
+        new_article, error_count = parse.rebuild_article_from_xml(
+            article, self.xml, "full", version=2
+        )
+        self.assertEqual(error_count, 0)
+        self.assertEqual(self.built_parts, [])
+        self.assertEqual(new_article.doi, "10.7554/eLife.02935")
+        self.assertEqual(new_article.version, 2)
+        # copied parts are not shared with the previous article
+        self.assertIsNot(new_article.contributors, article.contributors)
+        self.assertEqual(fingerprint.diff(article, new_article), ["version"])
+        new_article.contributors[0].surname = "Changed"
+        self.assertEqual(article.contributors[0].surname, "Ju")
+
+    def test_rebuild_changed_reference(self):
+        article, error_count = parse.rebuild_article_from_xml(None, self.xml, "full")
+        self.built_parts = []
+        new_xml = self.xml.replace(
+            b"Signatures of mutational processes in human cancer",
+            b"Signatures of mutational processes",
+        )
+        new_article, error_count = parse.rebuild_article_from_xml(
+            article, new_xml, "full"
+        )
+        self.assertEqual(
+            self.built_parts,
+            ["contributors", "datasets", "references", "components", "volume"],
+        )
+        self.assertEqual(
+            new_article.ref_list[0].article_title, "Signatures of mutational processes"
+        )
+        self.assertIsNot(new_article.review_articles, article.review_articles)
+        self.assertEqual(len(new_article.contributors), 180)
+
+    def test_rebuild_changed_date(self):
+        "parts setting the same attribute are built together"
+        article, error_count = parse.rebuild_article_from_xml(
+            None, self.xml, "full", ["history", "pub_dates", "references"]
+        )
+        self.built_parts = []
+        new_xml = self.xml.replace(
+            b'<date date-type="received"><day>28</day>',
+            b'<date date-type="received"><day>27</day>',
+        )
+        new_article, error_count = parse.rebuild_article_from_xml(
+            article, new_xml, "full", ["history", "pub_dates", "references"]
+        )
+        self.assertEqual(self.built_parts, ["history", "pub_dates"])
+        self.assertEqual(new_article.get_date("received").date.tm_mday, 27)
+        self.assertIsNotNone(new_article.get_date("pub"))
+        self.assertIsNot(new_article.ref_list, article.ref_list)
+        self.assertEqual(fingerprint.diff(article.ref_list, new_article.ref_list), [])
+
+    def test_rebuild_same_as_build(self):
+        "an article rebuilt after a change is the same as one built in full"
+        sub_article_start = self.xml.index(b"<sub-article")
+        changes = [
+            (
+                b"<article-title>Origins and functional consequences",
+                b"<article-title>Changed origins and functional consequences",
+            ),
+            (
+                b"Signatures of mutational processes in human cancer",
+                b"Signatures of mutational processes",
+            ),
+            (b"<surname>Golub</surname>", b"<surname>Changed</surname>"),
+        ]
+        article, error_count = parse.rebuild_article_from_xml(None, self.xml, "full")
+        for old, new in changes:
+            start = sub_article_start if new == b"<surname>Changed</surname>" else 0
+            new_xml = self.xml[:start] + self.xml[start:].replace(old, new, 1)
+            self.assertNotEqual(new_xml, self.xml)
+            new_article, error_count = parse.rebuild_article_from_xml(
+                article, new_xml, "full"
+            )
+            built_article, error_count = parse.build_article_from_xml(new_xml, "full")
+            self.assertEqual(fingerprint.diff(built_article, new_article), [])
+            self.assertNotEqual(fingerprint.diff(article, new_article), [])
+
+    def test_rebuild_changed_title(self):
+        "the parent article of each review article has the new title"
+        article, error_count = parse.rebuild_article_from_xml(None, self.xml, "full")
+        new_xml = self.xml.replace(
+            b"<article-title>Origins", b"<article-title>Changed origins", 1
+        )
+        new_article, error_count = parse.rebuild_article_from_xml(
+            article, new_xml, "full"
+        )
+        self.assertTrue(new_article.title.startswith("Changed origins"))
+        for review_article in new_article.review_articles:
+            self.assertEqual(
+                review_article.related_articles[0].title, new_article.title
+            )
+
+    def test_rebuild_from_built_article(self):
+        "an article without section hashes is built in full"
+        article, error_count = parse.build_article_from_xml(self.xml, "full")
+        self.built_parts = []
+        new_article, error_count = parse.rebuild_article_from_xml(
+            article, self.xml, "full"
+        )
+        self.assertEqual(self.built_parts, list(parse.BUILD_PART_FUNCTIONS))
+
+
+class TestCleanAbstract(unittest.TestCase):
+    def test_clean_abstract(self):
+        abstract = (
+            '<p>A <xref ref-type="bibr">ref</xref> in <italic>italic</italic></p>'
+        )
+        self.assertEqual(
+            parse.clean_abstract(abstract), "<p>A ref in <italic>italic</italic></p>"
+        )
+        self.assertEqual(parse.clean_abstract(abstract, []), abstract)
+        self.assertEqual(
+            parse.clean_abstract(abstract, ["italic"]),
+            '<p>A <xref ref-type="bibr">ref</xref> in italic</p>',
+        )
+        self.assertEqual(
+            parse.clean_abstract(abstract, utils.TagCleaner(["italic", "xref"])),
+            "<p>A ref in italic</p>",
+        )
+
+    def test_build_article_tag_cleaner(self):
+        "a TagCleaner builds the same article as its list of tag names"
+        article_xml = os.path.join(XLS_PATH, "elife-02935-v2.xml")
+        remove_tags = ["xref", "italic"]
+        article, error_count = parse.build_article_from_xml(
+            article_xml, "full", remove_tags=remove_tags
+        )
+        cleaner_article, error_count = parse.build_article_from_xml(
+            article_xml, "full", remove_tags=utils.TagCleaner(remove_tags)
+        )
+        self.assertEqual(cleaner_article.abstract, article.abstract)
+        self.assertEqual(cleaner_article.digest, article.digest)
+        self.assertNotIn("<italic>", cleaner_article.abstract)
+
+    def test_build_components_tag_cleaner(self):
+        components = [{"type": "fig", "full_caption": "<p><italic>A</italic> fig</p>"}]
+        self.assertEqual(
+            parse.build_components(components)[0].subtitle,
+            "<p><italic>A</italic> fig</p>",
+        )
+        self.assertEqual(
+            parse.build_components(components, utils.TagCleaner(["italic"]))[
+                0
+            ].subtitle,
+            "<p>A fig</p>",
+        )
+
+
 class TestBuildContributors(unittest.TestCase):
     def test_build_contributors(self):
         "test for when a contributor has no surname"
@@ -157,6 +665,129 @@ class TestBuildContributors(unittest.TestCase):
             ),
         )
 
+    def test_build_contributors_shared_affiliations(self):
+        "contributors built with a pool share one object for the same values"
+        authors = [
+            {"surname": "Foo", "affiliations": [{"institution": "Bristol"}]},
+            {
+                "surname": "Bar",
+                "affiliations": [{"institution": "Bristol"}, {"institution": "Bath"}],
+            },
+        ]
+        # without a pool each contributor has its own affiliations
+        contributors = parse.build_contributors(authors, "author")
+        self.assertIsNot(
+            contributors[0].affiliations[0], contributors[1].affiliations[0]
+        )
+        contributors[0].affiliations[0].city = "Bristol"
+        self.assertIsNone(contributors[1].affiliations[0].city)
+        affiliation_pool = parse.AffiliationPool()
+        pool_contributors = parse.build_contributors(
+            authors, "author", affiliation_pool=affiliation_pool
+        )
+        self.assertIs(
+            pool_contributors[0].affiliations[0], pool_contributors[1].affiliations[0]
+        )
+        self.assertIsNot(
+            pool_contributors[1].affiliations[0], pool_contributors[1].affiliations[1]
+        )
+        self.assertEqual(len(affiliation_pool.affiliations), 2)
+
+    def test_build_contributors_competing_interests(self):
+        "conflicts are the cleaned text of each competing interest referenced"
+        competing_interests = [
+            {"id": "conf1", "text": "<p>No competing interests.</p>"},
+            {"id": "conf2", "text": "<p>Is an <italic>editor</italic>.</p>"},
+            {"id": "conf2", "text": "Is a founder."},
+            {"id": "conf3"},
+        ]
+        authors = [
+            {"surname": "Foo", "references": {"competing-interest": ["conf2"]}},
+            {
+                "surname": "Bar",
+                "references": {"competing-interest": ["conf3", "conf1", "conf4"]},
+            },
+            {"surname": "Baz"},
+        ]
+        contributors = parse.build_contributors(authors, "author", competing_interests)
+        self.assertEqual(
+            contributors[0].conflict,
+            ["Is an <italic>editor</italic>.", "Is a founder."],
+        )
+        self.assertEqual(contributors[1].conflict, ["No competing interests."])
+        self.assertEqual(contributors[2].conflict, [])
+
+    def test_group_contributors(self):
+        contributors = [
+            {"type": "editor", "surname": "One"},
+            {"type": "author", "surname": "Two"},
+            {"type": "reviewer", "surname": "Three"},
+            {"type": "on-behalf-of", "on-behalf-of": "Four"},
+            {"type": "editor", "surname": "Five"},
+        ]
+        groups = parse.group_contributors(
+            contributors,
+            OrderedDict(
+                [("author", ["author", "on-behalf-of"]), ("editor", ["editor"])]
+            ),
+        )
+        self.assertEqual(list(groups), ["author", "editor"])
+        self.assertEqual(groups.get("author"), [contributors[1], contributors[3]])
+        self.assertEqual(groups.get("editor"), [contributors[0], contributors[4]])
+
+    def test_build_article_editor_contrib_types(self):
+        "only the editor types in EDITOR_CONTRIB_TYPES are built as editors"
+        article_xml = os.path.join(XLS_PATH, "elife-1234567890-v2.xml")
+        article, error_count = parse.build_article_from_xml(article_xml)
+        self.assertEqual(
+            [editor.contrib_type for editor in article.editors],
+            ["editor", "senior_editor"],
+        )
+        with patch.object(parse, "EDITOR_CONTRIB_TYPES", ["senior_editor", "editor"]):
+            article, error_count = parse.build_article_from_xml(article_xml)
+        self.assertEqual(
+            [editor.contrib_type for editor in article.editors],
+            ["senior_editor", "editor"],
+        )
+
+    def test_competing_interest_texts(self):
+        self.assertEqual(parse.competing_interest_texts(None), {})
+        self.assertEqual(
+            parse.competing_interest_texts(
+                [{"id": "conf1", "text": "<p>Text</p>"}, {"id": "conf2", "text": ""}]
+            ),
+            {"conf1": ["Text"]},
+        )
+
+    def test_build_article_shared_affiliations(self):
+        article_xml = os.path.join(XLS_PATH, "elife-02935-v2.xml")
+        affiliation_pool = parse.AffiliationPool()
+        articles = [
+            parse.build_article_from_xml(
+                article_xml, "full", affiliation_pool=affiliation_pool
+            )[0]
+            for i in range(2)
+        ]
+        affiliations = [
+            affiliation
+            for contributor in articles[0].contributors
+            for affiliation in contributor.affiliations
+        ]
+        self.assertGreater(len(affiliations), len(affiliation_pool.affiliations))
+        self.assertIs(
+            articles[0].contributors[0].affiliations[0],
+            articles[1].contributors[0].affiliations[0],
+        )
+        article, error_count = parse.build_article_from_xml(article_xml, "full")
+        self.assertIsNot(
+            article.contributors[0].affiliations[0],
+            articles[0].contributors[0].affiliations[0],
+        )
+        self.assertEqual(
+            str(article.contributors[0].affiliations[0]),
+            str(articles[0].contributors[0].affiliations[0]),
+        )
+
     def test_build_anonymous_contributor(self):
         "test for an anonymous contributor"
         authors = [{"anonymous": True, "role": "Reviewer", "type": "author"}]
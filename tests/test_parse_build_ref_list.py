@@ -1,8 +1,10 @@
 import unittest
 import os
+import pickle
+from collections import OrderedDict
 
 from elifearticle import parse
-from tests import XLS_PATH
+from tests import XLS_PATH, article_values
 
 
 class TestParseBuildRefList(unittest.TestCase):
@@ -117,3 +119,86 @@ class TestBuildRefList(unittest.TestCase):
         refs = [{"year-iso-8601-date": "2012, . 2011"}]
         ref_list = parse.build_ref_list(refs)
         self.assertEqual(ref_list[0].year_numeric, None)
+
+    def test_uri_text(self):
+        "uri_text is used when there is no uri"
+        refs = [{"uri_text": "https://example.org"}, {"uri": "", "uri_text": "text"}]
+        ref_list = parse.build_ref_list(refs)
+        self.assertEqual(ref_list[0].uri, "https://example.org")
+        self.assertEqual(ref_list[1].uri, "text")
+
+    def test_field_map(self):
+        "a field added to a copy of the field map is set on the citations"
+        field_map = parse.REF_FIELD_MAP.copy()
+        field_map["volume_title"] = "volume-title"
+        refs = [{"id": "bib1", "volume-title": "Volume", "source": "Source"}]
+        ref_list = parse.build_ref_list(refs, field_map)
+        self.assertEqual(ref_list[0].volume_title, "Volume")
+        self.assertEqual(ref_list[0].source, "Source")
+        self.assertIsNone(parse.build_ref_list(refs)[0].volume_title)
+
+    def test_compile_field_map(self):
+        fields, fallback_fields = parse.compile_field_map(
+            OrderedDict([("id", "id"), ("uri", ["uri", "uri_text"])])
+        )
+        self.assertEqual(fields, (("id", "id"), ("uri", "uri")))
+        self.assertEqual(fallback_fields, (("uri", ("uri_text",)),))
+
+    def test_iter_ref_list(self):
+        refs = iter([{"id": "bib1"}, {"id": "bib2"}])
+        ref_list = parse.iter_ref_list(refs)
+        self.assertEqual(next(ref_list).id, "bib1")
+        self.assertEqual([ref.id for ref in ref_list], ["bib2"])
+        self.assertEqual(list(parse.iter_data_ref_list(None)), [])
+
+
+class TestLazySequence(unittest.TestCase):
+    def test_lazy_sequence(self):
+        "the iterator is only consumed as far as the items read"
+        iterator = iter(range(5))
+        sequence = parse.LazySequence(iterator)
+        self.assertEqual(sequence[1], 1)
+        self.assertEqual(next(iterator), 2)
+        self.assertEqual(list(sequence), [0, 1, 3, 4])
+        self.assertEqual(len(sequence), 4)
+        self.assertEqual(sequence[-1], 4)
+        self.assertEqual(sequence[1:3], [1, 3])
+        self.assertEqual(sequence, [0, 1, 3, 4])
+        with self.assertRaises(IndexError):
+            sequence[4]
+
+    def test_pickle(self):
+        sequence = parse.LazySequence(iter(["a", "b"]))
+        self.assertEqual(pickle.loads(pickle.dumps(sequence)), ["a", "b"])
+
+
+class TestLazyReferences(unittest.TestCase):
+    def test_build_article_lazy_references(self):
+        "references built lazily are the same as the references list"
+        xml_file = os.path.join(XLS_PATH, "elife-00666.xml")
+        article, error_count = parse.build_article_from_xml(xml_file, "full")
+        lazy_article, error_count = parse.build_article_from_xml(
+            xml_file, "full", lazy_references=True
+        )
+        self.assertIsInstance(lazy_article.ref_list, parse.LazySequence)
+        self.assertEqual(lazy_article.ref_list[0].id, "bib1")
+        self.assertEqual(len(lazy_article.ref_list.items), 1)
+        self.assertEqual(
+            article_values(list(lazy_article.ref_list)),
+            article_values(article.ref_list),
+        )
+        self.assertEqual(
+            article_values(list(lazy_article.data_ref_list)),
+            article_values(article.data_ref_list),
+        )
+
+    def test_build_article_lazy_references_no_data_refs(self):
+        "an article without data references has an empty lazy data_ref_list"
+        xml_file = os.path.join(XLS_PATH, "elife-02935-v2.xml")
+        article, error_count = parse.build_article_from_xml(xml_file, "full")
+        lazy_article, error_count = parse.build_article_from_xml(
+            xml_file, "full", lazy_references=True
+        )
+        self.assertEqual(list(lazy_article.data_ref_list), [])
+        self.assertEqual(str(lazy_article), str(article))
+        self.assertEqual(lazy_article.pretty(), article.pretty())
@@ -92,3 +92,30 @@ class TestParseBuildReviewArticles(unittest.TestCase):
         self.assertEqual(
             review_articles[0].related_articles[0].doi, "10.7554/eLife.00666"
         )
+
+    def test_build_review_articles_contributor_order(self):
+        "contributors of each type are built in a batch and keep their order"
+        sub_articles_data = [
+            {
+                "doi": "10.7554/eLife.00666.sa1",
+                "contributors": [
+                    {"type": "author", "surname": "One"},
+                    {"type": "author", "surname": "Two"},
+                    {"type": "editor", "surname": "Three"},
+                    {"type": "author", "surname": "Four"},
+                ],
+            }
+        ]
+        review_articles = parse.build_review_articles(sub_articles_data)
+        self.assertEqual(
+            [
+                (contributor.contrib_type, contributor.surname)
+                for contributor in review_articles[0].contributors
+            ],
+            [
+                ("author", "One"),
+                ("author", "Two"),
+                ("editor", "Three"),
+                ("author", "Four"),
+            ],
+        )
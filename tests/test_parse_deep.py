@@ -1,4 +1,6 @@
 import unittest
+from functools import partial
+from unittest.mock import patch
 from elifetools import utils as etoolsutils
 from elifearticle import parse
 from tests import XLS_PATH
@@ -522,3 +524,16 @@ class TestParseDeep(unittest.TestCase):
             article_object.publication_history[1].date,
             etoolsutils.date_struct(2023, 4, 15),
         )
+
+
+class TestParseDeepLxml(TestParseDeep):
+    "the same comparisons building the articles with the lxml engine"
+
+    def setUp(self):
+        patcher = patch.object(
+            parse,
+            "build_article_from_xml",
+            partial(parse.build_article_from_xml, engine="lxml"),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
@@ -0,0 +1,189 @@
+import unittest
+import os
+import glob
+from unittest.mock import patch
+from elifetools import parseJATS as parser
+from elifetools import utils as etoolsutils
+from elifearticle import parse, parse_lxml
+from tests import XLS_PATH, article_values
+
+# contributors with affiliations and references the test files do not have
+CONTRIBUTORS_XML = (
+    b'<article xmlns:xlink="http://www.w3.org/1999/xlink"><front><article-meta>'
+    b'<article-id pub-id-type="doi">10.7554/eLife.99999</article-id>'
+    b"<contrib-group>"
+    b'<contrib contrib-type="author" corresp="yes" id="author-12">'
+    b"<name><surname>Smith <italic>Jr</italic></surname></name>"
+    b'<xref ref-type="aff" rid="aff1"/><xref ref-type="aff">x</xref>'
+    b'<xref ref-type="aff" rid="aff9"/><xref ref-type="corresp" rid="cor1"/>'
+    b'<xref ref-type="fn" rid="conf1"/><role>Writer <!-- c --></role></contrib>'
+    b'<contrib contrib-type="author"><collab>The Group <italic>X</italic>'
+    b'<contrib-group><contrib contrib-type="author non-byline">'
+    b"<name><surname>Member</surname></name></contrib></contrib-group>\n"
+    b'</collab><xref ref-type="aff" rid="aff2"/></contrib>'
+    b'<contrib contrib-type="author"><anonymous/><aff><label>3</label>\n'
+    b"  Some text <bold>only</bold>\n</aff></contrib>"
+    b"<on-behalf-of>for the <italic>Consortium</italic></on-behalf-of>"
+    b'<aff id="aff1"><label>1</label><institution>First</institution></aff>'
+    b'<aff id="aff2"><label>2</label>Just text &amp; more</aff>'
+    b"</contrib-group><author-notes>"
+    b'<corresp id="cor1">Email: <email>a@b.c</email></corresp></author-notes>'
+    b"</article-meta></front><back>"
+    b'<fn-group content-type="competing-interest">'
+    b'<fn fn-type="COI-statement" id="conf1"><p>None.</p></fn></fn-group>'
+    b"</back></article>"
+)
+
+
+class TestParseLxml(unittest.TestCase):
+    def test_build_article_from_xml_engines(self):
+        "building with each engine results in the same article"
+        for xml_file in sorted(glob.glob(os.path.join(XLS_PATH, "*.xml"))):
+            for build_parts in [None, ["basic"], ["basic", "history", "pub_dates"]]:
+                article, error_count = parse.build_article_from_xml(
+                    xml_file, "full", build_parts
+                )
+                lxml_article, error_count = parse.build_article_from_xml(
+                    xml_file, "full", build_parts, engine="lxml"
+                )
+                self.assertEqual(
+                    article_values(lxml_article),
+                    article_values(article),
+                    "%s %s" % (xml_file, build_parts),
+                )
+
+    def test_lxml_document_basic(self):
+        "basic build part does not need to parse the XML with BeautifulSoup"
+        with open(os.path.join(XLS_PATH, "elife-02935-v2.xml"), "rb") as open_file:
+            document = parse.LxmlDocument(open_file.read())
+        self.assertEqual(document.parse(parser.doi), "10.7554/eLife.02935")
+        self.assertEqual(
+            document.parse(parser.full_title),
+            (
+                "Origins and functional consequences of somatic mitochondrial"
+                " DNA mutations in human cancer"
+            ),
+        )
+        self.assertEqual(
+            document.parse(parser.history_date, "received"),
+            etoolsutils.date_struct(2014, 3, 28),
+        )
+        self.assertIsNone(document.soup_document)
+        self.assertEqual(document.parser_calls[("doi",)], 1)
+
+    def test_lxml_document_fallback(self):
+        "parser functions without an lxml equivalent use BeautifulSoup"
+        with open(os.path.join(XLS_PATH, "elife-02935-v2.xml"), "rb") as open_file:
+            document = parse.LxmlDocument(open_file.read())
+        self.assertEqual(len(document.parse(parser.refs)), 59)
+        self.assertIsNone(document.soup_document)
+        document.parse(parser.components)
+        self.assertIsNotNone(document.soup_document)
+        self.assertEqual(document.soup_document.parser_calls[("components",)], 1)
+
+    def test_lxml_parser_functions(self):
+        "references and contributors are the same as from the elifetools parser"
+        calls = [
+            ("refs",),
+            ("data_refs",),
+            ("contributors", "brief"),
+            ("contributors", "full"),
+            ("authors_non_byline", "full"),
+            ("competing_interests", None),
+        ]
+        for xml_file in sorted(glob.glob(os.path.join(XLS_PATH, "*.xml"))):
+            with open(xml_file, "rb") as open_file:
+                xml = open_file.read()
+            root = parse_lxml.parse_xml(xml)
+            for name, *args in calls:
+                # format_aff changes the soup, parse it again for each call
+                soup = parser.parse_xml(xml)
+                self.assertEqual(
+                    parse_lxml.PARSER_FUNCTIONS[name](root, *args),
+                    getattr(parser, name)(soup, *args),
+                    "%s %s" % (xml_file, name),
+                )
+        root = parse_lxml.parse_xml(CONTRIBUTORS_XML)
+        for name, *args in calls:
+            self.assertEqual(
+                parse_lxml.PARSER_FUNCTIONS[name](root, *args),
+                getattr(parser, name)(parser.parse_xml(CONTRIBUTORS_XML), *args),
+                name,
+            )
+
+    def test_lxml_function_checked_once(self):
+        "whether a parser function can use lxml is checked once per document"
+        with open(os.path.join(XLS_PATH, "elife-02935-v2.xml"), "rb") as open_file:
+            document = parse.LxmlDocument(open_file.read())
+        with patch.object(
+            parse_lxml, "supported", wraps=parse_lxml.supported
+        ) as supported:
+            document.parse(parser.history_date, "received")
+            document.parse(parser.history_date, "accepted")
+            document.parse(parser.history_date, "received")
+            document.parse(parser.contributors, "full")
+            document.parse(parser.contributors, "full")
+            # a parser function with a decorator is known by its parser name
+            document.parse(parser.competing_interests, None)
+        self.assertEqual(supported.call_count, 3)
+        self.assertEqual(document.parser_calls[("competing_interests", None)], 1)
+        self.assertIsNone(document.soup_document)
+
+    def test_lxml_contributors_bio(self):
+        "contributors with a bio are parsed by elifetools"
+        xml = (
+            b"<article><front><article-meta><contrib-group>"
+            b'<contrib contrib-type="author"><name><surname>One</surname></name>'
+            b"<bio><p>Biography</p></bio></contrib>"
+            b"</contrib-group></article-meta></front></article>"
+        )
+        document = parse.LxmlDocument(xml)
+        self.assertIsNone(document.lxml_function(parser.contributors))
+        self.assertEqual(
+            document.parse(parser.contributors, "brief")[0].get("surname"), "One"
+        )
+        self.assertIsNotNone(document.soup_document)
+
+    def test_lxml_document_not_serialisable(self):
+        "namespaces declared below the root tag are serialised by BeautifulSoup"
+        with open(os.path.join(XLS_PATH, "cstp77-jats.xml"), "rb") as open_file:
+            document = parse.LxmlDocument(open_file.read())
+        self.assertFalse(document.serialisable)
+        document.parse(parser.doi)
+        self.assertIsNone(document.soup_document)
+        document.parse(parser.full_title)
+        self.assertIsNotNone(document.soup_document)
+
+    def test_parse_xml_str(self):
+        "str XML is parsed even though it has an encoding declaration"
+        xml = '<?xml version="1.0" encoding="ISO-8859-1"?><article>\u00e9</article>'
+        self.assertEqual(parse_lxml.parse_xml(xml).text, "\u00e9")
+
+    def test_parse_xml_not_article(self):
+        self.assertIsNone(parse_lxml.parse_xml(b"<root/>"))
+        self.assertIsNone(
+            parse_lxml.parse_xml(b'<article xmlns="http://jats.nlm.nih.gov"/>')
+        )
+
+    def test_node_contents_str(self):
+        xml = (
+            b'<article xmlns:xlink="http://www.w3.org/1999/xlink"><article-title>'
+            b"A &amp; B <italic>x &lt; y</italic><!--note-->\n   "
+            b'<ext-link xlink:href="https://example.org" ext-link-type="uri"/>'
+            b"</article-title></article>"
+        )
+        soup = parser.parse_xml(xml)
+        root = parse_lxml.parse_xml(xml)
+        self.assertEqual(
+            parse_lxml.node_contents_str(next(root.iter("article-title"))),
+            etoolsutils.node_contents_str(soup.find("article-title")),
+        )
+        self.assertEqual(
+            parse_lxml.node_text(next(root.iter("article-title"))),
+            etoolsutils.node_text(soup.find("article-title")),
+        )
+
+    def test_node_contents_str_none(self):
+        self.assertIsNone(parse_lxml.node_contents_str(None))
+        root = parse_lxml.parse_xml(b"<article/>")
+        self.assertIsNone(parse_lxml.node_contents_str(root))
@@ -0,0 +1,136 @@
+import unittest
+import copy
+import glob
+import os
+import pickle
+import sys
+from elifearticle import article as ea
+from elifearticle import parse
+from tests import XLS_PATH, article_values
+
+
+class DictStateContributor(ea.Contributor):
+    "contributor pickled with the default __dict__ state, for comparing sizes"
+
+    def __getstate__(self):
+        return self.__dict__
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+class TestPickle(unittest.TestCase):
+    def test_round_trip(self):
+        "articles built from every test file are the same after unpickling"
+        for xml_file in sorted(glob.glob(os.path.join(XLS_PATH, "*.xml"))):
+            article, error_count = parse.build_article_from_xml(xml_file, "full")
+            new_article = pickle.loads(pickle.dumps(article))
+            self.assertIsInstance(new_article, ea.Article)
+            self.assertEqual(article_values(new_article), article_values(article))
+            self.assertEqual(str(new_article), str(article))
+            self.assertEqual(new_article.pretty(), article.pretty())
+
+    def test_attribute_names_shared(self):
+        "objects with the same attributes share one tuple of their names"
+        first_contributor = ea.Contributor("author", "One", "Given")
+        second_contributor = ea.Contributor("author", "Two", "Given")
+        first_names, first_values = first_contributor.__getstate__()
+        second_names, second_values = second_contributor.__getstate__()
+        self.assertIs(first_names, second_names)
+        self.assertEqual(first_values[:3], ("author", "One", "Given"))
+        # the shared values are stored once in the pickle
+        contributors = pickle.loads(
+            pickle.dumps([first_contributor, second_contributor])
+        )
+        self.assertIs(contributors[0].contrib_type, contributors[1].contrib_type)
+        self.assertEqual(contributors[1].surname, "Two")
+
+    def test_smaller_than_dict_state(self):
+        contributors = [
+            ea.Contributor("author", "Surname %s" % index, "Given")
+            for index in range(20)
+        ]
+        dict_state_contributors = []
+        for contributor in contributors:
+            dict_state_contributor = DictStateContributor(None, None, None)
+            dict_state_contributor.__dict__.update(contributor.__dict__)
+            dict_state_contributors.append(dict_state_contributor)
+        self.assertLess(
+            len(pickle.dumps(contributors)), len(pickle.dumps(dict_state_contributors))
+        )
+
+    def test_review_articles_parent_not_shared(self):
+        "each review article has its own parent article, as when it was built"
+        article, error_count = parse.build_article_from_xml(
+            os.path.join(XLS_PATH, "elife-1234567890-v2.xml"), "full"
+        )
+        self.assertTrue(len(article.review_articles) > 1)
+        new_article = pickle.loads(pickle.dumps(article))
+        first_parent, second_parent = [
+            review_article.related_articles[0]
+            for review_article in new_article.review_articles[:2]
+        ]
+        self.assertIsNot(first_parent, second_parent)
+        self.assertIsNot(first_parent.contributors, second_parent.contributors)
+        self.assertEqual(first_parent.doi, article.doi)
+        self.assertIs(new_article.review_articles[0].license, first_parent.license)
+        for review_article, new_review_article in zip(
+            article.review_articles, new_article.review_articles
+        ):
+            self.assertEqual(
+                str(new_review_article.related_articles[0]),
+                str(review_article.related_articles[0]),
+            )
+
+    def test_review_articles_parent_pickled_once(self):
+        "parent articles with the same values are stored once in the pickle"
+        article, error_count = parse.build_article_from_xml(
+            os.path.join(XLS_PATH, "elife-1234567890-v2.xml"), "full"
+        )
+        names, values, shared = article.__getstate__()
+        self.assertEqual(len(shared), len(article.review_articles) - 1)
+        # the article itself is not changed
+        parents = [
+            review_article.related_articles[0]
+            for review_article in article.review_articles
+        ]
+        self.assertEqual(len({id(parent) for parent in parents}), len(parents))
+        # smaller than the state with a parent article for each review article
+        self.assertLess(
+            len(pickle.dumps(article.__getstate__())),
+            len(pickle.dumps(ea.BaseObject.__getstate__(article))),
+        )
+
+    def test_parent_with_other_values_not_shared(self):
+        "a parent article with other values is pickled as it is"
+        article, error_count = parse.build_article_from_xml(
+            os.path.join(XLS_PATH, "elife-1234567890-v2.xml"), "full"
+        )
+        article.review_articles[1].related_articles[0].title = "Another title"
+        new_article = pickle.loads(pickle.dumps(article))
+        self.assertEqual(
+            new_article.review_articles[1].related_articles[0].title, "Another title"
+        )
+        self.assertEqual(
+            new_article.review_articles[2].related_articles[0].title,
+            article.review_articles[2].related_articles[0].title,
+        )
+
+    def test_copy_does_not_use_pickle_state(self):
+        "copying an object does not intern its strings"
+        contributor = ea.Contributor("author", "".join(["Sur", "name"]), "Given")
+        copied_contributor = copy.deepcopy(contributor)
+        self.assertIs(copied_contributor.surname, contributor.surname)
+        self.assertIsNot(copied_contributor.surname, sys.intern("Surname"))
+
+    def test_dict_state(self):
+        "an object pickled with its __dict__ as the state is unpickled"
+        contributor = DictStateContributor("author", "Surname", "Given")
+        # protocol 0 names the class as text, so it can be replaced
+        data = pickle.dumps(contributor, 0).replace(
+            b"DictStateContributor", b"Contributor"
+        )
+        data = data.replace(b"tests.test_pickle", b"elifearticle.article")
+        new_contributor = pickle.loads(data)
+        self.assertIs(type(new_contributor), ea.Contributor)
+        self.assertEqual(new_contributor.surname, "Surname")
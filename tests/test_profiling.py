@@ -0,0 +1,71 @@
+import unittest
+import os
+from elifearticle import parse
+from elifearticle.profiling import BuildProfile, aggregate_profiles
+from tests import XLS_PATH
+
+
+class TestBuildProfile(unittest.TestCase):
+    def setUp(self):
+        self.xml_file = os.path.join(XLS_PATH, "elife-02935-v2.xml")
+
+    def test_build_article_from_xml_profile(self):
+        profile = BuildProfile()
+        parse.build_article_from_xml(
+            self.xml_file, "full", ["basic", "references"], profile=profile
+        )
+        self.assertEqual(
+            [row.get("name") for row in profile.report("parse")], ["beautifulsoup"]
+        )
+        self.assertEqual(
+            sorted(row.get("name") for row in profile.report("part")),
+            ["basic", "references"],
+        )
+        parser_names = [row.get("name") for row in profile.report("parser")]
+        self.assertIn("refs", parser_names)
+        self.assertIn("doi", parser_names)
+        row = profile.report("part")[0]
+        self.assertEqual(
+            list(row),
+            ["kind", "name", "calls", "wall_time", "cpu_time", "net_blocks"],
+        )
+        self.assertEqual(row.get("calls"), 1)
+        self.assertGreater(row.get("wall_time"), 0)
+
+    def test_report_sort(self):
+        profile = BuildProfile()
+        profile.add("part", "basic", 1, 0.5, 0.4, 10)
+        profile.add("part", "references", 1, 1.5, 1.4, 5)
+        profile.add("parser", "refs", 1, 1.0, 1.0, 5)
+        self.assertEqual(
+            [row.get("name") for row in profile.report()],
+            ["references", "refs", "basic"],
+        )
+        self.assertEqual(
+            [row.get("name") for row in profile.report("part", "net_blocks")],
+            ["basic", "references"],
+        )
+
+    def test_aggregate_profiles(self):
+        profiles = []
+        for wall_time in [0.5, 1.5]:
+            profile = BuildProfile()
+            profile.add("part", "basic", 1, wall_time, wall_time, 10)
+            profiles.append(profile)
+        total_profile = aggregate_profiles(profiles)
+        row = total_profile.report()[0]
+        self.assertEqual(row.get("calls"), 2)
+        self.assertEqual(row.get("wall_time"), 2.0)
+        self.assertEqual(row.get("net_blocks"), 20)
+
+    def test_build_articles_profile(self):
+        article_xmls = [
+            os.path.join(XLS_PATH, "elife-02935-v2.xml"),
+            os.path.join(XLS_PATH, "elife-00666.xml"),
+        ]
+        for workers in [None, 2]:
+            profile = BuildProfile()
+            parse.build_articles_from_article_xmls(
+                article_xmls, build_parts=["basic"], workers=workers, profile=profile
+            )
+            self.assertEqual(profile.report("part")[0].get("calls"), 2)
@@ -0,0 +1,81 @@
+import unittest
+import glob
+import json
+import os
+import time
+from elifearticle import article as ea
+from elifearticle import compact, parse, serialise
+from tests import XLS_PATH, article_values
+
+
+class TestSerialise(unittest.TestCase):
+    def test_round_trip(self):
+        "articles built from every test file are the same after converting back"
+        for xml_file in sorted(glob.glob(os.path.join(XLS_PATH, "*.xml"))):
+            article, error_count = parse.build_article_from_xml(xml_file, "full")
+            new_article = serialise.from_json(serialise.to_json(article))
+            self.assertIsInstance(new_article, ea.Article)
+            self.assertEqual(article_values(new_article), article_values(article))
+            self.assertEqual(str(new_article), str(article))
+            self.assertEqual(new_article.pretty(), article.pretty())
+
+    def test_to_dict(self):
+        contributor = ea.Contributor("author", "Surname", "Given")
+        contributor.set_affiliation(ea.Affiliation())
+        contributor.affiliations[0].text = "Bristol"
+        self.assertEqual(
+            serialise.to_dict(contributor),
+            {
+                "_class": "Contributor",
+                "contrib_type": "author",
+                "surname": "Surname",
+                "given_name": "Given",
+                "affiliations": [{"_class": "Affiliation", "text": "Bristol"}],
+                "conflict": [],
+                "collab": None,
+            },
+        )
+
+    def test_dates(self):
+        date = ea.ArticleDate("received", time.strptime("2016-03-28", "%Y-%m-%d"))
+        data = json.loads(json.dumps(serialise.to_dict(date)))
+        self.assertEqual(
+            data.get("date"), {"_struct_time": [2016, 3, 28, 0, 0, 0, 0, 88, -1]}
+        )
+        new_date = serialise.from_dict(data)
+        self.assertIsInstance(new_date.date, time.struct_time)
+        self.assertEqual(new_date.date, date.date)
+
+    def test_defaults(self):
+        "attributes which were not set keep the class default"
+        new_contributor = serialise.from_dict(
+            serialise.to_dict(ea.Contributor("author", "Surname", "Given"))
+        )
+        self.assertNotIn("orcid", new_contributor.__dict__)
+        self.assertIsNone(new_contributor.orcid)
+
+    def test_compact_and_lazy(self):
+        xml_file = os.path.join(XLS_PATH, "elife-00666.xml")
+        article, error_count = parse.build_article_from_xml(xml_file, "full")
+        lazy_article, error_count = parse.build_article_from_xml(
+            xml_file, "full", lazy=True
+        )
+        for value in [compact.compact(article), lazy_article]:
+            new_article = serialise.from_dict(serialise.to_dict(value))
+            self.assertIsInstance(new_article, ea.Article)
+            self.assertEqual(article_values(new_article), article_values(article))
+
+    def test_lazy_references(self):
+        "references built lazily are converted as a list"
+        xml_file = os.path.join(XLS_PATH, "elife-00666.xml")
+        article, error_count = parse.build_article_from_xml(xml_file, "full")
+        lazy_article, error_count = parse.build_article_from_xml(
+            xml_file, "full", lazy_references=True
+        )
+        self.assertEqual(serialise.to_json(lazy_article), serialise.to_json(article))
+
+    def test_field_tables(self):
+        self.assertEqual(list(serialise.FIELD_TABLES), list(compact.COMPACT_CLASSES))
+        citation_table = serialise.FIELD_TABLES.get(ea.Citation)
+        self.assertIs(citation_table.get("authors"), serialise.to_dict)
+        self.assertIs(citation_table.get("article_title"), serialise.plain_value)
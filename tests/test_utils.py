@@ -2,6 +2,7 @@ import unittest
 from collections import OrderedDict
 import re
 import os
+import pickle
 import time
 from ddt import ddt, data, unpack
 from elifearticle import utils
@@ -16,6 +17,49 @@ class TestUtils(unittest.TestCase):
         self.assertEqual(utils.remove_tag("i", "<i>test</i>"), "test")
         self.assertEqual(utils.remove_tag("i", None), None)
 
+    def test_remove_tags(self):
+        string = (
+            '<p>A <xref ref-type="bibr">ref</xref> and <inline-formula>'
+            "<mml:math><mml:mi>x</mml:mi></mml:math></inline-formula></p>"
+        )
+        self.assertEqual(
+            utils.remove_tags(["xref", "inline-formula", "mml:*"], string),
+            "<p>A ref and x</p>",
+        )
+        self.assertEqual(utils.remove_tags([], string), string)
+        self.assertEqual(utils.remove_tags(["p"], ""), "")
+
+    def test_tag_pattern(self):
+        "the pattern is compiled once for each tuple of tag names"
+        self.assertIs(
+            utils.tag_pattern(("xref", "ext-link")),
+            utils.tag_pattern(("xref", "ext-link")),
+        )
+
+    def test_tag_cleaner(self):
+        tag_cleaner = utils.TagCleaner(["xref", "mml:*"])
+        self.assertEqual(
+            tag_cleaner.clean("<p><xref>A</xref><mml:mi>x</mml:mi></p>"), "<p>Ax</p>"
+        )
+        self.assertIsNone(tag_cleaner.clean(None))
+        self.assertEqual(list(tag_cleaner), ["xref", "mml:*"])
+        self.assertIs(utils.tag_cleaner(tag_cleaner), tag_cleaner)
+        self.assertEqual(utils.tag_cleaner(["xref", "mml:*"]), tag_cleaner)
+        self.assertEqual(utils.TagCleaner([]).clean("<p>A</p>"), "<p>A</p>")
+
+    def test_tag_cleaner_immutable(self):
+        tag_cleaner = utils.TagCleaner(["xref"])
+        with self.assertRaises(AttributeError):
+            tag_cleaner.tag_names = ("p",)
+        with self.assertRaises(AttributeError):
+            del tag_cleaner.pattern
+
+    def test_tag_cleaner_pickle(self):
+        tag_cleaner = utils.TagCleaner(["xref"])
+        unpickled_tag_cleaner = pickle.loads(pickle.dumps(tag_cleaner))
+        self.assertEqual(unpickled_tag_cleaner, tag_cleaner)
+        self.assertIs(unpickled_tag_cleaner.pattern, tag_cleaner.pattern)
+
     def test_replace_tags(self):
         self.assertEqual(utils.replace_tags("<i>"), "<italic>")
 
@@ -77,6 +121,35 @@ class TestUtils(unittest.TestCase):
         )
 
 
+class TestDoiUri(unittest.TestCase):
+    def setUp(self):
+        utils.doi_uri_to_doi.cache_clear()
+
+    def test_doi_uri_to_doi(self):
+        self.assertEqual(
+            utils.doi_uri_to_doi("https://doi.org/10.7554/eLife.00666"),
+            "10.7554/eLife.00666",
+        )
+        self.assertEqual(
+            utils.doi_uri_to_doi("https://doi.org/10.7554/eLife.00666"),
+            "10.7554/eLife.00666",
+        )
+        self.assertIsNone(utils.doi_uri_to_doi(None))
+        cache_info = utils.doi_uri_to_doi.cache_info()
+        self.assertEqual(cache_info.hits, 1)
+        self.assertEqual(cache_info.misses, 2)
+        self.assertEqual(cache_info.maxsize, utils.DOI_URI_CACHE_SIZE)
+
+    def test_doi_from_uri(self):
+        self.assertEqual(
+            utils.doi_from_uri("http://dx.doi.org/10.5061/dryad.r1072"),
+            "10.5061/dryad.r1072",
+        )
+        self.assertIsNone(utils.doi_from_uri("https://example.org"))
+        self.assertIsNone(utils.doi_from_uri(""))
+        self.assertIsNone(utils.doi_from_uri(None))
+
+
 class TestUtilsAttr(unittest.TestCase):
     def setUp(self):
         self.attr_map = {"foo": "& bar", "more": '"complicated"'}